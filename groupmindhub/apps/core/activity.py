@@ -0,0 +1,253 @@
+"""Incrementally maintained per-project activity rollups and the updates feed.
+
+Writers bump the counters in ``ProjectActivity`` with F-expressions as changes and merges
+happen (star counts live on ``Project.stars_count``); ``refresh_activity`` (run
+periodically via ``refresh_project_activity``) decays the rolling 24h/7d windows back to
+exact values; every write retires the cached home page rows (``caching.ROLLUPS``).
+Proposals, merges and comments also append an ``ActivityEvent`` row (and publish a live
+``ProjectEvent``) so the updates hub reads followed activity with one indexed range scan
+per request.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from .caching import ROLLUPS
+from .events import publish
+from .jobs import handler
+from .models import ActivityEvent, Block, Change, Comment, Project, ProjectActivity, ProjectEvent, ProjectStar
+
+DAY_WEIGHT = 1.0
+WEEK_WEIGHT = 0.2
+
+
+def activity_score(changes_24h: int, changes_7d: int) -> float:
+    """Home page heuristic: changes in the last day weigh 1, changes in the last week 0.2."""
+    return changes_24h * DAY_WEIGHT + changes_7d * WEEK_WEIGHT
+
+
+def _bump(project_id: int, **updates) -> None:
+    if not ProjectActivity.objects.filter(project_id=project_id).update(**updates):
+        ProjectActivity.objects.get_or_create(project_id=project_id)
+        ProjectActivity.objects.filter(project_id=project_id).update(**updates)
+    ROLLUPS.invalidate()
+
+
+def record_change_created(project_id: int, when=None) -> None:
+    _bump(
+        project_id,
+        changes_24h=F('changes_24h') + 1,
+        changes_7d=F('changes_7d') + 1,
+        score=F('score') + DAY_WEIGHT + WEEK_WEIGHT,
+        last_activity_at=when or timezone.now(),
+    )
+
+
+def record_merge(project_id: int, when=None) -> None:
+    _bump(project_id, last_activity_at=when or timezone.now())
+
+
+@handler('activity.proposal')
+def fan_out_proposal(change_id: int, section_label: str | None = None) -> None:
+    """Rollup bump, feed row and search document for a newly published change."""
+    from .search import index_change
+
+    change = Change.objects.select_related('author').filter(id=change_id).first()
+    if change is None:
+        return
+    record_change_created(change.project_id, change.published_at or change.created_at)
+    record_proposal_event(change, section_label)
+    index_change(change)
+
+
+@handler('activity.merge')
+def fan_out_merge(change_id: int, version: int) -> None:
+    change = Change.objects.filter(id=change_id).first()
+    if change is None:
+        return
+    record_merge(change.project_id, change.merged_at)
+    record_merge_event(change, version)
+
+
+def refresh_activity(project_ids: Iterable[int], now=None, include_stars: bool = False) -> List[ProjectActivity]:
+    """Recompute the windowed counters for ``project_ids`` from source rows.
+
+    With ``include_stars`` the projects' ``stars_count`` is recounted from ``ProjectStar`` too.
+    """
+    now = now or timezone.now()
+    project_ids = list(project_ids)
+    changes = Change.objects.filter(project_id__in=project_ids)
+    day_counts = dict(
+        changes.filter(created_at__gte=now - timedelta(days=1)).values_list('project_id').annotate(c=Count('id'))
+    )
+    week_counts = dict(
+        changes.filter(created_at__gte=now - timedelta(days=7)).values_list('project_id').annotate(c=Count('id'))
+    )
+    rows = list(ProjectActivity.objects.filter(project_id__in=project_ids))
+    fields = ['changes_24h', 'changes_7d', 'score', 'refreshed_at']
+    for row in rows:
+        row.changes_24h = day_counts.get(row.project_id, 0)
+        row.changes_7d = week_counts.get(row.project_id, 0)
+        row.score = activity_score(row.changes_24h, row.changes_7d)
+        row.refreshed_at = now
+    ProjectActivity.objects.bulk_update(rows, fields)
+    if include_stars:
+        star_counts = dict(
+            ProjectStar.objects.filter(project_id__in=project_ids).values_list('project_id').annotate(c=Count('id'))
+        )
+        projects = list(Project.objects.filter(id__in=project_ids).only('id', 'stars_count'))
+        for project in projects:
+            project.stars_count = star_counts.get(project.id, 0)
+        Project.objects.bulk_update(projects, ['stars_count'])
+    ROLLUPS.invalidate()
+    return rows
+
+
+# --- updates feed -------------------------------------------------------------
+FEED_PAGE_SIZE = 25
+
+
+def _author_name(user) -> str:
+    if not user:
+        return 'Anonymous'
+    return user.get_full_name() or user.get_username() or 'Anonymous'
+
+
+def _change_link(change: Change) -> str:
+    return f"/entries/{change.target_entry_id}/?focus={change.target_section_id or ''}&proposal={change.id}"
+
+
+def change_section_label(change: Change) -> str:
+    """Heading text of the section a change targets, falling back to its summary."""
+    section_id = change.target_section_id or ''
+    if section_id:
+        heading_id = section_id if section_id.startswith('h_') else f'h_{section_id}'
+        text = (
+            Block.objects.filter(entry_id=change.target_entry_id, stable_id=heading_id)
+            .values_list('text', flat=True)
+            .first()
+        )
+        if text:
+            return text
+    return change.summary or 'Section'
+
+
+def record_proposal_event(change: Change, section_label: str | None = None) -> ActivityEvent:
+    summary = Truncator(f"📝 {_author_name(change.author)} proposed: {change.summary or 'Change'}").chars(300)
+    publish(
+        change.project_id,
+        ProjectEvent.Kind.PROPOSAL,
+        change_id=change.id,
+        entry_id=change.target_entry_id,
+        section_id=change.target_section_id or '',
+        summary=change.summary or '',
+    )
+    return ActivityEvent.objects.create(
+        project_id=change.project_id,
+        entry_id=change.target_entry_id,
+        change=change,
+        actor_id=change.author_id,
+        kind=ActivityEvent.Kind.PROPOSAL,
+        summary=summary,
+        section_label=Truncator(section_label or change_section_label(change)).chars(300),
+        link=_change_link(change),
+        created_at=change.published_at or timezone.now(),
+    )
+
+
+def record_merge_event(change: Change, version_int: int) -> ActivityEvent:
+    publish(
+        change.project_id,
+        ProjectEvent.Kind.MERGE,
+        change_id=change.id,
+        entry_id=change.target_entry_id,
+        version=version_int,
+    )
+    return ActivityEvent.objects.create(
+        project_id=change.project_id,
+        entry_id=change.target_entry_id,
+        change=change,
+        kind=ActivityEvent.Kind.MERGE,
+        summary=f"#{change.id} merged into v{version_int}",
+        section_label=Truncator(change_section_label(change)).chars(300),
+        link=_change_link(change),
+        created_at=change.merged_at or timezone.now(),
+    )
+
+
+def record_comment_event(comment: Comment) -> ActivityEvent:
+    if comment.section_id:
+        section = comment.section
+        entry_id = section.entry_id
+        section_label = section.heading
+        link = f"/entries/{section.entry_id}/?focus={section.stable_id}"
+    else:
+        change = comment.change
+        entry_id = change.target_entry_id
+        section_label = change_section_label(change)
+        link = _change_link(change)
+    preview = Truncator(comment.body).chars(60)
+    publish(
+        comment.project_id,
+        ProjectEvent.Kind.COMMENT,
+        comment_id=comment.id,
+        change_id=comment.change_id,
+        section_id=comment.section.stable_id if comment.section_id else None,
+    )
+    return ActivityEvent.objects.create(
+        project_id=comment.project_id,
+        entry_id=entry_id,
+        change_id=comment.change_id,
+        comment=comment,
+        actor_id=comment.author_id,
+        kind=ActivityEvent.Kind.COMMENT,
+        summary=Truncator(f"💬 {_author_name(comment.author)}: {preview}").chars(300),
+        section_label=Truncator(section_label).chars(300),
+        link=link,
+        created_at=comment.created_at,
+    )
+
+
+def encode_feed_cursor(event: ActivityEvent) -> str:
+    return f"{event.created_at.isoformat()}~{event.id}"
+
+
+def decode_feed_cursor(cursor: str | None) -> Tuple[datetime, int] | None:
+    if not cursor or '~' not in cursor:
+        return None
+    stamp, _sep, event_id = cursor.rpartition('~')
+    try:
+        return datetime.fromisoformat(stamp), int(event_id)
+    except ValueError:
+        return None
+
+
+def followed_events(user, project_names=None, section_query: str = '', cursor: str | None = None,
+                    limit: int = FEED_PAGE_SIZE) -> Tuple[List[ActivityEvent], str | None]:
+    """One keyset page of activity for the projects ``user`` belongs to or has starred.
+
+    Anonymous visitors see public projects. Project and section filters run in SQL so a
+    filtered page is still a full page. Returns the events and the cursor for the next page.
+    """
+    events = ActivityEvent.objects.select_related('project')
+    if user is not None and getattr(user, 'is_authenticated', False):
+        followed = Project.objects.filter(Q(memberships__user=user) | Q(stars__user=user)).values('id')
+        events = events.filter(project_id__in=followed)
+    else:
+        events = events.filter(project__visibility=Project.Visibility.PUBLIC)
+    if project_names:
+        events = events.filter(project__name__in=project_names)
+    if section_query:
+        events = events.filter(section_label__icontains=section_query)
+    position = decode_feed_cursor(cursor)
+    if position:
+        created_at, event_id = position
+        events = events.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=event_id))
+    page = list(events.order_by('-created_at', '-id')[:limit + 1])
+    next_cursor = encode_feed_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
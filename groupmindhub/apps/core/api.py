@@ -1,18 +1,32 @@
 from __future__ import annotations
+import hmac
 import json
+import time
 from typing import Dict, Any
 import uuid
-from django.http import JsonResponse, HttpRequest
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse, HttpRequest, StreamingHttpResponse
 from django.core.paginator import Paginator
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.db.models import Count, Q
 from django.utils import timezone
-from .models import Project, Entry, Change, Vote, Block, ProjectMembership, Comment, Section
+from .models import Project, Entry, Change, ArchivedChange, Block, ProjectMembership, Comment, Section, ChangeVote
 from .access import resolve_invite
+from .caching import ENTRIES, cache_stats
+from .events import event_stream
+from .history import checkout
+from .importer import FORMATS as IMPORT_FORMATS, import_document
+from .jobs import enqueue
+from .metrics import SERIALIZE_ENTRY_DURATION, block_count_bucket
+from .metrics import render as render_metrics
+from .search import SEARCH_PAGE_SIZE, search
 
 ROOT_SECTION_ID = '__root__'
 DEFAULT_COMMENT_PAGE_SIZE = 20
+ENTRY_CACHE_TIMEOUT = 60 * 60
 
 
 def serialize_project_governance(project: Project) -> Dict[str, Any]:
@@ -78,20 +92,45 @@ def _membership_or_error(request: HttpRequest, project: Project, role: str):
     if not request.user.is_authenticated:
         return None, JsonResponse({'error': 'auth required'}, status=401)
     return None, JsonResponse({'error': 'forbidden'}, status=403)
+
+
+async def _amembership_or_error(request: HttpRequest, project: Project, role: str):
+    """``_membership_or_error`` for async views; returns ``(user, membership, error)``."""
+    user = await request.auser()
+    membership = None
+    if user.is_authenticated:
+        membership = await project.memberships.filter(user=user).afirst()
+    invite = await sync_to_async(resolve_invite)(request, project, persist=True)
+    if membership and membership.has_at_least(role):
+        return user, membership, None
+    is_safe_method = request.method in {'GET', 'HEAD', 'OPTIONS'}
+    if role == ProjectMembership.Role.VIEWER and is_safe_method:
+        if project.visibility == Project.Visibility.PUBLIC:
+            return user, membership, None
+        if invite and invite.allows(role):
+            return user, membership, None
+    if not user.is_authenticated:
+        return user, None, JsonResponse({'error': 'auth required'}, status=401)
+    return user, None, JsonResponse({'error': 'forbidden'}, status=403)
 from .logic import (
     outline,
-    auto_merge,
-    apply_merge_core,
+    acached_section_index,
     build_section_index,
+    cached_section_index,
+    cast_change_vote,
     SectionIndex,
     is_passing,
+    merge_change,
+    request_merge_evaluation,
 )
 
 
-def serialize_entry(entry: Entry):
-    section_index = build_section_index(entry)
+def serialize_entry(entry: Entry, blocks=None, version: int | None = None):
+    """Entry payload; pass ``blocks``/``version`` to serialize a historical checkout instead."""
+    started = time.perf_counter()
+    ordered_blocks = list(blocks) if blocks is not None else list(entry.blocks.order_by('position', 'id'))
+    section_index = build_section_index(entry, blocks=ordered_blocks)
     heading_map = section_index.by_heading_id
-    ordered_blocks = list(entry.blocks.order_by('position', 'id'))
     blocks = []
     for block in ordered_blocks:
         data = {
@@ -194,11 +233,11 @@ def serialize_entry(entry: Entry):
     for root in roots:
         append_flat(root)
 
-    return {
+    payload = {
         'id': entry.id,
         'project_id': entry.project_id,
         'title': entry.title,
-        'version': entry.entry_version_int,
+        'version': version or entry.entry_version_int,
         'status': entry.status,
         'votes': entry.votes_cache_int,
         'blocks': blocks,
@@ -206,6 +245,22 @@ def serialize_entry(entry: Entry):
         'sections_tree': roots,
         'project_governance': serialize_project_governance(entry.project),
     }
+    SERIALIZE_ENTRY_DURATION.observe(
+        time.perf_counter() - started, blocks=block_count_bucket(len(ordered_blocks))
+    )
+    return payload
+
+
+def entry_cache_key(entry: Entry, kind: str) -> tuple:
+    """Key parts for derived entry data; a merge (new version) or governance change rotates them."""
+    project = entry.project
+    governance = f"{project.voting_pool_size}-{project.approval_threshold}-{project.voting_duration_hours}"
+    return (entry.id, f"v{entry.entry_version_int}", f"g{governance}", kind)
+
+
+def cached_entry_payload(entry: Entry) -> Dict[str, Any]:
+    """``serialize_entry`` output, computed once per entry version and shared via the cache."""
+    return ENTRIES.get_or_set(entry_cache_key(entry, 'payload'), lambda: serialize_entry(entry), ENTRY_CACHE_TIMEOUT)
 
 
 def _normalize_section_block_id(section_id: str) -> str:
@@ -216,16 +271,20 @@ def _normalize_section_block_id(section_id: str) -> str:
     return section_id if section_id.startswith('h_') else f'h_{section_id}'
 
 
-def serialize_change(p: Change, user=None, section_index=None):
-    yes = Vote.objects.filter(target_type='change', target_id=p.id, value__gt=0).count()
-    no = Vote.objects.filter(target_type='change', target_id=p.id, value__lt=0).count()
-    current_vote = 0
-    if user and user.is_authenticated:
-        v = Vote.objects.filter(user=user, target_type='change', target_id=p.id).first()
-        current_vote = v.value if v else 0
-    section_index = section_index or build_section_index(p.target_entry)
+def serialize_change(p: Change, user=None, section_index=None, tally=None, current_vote=None):
+    """Change payload; callers that batch pass ``tally`` ``(yes, no)`` and ``current_vote`` to skip per-change queries."""
+    if tally is None:
+        tally = p.votes.aggregate(yes=Count('id', filter=Q(value__gt=0)), no=Count('id', filter=Q(value__lt=0)))
+        tally = (tally['yes'], tally['no'])
+    yes, no = tally
+    if current_vote is None:
+        current_vote = 0
+        if user and user.is_authenticated:
+            current_vote = p.votes.filter(user=user).values_list('value', flat=True).first() or 0
+    if section_index is None and p.target_entry_id:
+        section_index = cached_section_index(p.target_entry)
     section_block_id = _normalize_section_block_id(p.target_section_id)
-    section_info = section_index.get_by_heading(section_block_id) if section_block_id else None
+    section_info = section_index.get_by_heading(section_block_id) if section_index and section_block_id else None
     governance = serialize_project_governance(p.project)
     required_yes = governance['required_yes_votes']
     author_name = None
@@ -255,41 +314,141 @@ def serialize_change(p: Change, user=None, section_index=None):
         'no': no,
         'current_user_vote': current_vote,
         'required_yes_votes': required_yes,
-        'is_passing': is_passing(p),
+        'is_passing': yes >= required_yes,
         'closes_at': p.closes_at.isoformat() if p.closes_at else None,
         'project_governance': governance,
         'author_name': author_name or 'Anonymous',
     }
 
 
+def serialize_archived_change(p: ArchivedChange, section_index=None):
+    """Same shape as ``serialize_change`` for a cold change; tallies are final and votes closed."""
+    section_block_id = _normalize_section_block_id(p.target_section_id)
+    section_info = section_index.get_by_heading(section_block_id) if section_index and section_block_id else None
+    author_name = None
+    if p.author_id:
+        author_name = p.author.get_full_name() or p.author.get_username() or str(p.author_id)
+    return {
+        'id': p.id,
+        'summary': p.summary,
+        'status': p.status,
+        'archived': True,
+        'base_entry_version_int': p.base_entry_version_int,
+        'ops_json': p.ops_json,
+        'affected_blocks': p.affected_blocks,
+        'before_outline': p.before_outline,
+        'after_outline': p.after_outline,
+        'target_section_id': p.target_section_id,
+        'target_section_block_id': section_block_id,
+        'target_section_numbering': section_info.numbering if section_info else '',
+        'target_section_depth': section_info.depth if section_info else 0,
+        'target_section_heading': section_info.heading_text if section_info else '',
+        'yes': p.yes_votes,
+        'no': p.no_votes,
+        'current_user_vote': 0,
+        'is_passing': False,
+        'closes_at': p.closes_at.isoformat() if p.closes_at else None,
+        'merged_at': p.merged_at.isoformat() if p.merged_at else None,
+        'author_name': author_name or 'Anonymous',
+    }
+
+
+def _entry_version_payload(entry: Entry, version: int):
+    blocks = checkout(entry, version)
+    return None if blocks is None else serialize_entry(entry, blocks=blocks, version=version)
+
+
 @require_http_methods(["GET"])
-def api_project_entry(request: HttpRequest, project_id: int):
-    project = get_object_or_404(Project, id=project_id)
-    _membership, error = _membership_or_error(request, project, ProjectMembership.Role.VIEWER)
+async def api_project_entry(request: HttpRequest, project_id: int):
+    project = await aget_object_or_404(Project, id=project_id)
+    _user, _membership, error = await _amembership_or_error(request, project, ProjectMembership.Role.VIEWER)
     if error:
         return error
-    entry = project.entries.order_by('-entry_version_int').first()
+    version = request.GET.get('version')
+    if version is not None:
+        try:
+            version = int(version)
+        except ValueError:
+            return JsonResponse({'error': 'invalid version'}, status=400)
+    entry = await project.entries.select_related('project').order_by('-entry_version_int').afirst()
     if not entry:
         return JsonResponse({'project': project_id, 'entry': None})
-    return JsonResponse({'project': project_id, 'entry': serialize_entry(entry)})
+    if version is None or version == entry.entry_version_int:
+        payload = await ENTRIES.aget_or_set(
+            entry_cache_key(entry, 'payload'), sync_to_async(lambda: serialize_entry(entry)), ENTRY_CACHE_TIMEOUT
+        )
+        return JsonResponse({'project': project_id, 'entry': payload})
+    payload = await sync_to_async(_entry_version_payload)(entry, version)
+    if payload is None:
+        return JsonResponse({'error': 'version not available'}, status=404)
+    return JsonResponse({'project': project_id, 'entry': payload})
 
 
 @require_http_methods(["GET"])
-def api_project_changes_list(request: HttpRequest, project_id: int):
-    project = get_object_or_404(Project, id=project_id)
-    membership, error = _membership_or_error(request, project, ProjectMembership.Role.VIEWER)
+async def api_project_changes_list(request: HttpRequest, project_id: int):
+    project = await aget_object_or_404(Project, id=project_id)
+    user, _membership, error = await _amembership_or_error(request, project, ProjectMembership.Role.VIEWER)
     if error:
         return error
+    changes = [change async for change in project.changes.select_related('target_entry', 'project', 'author')]
+    # Tallies and the caller's votes for every change in two grouped queries.
+    tallies = {
+        row['change_id']: (row['yes'], row['no'])
+        async for row in ChangeVote.objects.filter(change__project=project)
+        .values('change_id')
+        .annotate(yes=Count('id', filter=Q(value__gt=0)), no=Count('id', filter=Q(value__lt=0)))
+    }
+    own_votes = {}
+    if user.is_authenticated:
+        own_votes = {
+            change_id: value
+            async for change_id, value in ChangeVote.objects.filter(change__project=project, user=user)
+            .values_list('change_id', 'value')
+        }
     section_indices: Dict[int, SectionIndex] = {}
-    serialized = []
-    for change in project.changes.select_related('target_entry', 'project').all():
-        entry = change.target_entry
-        if entry:
-            section_index = section_indices.setdefault(entry.id, build_section_index(entry))
-        else:
-            section_index = None
-        serialized.append(serialize_change(change, request.user, section_index=section_index))
-    return JsonResponse({'project': project_id, 'changes': serialized})
+    for change in changes:
+        if change.target_entry and change.target_entry_id not in section_indices:
+            section_indices[change.target_entry_id] = await acached_section_index(change.target_entry)
+    serialized = [
+        serialize_change(
+            change,
+            user,
+            section_index=section_indices.get(change.target_entry_id),
+            tally=tallies.get(change.id, (0, 0)),
+            current_vote=own_votes.get(change.id, 0),
+        )
+        for change in changes
+    ]
+    payload = {'project': project_id, 'changes': serialized}
+    if request.GET.get('archived') in {'1', 'true', 'yes'}:
+        archived = [
+            change async for change in project.archived_changes.select_related('target_entry', 'author')
+        ]
+        for change in archived:
+            if change.target_entry and change.target_entry_id not in section_indices:
+                section_indices[change.target_entry_id] = await acached_section_index(change.target_entry)
+        payload['archived_changes'] = [
+            serialize_archived_change(change, section_index=section_indices.get(change.target_entry_id))
+            for change in archived
+        ]
+    return JsonResponse(payload)
+
+
+@require_http_methods(["GET"])
+async def api_project_events(request: HttpRequest, project_id: int):
+    """Server-sent events: vote tallies, proposals, merges (with version) and comments."""
+    project = await aget_object_or_404(Project, id=project_id)
+    _user, _membership, error = await _amembership_or_error(request, project, ProjectMembership.Role.VIEWER)
+    if error:
+        return error
+    try:
+        after_id = max(0, int(request.headers.get('Last-Event-ID') or request.GET.get('after') or 0))
+    except ValueError:
+        after_id = 0
+    response = StreamingHttpResponse(event_stream(project.id, after_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @csrf_exempt
@@ -455,65 +614,125 @@ def api_project_changes_create(request: HttpRequest, project_id: int):
         published_at=now,
         closes_at=now + timezone.timedelta(hours=project.voting_duration_hours or 24),
     )
-    # Author auto-upvote (+1)
-    Vote.objects.update_or_create(
-        user=request.user, target_type='change', target_id=patch.id, defaults={'value': 1}
+    enqueue(
+        'activity.proposal',
+        key=f"project:{project.id}",
+        change_id=patch.id,
+        section_label=section_info.heading_text if section_info else None,
     )
-    auto_merge()
+    # Author auto-upvote (+1)
+    cast_change_vote(patch, request.user, 1)
+    request_merge_evaluation(patch)
     return JsonResponse({'change': serialize_change(patch, request.user, section_index=section_index)}, status=201)
 
 
+def _page_params(request: HttpRequest):
+    try:
+        page_number = int(request.GET.get('page', 1))
+    except (TypeError, ValueError):
+        page_number = 1
+    try:
+        page_size = int(request.GET.get('page_size', DEFAULT_COMMENT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        page_size = DEFAULT_COMMENT_PAGE_SIZE
+    return page_number, max(1, min(page_size, 100))
+
+
+def _archived_comments_response(request: HttpRequest, archived: ArchivedChange):
+    """Read-only page of the comments copied onto an archived change, newest first."""
+    page_number, page_size = _page_params(request)
+    comments = [
+        {**comment, 'target_type': 'change', 'target_id': archived.id, 'can_delete': False}
+        for comment in reversed(archived.comments)
+    ]
+    paginator = Paginator(comments, page_size)
+    page = paginator.get_page(page_number)
+    return JsonResponse(
+        {
+            'results': list(page.object_list),
+            'page': page.number,
+            'page_size': page.paginator.per_page,
+            'has_next': page.has_next(),
+            'total': paginator.count,
+            'target_type': 'change',
+            'target_id': str(archived.id),
+            'archived': True,
+        }
+    )
+
+
+async def _aresolve_comment_target(project: Project, target_type: str, identifier):
+    if target_type == 'section':
+        if identifier in (None, ''):
+            return None
+        return await Section.objects.filter(entry__project=project, stable_id=str(identifier)).afirst()
+    if target_type == 'change':
+        if not identifier:
+            return None
+        try:
+            change_id = int(identifier)
+        except (TypeError, ValueError):
+            return None
+        return await Change.objects.filter(project=project, id=change_id).afirst()
+    return None
+
+
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
-def api_project_comments(request: HttpRequest, project_id: int):
-    project = get_object_or_404(Project, id=project_id)
-    membership, error = _membership_or_error(request, project, ProjectMembership.Role.VIEWER)
+async def api_project_comments(request: HttpRequest, project_id: int):
+    project = await aget_object_or_404(Project, id=project_id)
+    user, membership, error = await _amembership_or_error(request, project, ProjectMembership.Role.VIEWER)
     if error:
         return error
-    if request.method == 'GET':
-        target_type = (request.GET.get('target_type') or '').strip().lower()
-        if target_type not in {'section', 'change'}:
-            return JsonResponse({'error': 'target_type must be section or change'}, status=400)
-        identifier = (
-            request.GET.get('section_id')
-            or request.GET.get('change_id')
-            or request.GET.get('target_id')
-        )
-        target = _resolve_comment_target(project, target_type, identifier)
-        if not target:
-            return JsonResponse({'error': 'target not found'}, status=404)
-        queryset = Comment.objects.filter(project=project)
-        if target_type == 'section':
-            queryset = queryset.filter(section=target)
-            identifier = target.stable_id
-        else:
-            queryset = queryset.filter(change=target)
-            identifier = str(target.id)
-        queryset = queryset.select_related('author', 'section__entry', 'change').order_by('-created_at', '-id')
-        try:
-            page_number = int(request.GET.get('page', 1))
-        except (TypeError, ValueError):
-            page_number = 1
+    if request.method == 'POST':
+        return await sync_to_async(_create_comment)(request, project, membership)
+    target_type = (request.GET.get('target_type') or '').strip().lower()
+    if target_type not in {'section', 'change'}:
+        return JsonResponse({'error': 'target_type must be section or change'}, status=400)
+    identifier = (
+        request.GET.get('section_id')
+        or request.GET.get('change_id')
+        or request.GET.get('target_id')
+    )
+    target = await _aresolve_comment_target(project, target_type, identifier)
+    if not target and target_type == 'change':
         try:
-            page_size = int(request.GET.get('page_size', DEFAULT_COMMENT_PAGE_SIZE))
+            archived = await project.archived_changes.filter(id=int(identifier)).afirst()
         except (TypeError, ValueError):
-            page_size = DEFAULT_COMMENT_PAGE_SIZE
-        page_size = max(1, min(page_size, 100))
-        paginator = Paginator(queryset, page_size)
-        page = paginator.get_page(page_number)
-        results = [serialize_comment(comment, request.user, membership) for comment in page.object_list]
-        return JsonResponse(
-            {
-                'results': results,
-                'page': page.number,
-                'page_size': page.paginator.per_page,
-                'has_next': page.has_next(),
-                'total': paginator.count,
-                'target_type': target_type,
-                'target_id': identifier,
-            }
-        )
+            archived = None
+        if archived:
+            return _archived_comments_response(request, archived)
+    if not target:
+        return JsonResponse({'error': 'target not found'}, status=404)
+    queryset = Comment.objects.filter(project=project)
+    if target_type == 'section':
+        queryset = queryset.filter(section=target)
+        identifier = target.stable_id
+    else:
+        queryset = queryset.filter(change=target)
+        identifier = str(target.id)
+    queryset = queryset.select_related('author', 'section__entry', 'change').order_by('-created_at', '-id')
+    page_number, page_size = _page_params(request)
+    # Same clamping as Paginator.get_page, with the count and slice run on the async ORM.
+    total = await queryset.acount()
+    num_pages = max(1, -(-total // page_size))
+    page_number = min(max(page_number, 1), num_pages)
+    offset = (page_number - 1) * page_size
+    comments = [comment async for comment in queryset[offset:offset + page_size]]
+    return JsonResponse(
+        {
+            'results': [serialize_comment(comment, user, membership) for comment in comments],
+            'page': page_number,
+            'page_size': page_size,
+            'has_next': offset + page_size < total,
+            'total': total,
+            'target_type': target_type,
+            'target_id': identifier,
+        }
+    )
 
+
+def _create_comment(request: HttpRequest, project: Project, membership: ProjectMembership | None):
     if not request.user.is_authenticated:
         return JsonResponse({'error': 'auth required'}, status=401)
     if not membership:
@@ -561,6 +780,48 @@ def api_project_comment_delete(request: HttpRequest, project_id: int, comment_id
     return JsonResponse({'deleted': True})
 
 
+@require_http_methods(["GET"])
+def api_project_search(request: HttpRequest, project_id: int):
+    project = get_object_or_404(Project, id=project_id)
+    _membership, error = _membership_or_error(request, project, ProjectMembership.Role.VIEWER)
+    if error:
+        return error
+    query = (request.GET.get('q') or '').strip()
+    if not query:
+        return JsonResponse({'error': 'q is required'}, status=400)
+    try:
+        page_number = max(1, int(request.GET.get('page', 1)))
+    except (TypeError, ValueError):
+        page_number = 1
+    try:
+        page_size = int(request.GET.get('page_size', SEARCH_PAGE_SIZE))
+    except (TypeError, ValueError):
+        page_size = SEARCH_PAGE_SIZE
+    page_size = max(1, min(page_size, 100))
+    hits, has_next = search(project.id, query, page=page_number, page_size=page_size)
+    return JsonResponse(
+        {
+            'project': project_id,
+            'query': query,
+            'results': [
+                {
+                    'kind': hit.kind,
+                    'ref': hit.ref,
+                    'entry_id': hit.entry_id,
+                    'label': hit.label,
+                    'snippet': hit.snippet,
+                    'link': hit.link,
+                    'rank': round(hit.rank, 4),
+                }
+                for hit in hits
+            ],
+            'page': page_number,
+            'page_size': page_size,
+            'has_next': has_next,
+        }
+    )
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def api_change_vote(request: HttpRequest, change_id: int):
@@ -572,14 +833,9 @@ def api_change_vote(request: HttpRequest, change_id: int):
     val = int(data.get('value', 0))
     if val not in (-1, 0, 1):
         return JsonResponse({'error': 'invalid vote'}, status=400)
-    if val == 0:
-        Vote.objects.filter(user=request.user, target_type='change', target_id=patch.id).delete()
-    else:
-        Vote.objects.update_or_create(
-            user=request.user, target_type='change', target_id=patch.id, defaults={'value': val}
-        )
-    auto_merge()
-    return JsonResponse({'change': serialize_change(patch, request.user)})
+    cast_change_vote(patch, request.user, val)
+    request_merge_evaluation(patch)
+    return JsonResponse({'change': serialize_change(patch, request.user, current_vote=val)})
 
 
 @csrf_exempt
@@ -596,9 +852,78 @@ def api_change_merge(request: HttpRequest, change_id: int):
                 {
                     'error': 'change has not reached the merge threshold',
                     'required_yes_votes': required_yes,
-                    'current_yes_votes': Vote.objects.filter(target_type='change', target_id=patch.id, value__gt=0).count(),
+                    'current_yes_votes': patch.votes.filter(value__gt=0).count(),
                 },
                 status=400,
             )
-        apply_merge_core(patch)
+        merge_change(patch)
     return JsonResponse({'change': serialize_change(patch, request.user)})
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_project_import(request: HttpRequest, project_id: int):
+    """Owner-only document import.
+
+    Accepts either a JSON body (``content``, ``format``, ``replace``) or the raw document
+    with ``format``/``replace`` in the query string; raw bodies are streamed line by line.
+    """
+    project = get_object_or_404(Project, id=project_id)
+    _membership, error = _membership_or_error(request, project, ProjectMembership.Role.OWNER)
+    if error:
+        return error
+    entry = project.entries.order_by('id').first()
+    if not entry:
+        return JsonResponse({'error': 'project has no entry'}, status=400)
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b"{}")
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'invalid json'}, status=400)
+        lines = str(data.get('content') or '').splitlines()
+        fmt = data.get('format') or 'markdown'
+        replace = bool(data.get('replace'))
+    else:
+        lines = (raw.decode(request.encoding or 'utf-8', errors='replace') for raw in request)
+        fmt = request.GET.get('format') or 'markdown'
+        replace = request.GET.get('replace') in {'1', 'true', 'yes'}
+    if fmt not in IMPORT_FORMATS:
+        return JsonResponse({'error': f"format must be one of {', '.join(IMPORT_FORMATS)}"}, status=400)
+    try:
+        result = import_document(entry, lines, fmt=fmt, replace=replace)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    return JsonResponse(
+        {
+            'entry_id': entry.id,
+            'version': result.version,
+            'sections': result.sections,
+            'blocks': result.blocks,
+            'stale_changes': result.stale_changes,
+        },
+        status=201,
+    )
+
+
+@require_http_methods(["GET"])
+def api_cache_stats(request: HttpRequest):
+    """Per-namespace cache hit/miss counters for this worker process (staff only)."""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'auth required'}, status=401)
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'forbidden'}, status=403)
+    return JsonResponse({'namespaces': cache_stats()})
+
+
+@require_http_methods(["GET"])
+def api_metrics(request: HttpRequest):
+    """Prometheus text exposition of all worker processes (``METRICS_TOKEN`` bearer or staff)."""
+    token = settings.METRICS_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    authorized = bool(token) and hmac.compare_digest(header, f'Bearer {token}')
+    if not authorized:
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'auth required'}, status=401)
+        if not request.user.is_staff:
+            return JsonResponse({'error': 'forbidden'}, status=403)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,99 @@
+"""Cold archival of finished changes.
+
+Changes merged, or whose voting window closed, more than a retention period ago move
+from ``Change`` into ``ArchivedChange``: votes collapse into final yes/no tallies and
+comments are kept as read-only copies. The hot ``Change`` table (scanned by the changes
+list, ``auto_merge`` and the updates hub) then only holds recent and open work.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import timedelta
+from typing import Iterable, List
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import ActivityEvent, ArchivedChange, Change, ChangeVote, Comment, SearchDocument
+
+DEFAULT_RETENTION_DAYS = 90
+ARCHIVABLE_STATUSES = ('published', 'needs_update')
+
+
+def archivable_changes(days: int = DEFAULT_RETENTION_DAYS, now=None):
+    """Changes merged, or closed without merging, more than ``days`` ago."""
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    return Change.objects.filter(
+        Q(status='merged', merged_at__lt=cutoff)
+        | Q(status__in=ARCHIVABLE_STATUSES, closes_at__lt=cutoff)
+    )
+
+
+def _comment_copy(comment: Comment) -> dict:
+    author_name = 'Anonymous'
+    if comment.author_id and comment.author:
+        author_name = comment.author.get_full_name() or comment.author.get_username() or f"User {comment.author_id}"
+    return {
+        'id': comment.id,
+        'author_id': comment.author_id,
+        'author_name': author_name,
+        'body': comment.body,
+        'created_at': comment.created_at.isoformat(),
+        'updated_at': comment.updated_at.isoformat(),
+    }
+
+
+def archive_changes(change_ids: Iterable[int]) -> List[ArchivedChange]:
+    """Move the given changes to the archive in one transaction; returns the archived rows."""
+    change_ids = list(change_ids)
+    if not change_ids:
+        return []
+    with transaction.atomic():
+        changes = list(Change.objects.select_for_update().filter(id__in=change_ids))
+        change_ids = [change.id for change in changes]
+        tallies = {
+            row['change_id']: row
+            for row in ChangeVote.objects.filter(change_id__in=change_ids)
+            .values('change_id')
+            .annotate(yes=Count('id', filter=Q(value__gt=0)), no=Count('id', filter=Q(value__lt=0)))
+        }
+        comments = defaultdict(list)
+        comment_ids = []
+        for comment in Comment.objects.filter(change_id__in=change_ids).select_related('author').order_by('created_at', 'id'):
+            comments[comment.change_id].append(_comment_copy(comment))
+            comment_ids.append(comment.id)
+        archived = ArchivedChange.objects.bulk_create([
+            ArchivedChange(
+                id=change.id,
+                project_id=change.project_id,
+                target_entry_id=change.target_entry_id,
+                author_id=change.author_id,
+                summary=change.summary,
+                ops_json=change.ops_json,
+                affected_blocks=change.affected_blocks,
+                before_outline=change.before_outline,
+                after_outline=change.after_outline,
+                base_entry_version_int=change.base_entry_version_int,
+                status=change.status,
+                target_section_id=change.target_section_id,
+                yes_votes=tallies.get(change.id, {}).get('yes', 0),
+                no_votes=tallies.get(change.id, {}).get('no', 0),
+                comments=comments.get(change.id, []),
+                created_at=change.created_at,
+                published_at=change.published_at,
+                merged_at=change.merged_at,
+                closes_at=change.closes_at,
+            )
+            for change in changes
+        ])
+        # Feed entries outlive the comment rows; their summaries and links stay valid.
+        ActivityEvent.objects.filter(comment__change_id__in=change_ids).update(comment=None)
+        # Search documents are not foreign keys of the changes or comments, so drop the ones
+        # pointing at the rows deleted below here; their links would no longer resolve.
+        SearchDocument.objects.filter(
+            Q(kind=SearchDocument.Kind.CHANGE, ref__in=[str(change_id) for change_id in change_ids])
+            | Q(kind=SearchDocument.Kind.COMMENT, ref__in=[str(comment_id) for comment_id in comment_ids])
+        ).delete()
+        Change.objects.filter(id__in=change_ids).delete()
+    return archived
@@ -0,0 +1,399 @@
+"""Deterministic synthetic datasets for profiling and benchmarks (``manage.py seed_bench``).
+
+Every project gets a pool of members, one trunk entry with a deep section tree, a merged
+history whose op batches replay through the merge engine (``logic.run_ops``) onto the
+stored blocks, open proposals with votes, and comments. All randomness comes from one
+``random.Random(seed)``, so the same spec always produces the same documents, ops and
+votes. Rows are built in memory and written with ``bulk_create``: model ``save`` hooks do
+not run, so search documents and activity rollups are left to ``rebuild_search_index``
+and ``refresh_project_activity``.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, fields
+from datetime import timedelta
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .history import SNAPSHOT_INTERVAL, encode_snapshot
+from .logic import BlockState, run_ops
+from .models import (
+    Block,
+    Change,
+    ChangeVote,
+    Comment,
+    Entry,
+    EntryHistory,
+    Project,
+    ProjectActivity,
+    ProjectMembership,
+    Section,
+)
+
+DEFAULT_CHUNK_SIZE = 2000
+NAME_PREFIX = 'Bench'
+EDITOR_SHARE = 0.6
+NEEDS_UPDATE_SHARE = 0.15
+HISTORY_DAYS = 60
+
+WORDS = (
+    'access', 'agenda', 'amendment', 'approval', 'budget', 'charter', 'clause', 'committee',
+    'community', 'consensus', 'council', 'deadline', 'delegate', 'draft', 'election', 'evidence',
+    'funding', 'governance', 'guideline', 'housing', 'impact', 'initiative', 'library', 'mandate',
+    'meeting', 'member', 'motion', 'network', 'objective', 'outreach', 'oversight', 'policy',
+    'priority', 'procedure', 'program', 'proposal', 'quorum', 'record', 'report', 'resource',
+    'review', 'schedule', 'section', 'service', 'standard', 'statute', 'steward', 'survey',
+    'timeline', 'training', 'transit', 'treasury', 'update', 'volunteer', 'vote', 'workshop',
+)
+
+
+@dataclass
+class BenchSpec:
+    projects: int = 1
+    members: int = 25
+    blocks: int = 10_000
+    depth: int = 8
+    changes: int = 2_000
+    merged: float = 0.25
+    votes: int = 6
+    comments: int = 1_000
+    seed: int = 1
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+
+@dataclass
+class BenchResult:
+    users: int = 0
+    projects: int = 0
+    memberships: int = 0
+    blocks: int = 0
+    sections: int = 0
+    changes: int = 0
+    votes: int = 0
+    comments: int = 0
+    history: int = 0
+
+    @property
+    def rows(self) -> int:
+        return sum(getattr(self, f.name) for f in fields(self))
+
+    def add(self, other: 'BenchResult') -> None:
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+def project_name_prefix(seed: int) -> str:
+    return f'{NAME_PREFIX} {seed}-'
+
+
+def _sentence(rng: random.Random, low: int = 8, high: int = 24) -> str:
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return ' '.join(words).capitalize() + '.'
+
+
+def _paragraph(rng: random.Random) -> str:
+    return ' '.join(_sentence(rng) for _ in range(rng.randint(1, 4)))
+
+
+def _heading(rng: random.Random) -> str:
+    return ' '.join(rng.choices(WORDS, k=rng.randint(2, 5))).title()
+
+
+def build_document(rng: random.Random, target_blocks: int, max_depth: int) -> List[BlockState]:
+    """Pre-order block list of headings (nested up to ``max_depth``) with 1-4 paragraphs each."""
+    blocks: List[BlockState] = []
+    open_headings: List[str] = []
+    serial = 0
+    while len(blocks) < target_blocks:
+        deepest = min(max_depth, len(open_headings) + 1)
+        # Lean towards nesting deeper so the tree actually reaches ``max_depth``.
+        depth = deepest if rng.random() < 0.45 else rng.randint(1, deepest)
+        del open_headings[depth - 1:]
+        serial += 1
+        heading_id = f'h_s{serial}'
+        blocks.append(BlockState(
+            heading_id, 'h2', _heading(rng), open_headings[-1] if open_headings else None,
+            float(len(blocks) + 1), len(blocks) + 1,
+        ))
+        open_headings.append(heading_id)
+        for idx in range(1, rng.randint(1, 4) + 1):
+            blocks.append(BlockState(
+                f'p_s{serial}_{idx}', 'p', _paragraph(rng), heading_id, float(len(blocks) + 1), len(blocks) + 1,
+            ))
+    return blocks
+
+
+def _paragraphs_by_heading(blocks: Sequence[BlockState]) -> Dict[str, List[str]]:
+    out: Dict[str, List[str]] = {b.stable_id: [] for b in blocks if b.type == 'h2'}
+    for block in blocks:
+        if block.type != 'h2' and block.parent_stable_id in out:
+            out[block.parent_stable_id].append(block.stable_id)
+    return out
+
+
+def change_ops(
+    rng: random.Random, paragraphs: Dict[str, List[str]], headings: Sequence[str], serial: int
+) -> Tuple[str, List[dict], List[str]]:
+    """A section-scoped op batch like the editor produces: ``(heading id, ops, affected ids)``."""
+    heading_id = rng.choice(headings)
+    body = paragraphs[heading_id]
+    roll = rng.random()
+    if roll < 0.25 or not body:
+        anchor = body[-1] if body else heading_id
+        new_id = f'p_c{serial}'
+        ops = [{
+            'type': 'INSERT_BLOCK',
+            'after_id': anchor,
+            'new_block': {'id': new_id, 'type': 'p', 'text': _paragraph(rng), 'parent': heading_id},
+        }]
+        return heading_id, ops, [new_id]
+    if roll < 0.35 and len(body) > 1:
+        block_id = rng.choice(body)
+        return heading_id, [{'type': 'DELETE_BLOCK', 'block_id': block_id}], [block_id]
+    targets = rng.sample(body, k=min(len(body), rng.randint(1, 3)))
+    if rng.random() < 0.2:
+        targets.insert(0, heading_id)
+    ops = [
+        {'type': 'UPDATE_TEXT', 'block_id': bid, 'new_text': _heading(rng) if bid == heading_id else _paragraph(rng)}
+        for bid in targets
+    ]
+    return heading_id, ops, targets
+
+
+def _track(paragraphs: Dict[str, List[str]], ops: List[dict]) -> None:
+    """Keep ``paragraphs`` in step with a merged op batch."""
+    for op in ops:
+        if op['type'] == 'INSERT_BLOCK':
+            paragraphs[op['new_block']['parent']].append(op['new_block']['id'])
+        elif op['type'] == 'DELETE_BLOCK':
+            for body in paragraphs.values():
+                if op['block_id'] in body:
+                    body.remove(op['block_id'])
+                    break
+
+
+def _bulk_insert(rows: list, chunk_size: int, scope) -> list:
+    """``bulk_create`` ``rows``; backends that cannot return ids get them read back from ``scope``."""
+    if not rows:
+        return rows
+    created = type(rows[0]).objects.bulk_create(rows, batch_size=chunk_size)
+    if created[0].pk is None:
+        ids = list(scope.order_by('-id').values_list('id', flat=True)[:len(created)])[::-1]
+        for row, pk in zip(created, ids):
+            row.pk = pk
+    return created
+
+
+def _ensure_users(spec: BenchSpec) -> Tuple[list, int]:
+    User = get_user_model()
+    names = [f'bench{spec.seed}_{n:05d}' for n in range(max(1, spec.members))]
+    existing = {u.username: u for u in User.objects.filter(username__in=names)}
+    password = make_password(None)
+    missing = [User(username=name, password=password) for name in names if name not in existing]
+    for user in _bulk_insert(missing, spec.chunk_size, User.objects.filter(username__in=names)):
+        existing[user.username] = user
+    return [existing[name] for name in names], len(missing)
+
+
+def _write_sections(entry: Entry, blocks: Sequence[BlockState], chunk_size: int) -> int:
+    """``Section`` rows for the heading blocks, one ``bulk_create`` per depth level."""
+    headings = [b for b in blocks if b.type == 'h2']
+    bodies: Dict[str, List[str]] = {b.stable_id: [] for b in headings}
+    for block in blocks:
+        if block.type != 'h2' and block.parent_stable_id in bodies:
+            bodies[block.parent_stable_id].append(block.text)
+    depth: Dict[str, int] = {}
+    by_depth: Dict[int, List[BlockState]] = {}
+    for heading in headings:
+        depth[heading.stable_id] = depth.get(heading.parent_stable_id, 0) + 1
+        by_depth.setdefault(depth[heading.stable_id], []).append(heading)
+    position = {heading.stable_id: idx for idx, heading in enumerate(headings, start=1)}
+    section_ids: Dict[str, int] = {}
+    for level in sorted(by_depth):
+        rows = [
+            Section(
+                entry=entry,
+                stable_id=heading.stable_id[2:],
+                heading=heading.text[:300],
+                body='\n\n'.join(bodies[heading.stable_id]),
+                parent_id=section_ids.get(heading.parent_stable_id),
+                position=float(position[heading.stable_id]),
+            )
+            for heading in by_depth[level]
+        ]
+        created = _bulk_insert(rows, chunk_size, Section.objects.filter(entry=entry))
+        section_ids.update((f'h_{row.stable_id}', row.pk) for row in created)
+    return len(headings)
+
+
+def seed_project(spec: BenchSpec, index: int, users: list, rng: random.Random) -> BenchResult:
+    """Create one benchmark project with its entry, history, proposals, votes and comments."""
+    result = BenchResult(projects=1)
+    chunk = spec.chunk_size
+    now = timezone.now()
+    start = now - timedelta(days=HISTORY_DAYS)
+    project = Project(name=f'{project_name_prefix(spec.seed)}{index}', description=_sentence(rng))
+    _bulk_insert([project], chunk, Project.objects.all())
+    ProjectActivity.objects.bulk_create([ProjectActivity(project=project)])
+
+    editors = max(1, int(len(users) * EDITOR_SHARE))
+    memberships = [
+        ProjectMembership(
+            project=project,
+            user=user,
+            role=(
+                ProjectMembership.Role.OWNER if idx == 0
+                else ProjectMembership.Role.EDITOR if idx < editors
+                else ProjectMembership.Role.VIEWER
+            ),
+        )
+        for idx, user in enumerate(users)
+    ]
+    ProjectMembership.objects.bulk_create(memberships, batch_size=chunk)
+    ProjectMembership.forget_role_maps([project.id])
+    result.memberships = len(memberships)
+    voters = users[:editors]
+    required = project.required_yes_votes
+
+    blocks = build_document(rng, spec.blocks, spec.depth)
+    entry = Entry(project=project, title='Trunk', author=users[0], status='published', published_at=start)
+    _bulk_insert([entry], chunk, Entry.objects.filter(project=project))
+
+    paragraphs = _paragraphs_by_heading(blocks)
+    headings = list(paragraphs)
+    total = max(0, spec.changes)
+    merged_count = int(total * min(1.0, max(0.0, spec.merged)))
+    step = (now - start) / max(1, total)
+
+    changes: List[Change] = []
+    history: List[EntryHistory] = []
+    history_blocks: List[bytes | None] = [encode_snapshot(blocks)]
+    history_ops: List[list] = [[]]
+    for serial in range(1, merged_count + 1):
+        heading_id, ops, affected = change_ops(rng, paragraphs, headings, serial)
+        blocks, _changed, ops = run_ops(blocks, ops)
+        _track(paragraphs, ops)
+        version = serial + 1
+        history_ops.append(ops)
+        history_blocks.append(encode_snapshot(blocks) if version % SNAPSHOT_INTERVAL == 0 else None)
+        published_at = start + step * serial
+        changes.append(Change(
+            project=project,
+            target_entry=entry,
+            author=rng.choice(voters),
+            summary=_sentence(rng, 3, 8),
+            ops_json=ops,
+            affected_blocks=affected,
+            base_entry_version_int=serial,
+            status='merged',
+            target_section_id=heading_id[2:],
+            published_at=published_at,
+            merged_at=published_at + timedelta(hours=rng.randint(1, 20)),
+            closes_at=published_at + timedelta(hours=project.voting_duration_hours),
+        ))
+    version = merged_count + 1
+
+    for serial in range(merged_count + 1, total + 1):
+        heading_id, ops, affected = change_ops(rng, paragraphs, headings, serial)
+        stale = rng.random() < NEEDS_UPDATE_SHARE
+        published_at = start + step * serial
+        changes.append(Change(
+            project=project,
+            target_entry=entry,
+            author=rng.choice(voters),
+            summary=_sentence(rng, 3, 8),
+            ops_json=ops,
+            affected_blocks=affected,
+            base_entry_version_int=rng.randint(1, version) if stale else version,
+            status='needs_update' if stale else 'published',
+            target_section_id=heading_id[2:],
+            published_at=published_at,
+            closes_at=published_at + timedelta(hours=project.voting_duration_hours),
+        ))
+
+    Entry.objects.filter(id=entry.id).update(entry_version_int=version)
+    Block.objects.bulk_create(
+        [
+            Block(
+                entry=entry,
+                stable_id=b.stable_id,
+                type=b.type,
+                text=b.text,
+                parent_stable_id=b.parent_stable_id,
+                position=b.position,
+            )
+            for b in blocks
+        ],
+        batch_size=chunk,
+    )
+    result.blocks = len(blocks)
+    result.sections = _write_sections(entry, blocks, chunk)
+
+    _bulk_insert(changes, chunk, Change.objects.filter(project=project))
+    result.changes = len(changes)
+    for idx, (data, ops) in enumerate(zip(history_blocks, history_ops)):
+        history.append(EntryHistory(
+            entry=entry,
+            change=changes[idx - 1] if idx else None,
+            version_int=idx + 1,
+            ops_json=ops,
+            snapshot=data,
+        ))
+    EntryHistory.objects.bulk_create(history, batch_size=chunk)
+    result.history = len(history)
+
+    votes: List[ChangeVote] = []
+    for change in changes:
+        count = min(len(voters), max(0, round(rng.gauss(spec.votes, spec.votes / 3)))) if spec.votes > 0 else 0
+        if change.status == 'merged':
+            count = max(count, min(required, len(voters)))
+        # Open proposals stay just short of the threshold, as they would in a live project.
+        yes = count if change.status == 'merged' else min(count, required - 1, rng.randint(0, count))
+        for n, user in enumerate(rng.sample(voters, k=count)):
+            votes.append(ChangeVote(change=change, user=user, value=1 if n < yes else -1))
+        change.votes_cache_int = yes - (count - yes)
+        if len(votes) >= chunk:
+            ChangeVote.objects.bulk_create(votes, batch_size=chunk)
+            result.votes += len(votes)
+            votes = []
+    ChangeVote.objects.bulk_create(votes, batch_size=chunk)
+    result.votes += len(votes)
+    Change.objects.bulk_update(changes, ['votes_cache_int'], batch_size=chunk)
+
+    sections = list(Section.objects.filter(entry=entry).values_list('id', flat=True))
+    comments: List[Comment] = []
+    for _unused in range(max(0, spec.comments)):
+        on_change = bool(changes) and rng.random() < 0.4
+        comments.append(Comment(
+            project=project,
+            section_id=None if on_change else rng.choice(sections),
+            change=rng.choice(changes) if on_change else None,
+            author=rng.choice(users),
+            body=_paragraph(rng),
+        ))
+    Comment.objects.bulk_create(comments, batch_size=chunk)
+    result.comments = len(comments)
+    return result
+
+
+def seed_bench(spec: BenchSpec, progress: Callable[[int, BenchResult], None] | None = None) -> BenchResult:
+    """Generate ``spec.projects`` benchmark projects; ``progress`` is called after each one."""
+    from .caching import ROLLUPS
+
+    rng = random.Random(spec.seed)
+    total = BenchResult()
+    with transaction.atomic():
+        users, total.users = _ensure_users(spec)
+    for index in range(1, spec.projects + 1):
+        with transaction.atomic():
+            result = seed_project(spec, index, users, rng)
+        total.add(result)
+        if progress:
+            progress(index, result)
+    ROLLUPS.invalidate()
+    return total
@@ -0,0 +1,158 @@
+"""Shared cache layer on top of Django's configured ``default`` cache.
+
+Keys are namespaced and versioned: ``gmh:<namespace>:s<schema>[:g<generation>]:<parts>``.
+``schema`` is bumped in code when a namespace's payload shape changes; namespaces created
+with ``generational=True`` also carry a generation counter stored in the cache, so
+``invalidate()`` drops every key of the namespace at once without scanning the backend.
+``get_or_set`` recomputes a missing value in one worker at a time (single flight): the
+first caller takes a short lock via ``cache.add`` while the others poll for its result.
+Hits and misses are counted per namespace in-process and reported by ``cache_stats()``.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+from django.core.cache import cache
+
+KEY_PREFIX = 'gmh'
+DEFAULT_TIMEOUT = 60 * 60
+LOCK_TIMEOUT = 30
+WAIT_INTERVAL = 0.05
+WAIT_ATTEMPTS = 40
+
+_MISSING = object()
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+
+def _count(namespace: str, event: str) -> None:
+    with _stats_lock:
+        _stats[namespace][event] += 1
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Per-namespace counters for this process: hits, misses, computes, waits, invalidations."""
+    with _stats_lock:
+        return {name: dict(events) for name, events in _stats.items()}
+
+
+def reset_cache_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+class CacheNamespace:
+    def __init__(self, name: str, timeout: int | None = DEFAULT_TIMEOUT, schema: int = 1, generational: bool = False):
+        self.name = name
+        self.timeout = timeout
+        self.schema = schema
+        self.generational = generational
+
+    def _generation_key(self) -> str:
+        return f"{KEY_PREFIX}:{self.name}:generation"
+
+    def _generation(self) -> int:
+        return cache.get(self._generation_key()) or 1
+
+    def key(self, *parts: Any) -> str:
+        base = f"{KEY_PREFIX}:{self.name}:s{self.schema}"
+        if self.generational:
+            base = f"{base}:g{self._generation()}"
+        return ':'.join([base, *(str(part) for part in parts)])
+
+    def get(self, parts: Iterable[Any], default=None):
+        value = cache.get(self.key(*parts), _MISSING)
+        if value is _MISSING:
+            _count(self.name, 'misses')
+            return default
+        _count(self.name, 'hits')
+        return value
+
+    def set(self, parts: Iterable[Any], value, timeout: int | None = None) -> None:
+        cache.set(self.key(*parts), value, self.timeout if timeout is None else timeout)
+
+    def delete(self, parts: Iterable[Any]) -> None:
+        cache.delete(self.key(*parts))
+
+    def invalidate(self) -> None:
+        """Retire every key of a generational namespace by moving to the next generation."""
+        if not self.generational:
+            raise ValueError(f"Cache namespace {self.name!r} is not generational")
+        try:
+            cache.incr(self._generation_key())
+        except ValueError:
+            cache.set(self._generation_key(), 2, None)
+        _count(self.name, 'invalidations')
+
+    def get_or_set(self, parts: Iterable[Any], compute: Callable[[], Any], timeout: int | None = None):
+        """Cached value for ``parts``, computing it at most once across concurrent callers."""
+        key = self.key(*parts)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            _count(self.name, 'hits')
+            return value
+        _count(self.name, 'misses')
+        timeout = self.timeout if timeout is None else timeout
+        lock_key = f"{key}:lock"
+        if cache.add(lock_key, 1, LOCK_TIMEOUT):
+            try:
+                value = compute()
+                _count(self.name, 'computes')
+                cache.set(key, value, timeout)
+            finally:
+                cache.delete(lock_key)
+            return value
+        _count(self.name, 'waits')
+        for _attempt in range(WAIT_ATTEMPTS):
+            time.sleep(WAIT_INTERVAL)
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        # The lock holder is slow or gone; compute here rather than fail the request.
+        value = compute()
+        _count(self.name, 'computes')
+        cache.set(key, value, timeout)
+        return value
+
+    async def aget_or_set(self, parts: Iterable[Any], compute: Callable[[], Awaitable[Any]], timeout: int | None = None):
+        """``get_or_set`` for async views: ``compute`` is awaited and waiters yield to the loop."""
+        key = self.key(*parts)
+        value = await cache.aget(key, _MISSING)
+        if value is not _MISSING:
+            _count(self.name, 'hits')
+            return value
+        _count(self.name, 'misses')
+        timeout = self.timeout if timeout is None else timeout
+        lock_key = f"{key}:lock"
+        if await cache.aadd(lock_key, 1, LOCK_TIMEOUT):
+            try:
+                value = await compute()
+                _count(self.name, 'computes')
+                await cache.aset(key, value, timeout)
+            finally:
+                await cache.adelete(lock_key)
+            return value
+        _count(self.name, 'waits')
+        for _attempt in range(WAIT_ATTEMPTS):
+            await asyncio.sleep(WAIT_INTERVAL)
+            value = await cache.aget(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        value = await compute()
+        _count(self.name, 'computes')
+        await cache.aset(key, value, timeout)
+        return value
+
+
+# Entry payloads, render bundles and historical checkouts (keys carry the entry version).
+ENTRIES = CacheNamespace('entries', timeout=DEFAULT_TIMEOUT)
+# build_section_index results per entry version.
+SECTION_INDEXES = CacheNamespace('section-indexes', timeout=DEFAULT_TIMEOUT)
+# {user_id: role} per project; dropped whenever a membership is saved or deleted.
+ROLE_MAPS = CacheNamespace('role-maps', timeout=5 * 60)
+# Home page activity rows; any rollup write moves the namespace to a new generation.
+ROLLUPS = CacheNamespace('rollups', timeout=60, generational=True)
@@ -0,0 +1,195 @@
+"""Live project events for the ``/api/projects/<id>/events`` server-sent events stream.
+
+Writers call ``publish`` inside their transaction, which appends a ``ProjectEvent`` row.
+Each worker process runs one ``EventBus``: while it has subscribers it reads the rows
+of all subscribed projects once per tick and fans them out to the subscribers' queues,
+so N open pages cost one poll per process rather than N clients x M polling endpoints.
+Rows are kept for ``EVENT_RETENTION`` so a reconnecting client can resume from
+``Last-Event-ID``; ``manage.py prune_project_events`` deletes older ones and must be
+scheduled.
+
+Ids are assigned at insert but become visible at commit, so a row can appear below a
+cursor that has already moved past it. Each poll is therefore two queries: the last
+``REORDER_WINDOW`` of rows below the cursor (delivering the ones not seen yet), then
+the rows added since the cursor.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ProjectEvent
+
+TICK_SECONDS = 1.0
+HEARTBEAT_SECONDS = 15.0
+STREAM_MAX_SECONDS = 5 * 60
+RETRY_MILLISECONDS = 3000
+POLL_BATCH_SIZE = 500
+REPLAY_LIMIT = 200
+QUEUE_SIZE = 1000
+EVENT_RETENTION = timedelta(days=1)
+# Longest writer transaction whose events are still delivered after a later id was read.
+REORDER_WINDOW = timedelta(seconds=30)
+
+
+def publish(project_id: int, kind: str, **payload) -> ProjectEvent:
+    return ProjectEvent.objects.create(project_id=project_id, kind=kind, payload=payload)
+
+
+def prune_events(older_than: timedelta = EVENT_RETENTION, now=None) -> int:
+    deleted, _ = ProjectEvent.objects.filter(created_at__lt=(now or timezone.now()) - older_than).delete()
+    return deleted
+
+
+def format_event(event: ProjectEvent, last_id: int | None = None) -> str:
+    """SSE frame; ``last_id`` keeps ``Last-Event-ID`` from moving back for late events."""
+    data = json.dumps({'id': event.id, 'kind': event.kind, **event.payload}, separators=(',', ':'))
+    return f"id: {last_id or event.id}\nevent: {event.kind}\ndata: {data}\n\n"
+
+
+class EventBus:
+    """Per-process fan-out of ``ProjectEvent`` rows to asyncio subscriber queues.
+
+    Polling runs on one dedicated thread so the bus holds a single database connection
+    no matter how many streams are open. A subscriber that falls ``QUEUE_SIZE`` events
+    behind is dropped (its queue receives ``None``) and reconnects with ``Last-Event-ID``.
+    """
+
+    def __init__(self, tick: float = TICK_SECONDS):
+        self.tick = tick
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._cursor = 0
+        self._seen: Dict[int, datetime] = {}  # ids at or below the cursor inside the window
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='event-bus')
+
+    def _run_sync(self, func, *args):
+        return sync_to_async(func, thread_sensitive=False, executor=self._executor)(*args)
+
+    @staticmethod
+    def _latest_id() -> int:
+        return ProjectEvent.objects.aggregate(top=Max('id'))['top'] or 0
+
+    @staticmethod
+    def _fetch(cursor: int, since: datetime, project_ids: List[int]) -> List[ProjectEvent]:
+        """Rows past ``cursor`` plus the window's rows below it, in id order."""
+        events = ProjectEvent.objects.filter(project_id__in=project_ids)
+        late = list(events.filter(id__lte=cursor, created_at__gte=since).order_by('id'))
+        return late + list(events.filter(id__gt=cursor).order_by('id')[:POLL_BATCH_SIZE])
+
+    @staticmethod
+    def _window(cursor: int, since: datetime, project_id: int) -> Dict[int, datetime]:
+        return dict(
+            ProjectEvent.objects.filter(project_id=project_id, id__lte=cursor, created_at__gte=since)
+            .values_list('id', 'created_at')
+        )
+
+    async def subscribe(self, project_id: int) -> Tuple[asyncio.Queue, int]:
+        """Register a queue for ``project_id``; returns it with the cursor it starts after."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A fresh event loop (new worker, or a test) cannot reuse the old loop's state.
+            self._subscribers = defaultdict(set)
+            self._task = None
+            self._loop = loop
+        if self._task is None:
+            self._cursor = await self._run_sync(self._latest_id)
+            self._seen = {}
+        if project_id not in self._subscribers:
+            # Rows already committed before the project was followed are history, not late.
+            since = timezone.now() - REORDER_WINDOW
+            window = await self._run_sync(self._window, self._cursor, since, project_id)
+            self._seen.update(window)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers[project_id].add(queue)
+        if self._task is None:
+            self._task = loop.create_task(self._run())
+        return queue, self._cursor
+
+    def unsubscribe(self, project_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(project_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[project_id]
+
+    async def _run(self) -> None:
+        try:
+            while self._subscribers:
+                await asyncio.sleep(self.tick)
+                await self.poll()
+        finally:
+            self._task = None
+
+    async def poll(self) -> int:
+        """Read new and late events for every subscribed project (two queries) and enqueue them."""
+        project_ids = list(self._subscribers)
+        if not project_ids:
+            return 0
+        since = timezone.now() - REORDER_WINDOW
+        events = await self._run_sync(self._fetch, self._cursor, since, project_ids)
+        self._seen = {event_id: at for event_id, at in self._seen.items() if at >= since}
+        delivered = 0
+        for event in events:
+            if event.id in self._seen:
+                continue
+            self._seen[event.id] = event.created_at
+            self._cursor = max(self._cursor, event.id)
+            delivered += 1
+            for queue in list(self._subscribers.get(event.project_id, ())):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(None)
+                    self.unsubscribe(event.project_id, queue)
+        return delivered
+
+
+bus = EventBus()
+
+
+async def event_stream(project_id: int, after_id: int = 0, max_seconds: float = STREAM_MAX_SECONDS) -> AsyncIterator[str]:
+    """SSE frames for ``project_id``: a replay after ``after_id``, then live events.
+
+    The stream ends after ``max_seconds``; ``EventSource`` reconnects on its own and
+    resumes from the last id it saw.
+    """
+    queue, cursor = await bus.subscribe(project_id)
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        sent = after_id
+        replayed: Set[int] = set()
+        if after_id:
+            replay = ProjectEvent.objects.filter(project_id=project_id, id__gt=after_id, id__lte=cursor)
+            async for event in replay.order_by('id')[:REPLAY_LIMIT]:
+                sent = event.id
+                replayed.add(event.id)
+                yield format_event(event)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_seconds
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=min(HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                break
+            if event.id in replayed:
+                continue
+            sent = max(sent, event.id)
+            yield format_event(event, last_id=sent)
+    finally:
+        bus.unsubscribe(project_id, queue)
@@ -0,0 +1,222 @@
+"""Streaming import of Markdown / plain-text documents into an entry's blocks and sections.
+
+Headings (``#`` .. ``######``) become ``h2`` blocks nested through ``parent_stable_id`` by
+heading level; the paragraphs under a heading become ``p`` blocks and the matching
+``Section.body``. Input is consumed line by line and written in fixed-size batches, so
+memory stays bounded by the batch size and the heading depth, not the document length.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.db import transaction
+from django.db.models import F, Max
+
+from .history import record_version
+from .models import Block, Change, Comment, Entry, Section
+from .search import reindex_entry
+
+DEFAULT_CHUNK_SIZE = 500
+FORMATS = ('markdown', 'text')
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+# Level for the implicit section holding text before the first heading; any heading closes it.
+PREAMBLE_LEVEL = 7
+
+
+@dataclass
+class ParsedSection:
+    """One heading and its body paragraphs, yielded in document (pre-)order."""
+
+    path: Tuple[int, ...]
+    heading: str
+    paragraphs: List[str] = field(default_factory=list)
+
+    @property
+    def depth(self) -> int:
+        return len(self.path)
+
+    @property
+    def parent_path(self) -> Tuple[int, ...] | None:
+        return self.path[:-1] or None
+
+
+@dataclass
+class ImportResult:
+    sections: int = 0
+    blocks: int = 0
+    version: int = 0
+    stale_changes: int = 0
+
+
+def parse_document(lines: Iterable[str], fmt: str = 'markdown', default_heading: str = 'Introduction') -> Iterator[ParsedSection]:
+    """Yield sections from ``lines``; text before the first heading lands under ``default_heading``.
+
+    In ``text`` format no line is treated as a heading, so every paragraph belongs to the
+    default section.
+    """
+    stack: List[Tuple[int, ParsedSection]] = []  # (markdown level, section) of open ancestors
+    child_counts: Dict[Tuple[int, ...], int] = {(): 0}
+    current: ParsedSection | None = None
+    paragraph: List[str] = []
+
+    def open_section(level: int, heading: str) -> ParsedSection:
+        while stack and stack[-1][0] >= level:
+            closed = stack.pop()[1]
+            child_counts.pop(closed.path, None)
+        parent_path = stack[-1][1].path if stack else ()
+        child_counts[parent_path] += 1
+        section = ParsedSection(path=parent_path + (child_counts[parent_path],), heading=heading)
+        child_counts[section.path] = 0
+        stack.append((level, section))
+        return section
+
+    def flush_paragraph():
+        nonlocal current
+        if not paragraph:
+            return
+        if current is None:
+            current = open_section(PREAMBLE_LEVEL, default_heading)
+        current.paragraphs.append('\n'.join(paragraph))
+        paragraph.clear()
+
+    for raw in lines:
+        line = raw.rstrip('\r\n')
+        match = HEADING_RE.match(line) if fmt == 'markdown' else None
+        if match:
+            flush_paragraph()
+            if current is not None:
+                yield current
+            current = open_section(len(match.group(1)), match.group(2).strip() or 'Untitled section')
+        elif line.strip():
+            paragraph.append(line.strip())
+        else:
+            flush_paragraph()
+    flush_paragraph()
+    if current is not None:
+        yield current
+
+
+def _stable_suffix(namespace: str, path: Tuple[int, ...], kind: str) -> str:
+    key = f"{namespace}|{kind}|{'.'.join(str(p) for p in path)}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+
+def import_document(
+    entry: Entry,
+    lines: Iterable[str],
+    fmt: str = 'markdown',
+    replace: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    namespace: str | None = None,
+) -> ImportResult:
+    """Append (or, with ``replace``, substitute) the parsed document to ``entry``.
+
+    Stable ids are derived from ``namespace`` (default: entry id + version) and each
+    section's numbering path, so re-running the same import is deterministic. The entry
+    version is bumped once at the end so cached payloads are rebuilt.
+
+    ``replace`` deletes the entry's sections, which would cascade to their comments, so it
+    raises ``ValueError`` while any section of the entry has comments. The entry's open
+    changes point at the deleted blocks, so they are flagged ``needs_update`` as a merge
+    would.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+    namespace = namespace or f"{entry.id}:{entry.entry_version_int}"
+    chunk_size = max(1, chunk_size)
+    result = ImportResult()
+
+    with transaction.atomic():
+        if replace:
+            if Comment.objects.filter(section__entry=entry).exists():
+                raise ValueError('Cannot replace an entry whose sections have comments.')
+            Section.objects.filter(entry=entry).delete()
+            Block.objects.filter(entry=entry).delete()
+            result.stale_changes = Change.objects.filter(target_entry=entry, status='published').update(
+                status='needs_update'
+            )
+        position = (entry.blocks.aggregate(top=Max('position'))['top'] or 0) + 1
+        section_position = (entry.sections.aggregate(top=Max('position'))['top'] or 0) + 1
+        # Primary keys of sections that may still receive children: bounded by heading depth.
+        ancestor_pks: Dict[Tuple[int, ...], int] = {}
+        pending: List[ParsedSection] = []
+
+        def flush():
+            nonlocal position, section_position
+            if not pending:
+                return
+            blocks: List[Block] = []
+            by_depth: Dict[int, List[Tuple[ParsedSection, Section]]] = {}
+            for parsed in pending:
+                heading_id = f"h_{_stable_suffix(namespace, parsed.path, 'h')}"
+                parent_heading = (
+                    f"h_{_stable_suffix(namespace, parsed.parent_path, 'h')}" if parsed.parent_path else None
+                )
+                blocks.append(Block(
+                    entry=entry,
+                    stable_id=heading_id,
+                    type='h2',
+                    text=parsed.heading,
+                    parent_stable_id=parent_heading,
+                    position=position,
+                ))
+                position += 1
+                for idx, text in enumerate(parsed.paragraphs, start=1):
+                    blocks.append(Block(
+                        entry=entry,
+                        stable_id=f"p_{_stable_suffix(namespace, parsed.path + (idx,), 'p')}",
+                        type='p',
+                        text=text,
+                        parent_stable_id=heading_id,
+                        position=position,
+                    ))
+                    position += 1
+                section = Section(
+                    entry=entry,
+                    stable_id=heading_id[2:],
+                    heading=parsed.heading[:300],
+                    body='\n\n'.join(parsed.paragraphs),
+                    position=section_position,
+                )
+                section_position += 1
+                by_depth.setdefault(parsed.depth, []).append((parsed, section))
+            for depth in sorted(by_depth):
+                rows = by_depth[depth]
+                for parsed, section in rows:
+                    section.parent_id = ancestor_pks.get(parsed.parent_path) if parsed.parent_path else None
+                created = Section.objects.bulk_create([section for _parsed, section in rows])
+                if any(section.pk is None for section in created):
+                    ids = dict(
+                        Section.objects.filter(entry=entry, stable_id__in=[s.stable_id for s in created])
+                        .values_list('stable_id', 'id')
+                    )
+                    for section in created:
+                        section.pk = ids.get(section.stable_id)
+                for parsed, section in rows:
+                    ancestor_pks[parsed.path] = section.pk
+            Block.objects.bulk_create(blocks, batch_size=chunk_size)
+            result.sections += len(pending)
+            result.blocks += len(blocks)
+            # Only the last section's ancestors (and itself) can parent later sections.
+            last = pending[-1].path
+            keep = {last[:i] for i in range(1, len(last) + 1)}
+            for path in list(ancestor_pks):
+                if path not in keep:
+                    ancestor_pks.pop(path)
+            pending.clear()
+
+        for parsed in parse_document(lines, fmt):
+            pending.append(parsed)
+            if len(pending) >= chunk_size:
+                flush()
+        flush()
+
+        Entry.objects.filter(id=entry.id).update(entry_version_int=F('entry_version_int') + 1)
+        entry.refresh_from_db(fields=['entry_version_int'])
+        record_version(entry, snapshot=True)
+        reindex_entry(entry)
+        result.version = entry.entry_version_int
+    return result
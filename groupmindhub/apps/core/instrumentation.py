@@ -0,0 +1,127 @@
+"""Per-request query and latency accounting.
+
+``QueryStats`` is installed with ``connection.execute_wrapper`` for the duration of a
+request (see ``middleware.RequestMetricsMiddleware``) or a test (see
+``tests.budgets``). It counts queries, sums their time and groups them by SQL shape,
+that is the statement with literals and parameter lists collapsed, so an N+1 shows
+up as one shape repeated N times.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def sql_shape(sql: str) -> str:
+    """``sql`` with literals replaced by ``?`` and ``IN (...)`` lists collapsed."""
+    shape = _STRING_RE.sub('?', sql)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = shape.replace('%s', '?')
+    shape = _IN_LIST_RE.sub('(...)', shape)
+    return _SPACE_RE.sub(' ', shape).strip()
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    sql_seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - started
+            self.count += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def repeated_shapes(self, limit: int = 5) -> List[Tuple[str, int]]:
+        """Most frequent SQL shapes issued more than once."""
+        return [(shape, n) for shape, n in self.shapes.most_common(limit) if n > 1]
+
+
+_query_scopes: ContextVar[tuple] = ContextVar('query_scopes', default=())
+
+
+class _ScopedWrapper:
+    """Passes queries to ``wrapper`` only when they run in the context that installed it."""
+
+    def __init__(self, wrapper):
+        self.wrapper = wrapper
+
+    def __call__(self, execute, sql, params, many, context):
+        if self in _query_scopes.get():
+            return self.wrapper(execute, sql, params, many, context)
+        return execute(sql, params, many, context)
+
+
+@asynccontextmanager
+async def aexecute_wrapper(wrapper):
+    """``connection.execute_wrapper`` for async request handling.
+
+    Async views run their ORM calls through ``sync_to_async`` on another thread with its
+    own connection, so ``wrapper`` is installed on that connection as well as this
+    thread's. Both threads are shared by concurrent requests; the context variable set
+    here travels into ``sync_to_async`` calls and keeps other requests' queries out;
+    nested wrappers (metrics around a profiled request) each see the queries.
+    """
+    scoped = _ScopedWrapper(wrapper)
+    token = _query_scopes.set(_query_scopes.get() + (scoped,))
+
+    def install():
+        if scoped not in connection.execute_wrappers:
+            connection.execute_wrappers.append(scoped)
+
+    def uninstall():
+        if scoped in connection.execute_wrappers:
+            connection.execute_wrappers.remove(scoped)
+
+    install()
+    await sync_to_async(install)()
+    try:
+        yield scoped
+    finally:
+        await sync_to_async(uninstall)()
+        uninstall()
+        _query_scopes.reset(token)
+
+
+# Process-local totals per view name, read by monitoring.
+_totals_lock = threading.Lock()
+_view_totals: Dict[str, Dict[str, float]] = defaultdict(
+    lambda: {'requests': 0, 'queries': 0, 'sql_seconds': 0.0, 'wall_seconds': 0.0}
+)
+
+
+def record_view(view_name: str, stats: QueryStats, wall_seconds: float) -> None:
+    with _totals_lock:
+        totals = _view_totals[view_name]
+        totals['requests'] += 1
+        totals['queries'] += stats.count
+        totals['sql_seconds'] += stats.sql_seconds
+        totals['wall_seconds'] += wall_seconds
+
+
+def view_stats() -> Dict[str, Dict[str, float]]:
+    with _totals_lock:
+        return {name: dict(totals) for name, totals in _view_totals.items()}
+
+
+def reset_view_stats() -> None:
+    with _totals_lock:
+        _view_totals.clear()
@@ -0,0 +1,149 @@
+"""Database-backed background jobs.
+
+Request handlers ``enqueue`` work (a ``Job`` row written in their own transaction, so
+a rolled-back request never leaves a job behind); ``manage.py run_worker`` claims due
+jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` and runs them on a thread pool. Jobs
+with the same ``serialization_key`` run one at a time and in queue order, failures are
+retried with exponential backoff up to ``max_attempts``.
+
+Handlers register with ``@handler('kind')`` next to the code they drive (``logic``,
+``activity``). With ``settings.JOBS_EAGER`` (development and tests) ``enqueue`` runs the
+handler inline instead, in its own atomic block like the worker, which keeps the old
+request-time behaviour without a worker.
+"""
+from __future__ import annotations
+
+import logging
+import traceback
+from datetime import timedelta
+from importlib import import_module
+from typing import Callable, Dict, List
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLER_MODULES = ('groupmindhub.apps.core.logic', 'groupmindhub.apps.core.activity')
+BACKOFF_SECONDS = 2
+MAX_BACKOFF_SECONDS = 300
+STALE_AFTER = timedelta(minutes=10)
+
+_handlers: Dict[str, Callable[..., None]] = {}
+
+
+def handler(kind: str):
+    """Register the decorated function as the runner for jobs of ``kind``."""
+
+    def register(func):
+        _handlers[kind] = func
+        return func
+
+    return register
+
+
+def get_handler(kind: str) -> Callable[..., None]:
+    if kind not in _handlers:
+        for module in HANDLER_MODULES:
+            import_module(module)
+    return _handlers[kind]
+
+
+def enqueue(kind: str, key: str = '', dedupe: bool = False, max_attempts: int = 5, **payload) -> Job | None:
+    """Queue ``kind(**payload)``; with ``dedupe`` an identical job still waiting is reused."""
+    if getattr(settings, 'JOBS_EAGER', False):
+        # Same transaction boundary as ``run_job``, so handlers may lock rows either way.
+        with transaction.atomic():
+            get_handler(kind)(**payload)
+        return None
+    if dedupe:
+        existing = Job.objects.filter(
+            kind=kind, serialization_key=key, payload=payload, status=Job.Status.QUEUED
+        ).first()
+        if existing:
+            return existing
+    return Job.objects.create(kind=kind, serialization_key=key, payload=payload, max_attempts=max_attempts)
+
+
+def claim_jobs(worker: str, limit: int, now=None) -> List[Job]:
+    """Lock up to ``limit`` due jobs for ``worker``, at most one per serialization key.
+
+    Only the head of each key (its oldest queued or running job) can be claimed. Rows
+    another worker has locked are skipped, and the next job of that key is not a head
+    until the locked one is finished. So two workers claiming at once never take the
+    same key, and concurrent workers never block on each other.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        heads = (
+            Job.objects.filter(
+                serialization_key=OuterRef('serialization_key'), status__in=[Job.Status.QUEUED, Job.Status.RUNNING]
+            )
+            .order_by('id')
+            .values('id')[:1]
+        )
+        claimed = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_after__lte=now)
+            .filter(Q(serialization_key='') | Q(id=Subquery(heads)))
+            .order_by('run_after', 'id')[:limit]
+        )
+        for job in claimed:
+            job.status = Job.Status.RUNNING
+            job.attempts += 1
+            job.locked_at = now
+            job.locked_by = worker
+        Job.objects.bulk_update(claimed, ['status', 'attempts', 'locked_at', 'locked_by'])
+    return claimed
+
+
+def run_job(job: Job) -> bool:
+    """Run a claimed job; returns whether it succeeded. Failures are rescheduled or parked.
+
+    The job row is deleted in the handler's transaction, so a job never stays ``running``
+    after its work committed.
+    """
+    try:
+        with transaction.atomic():
+            get_handler(job.kind)(**job.payload)
+            Job.objects.filter(id=job.id).delete()
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s (%s) failed on attempt %s', job.id, job.kind, job.attempts, exc_info=True)
+        if job.attempts >= job.max_attempts:
+            Job.objects.filter(id=job.id).update(status=Job.Status.FAILED, last_error=error, locked_at=None)
+        else:
+            delay = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS ** job.attempts)
+            Job.objects.filter(id=job.id).update(
+                status=Job.Status.QUEUED,
+                run_after=timezone.now() + timedelta(seconds=delay),
+                last_error=error,
+                locked_at=None,
+                locked_by='',
+            )
+        return False
+    return True
+
+
+def requeue_stale(older_than: timedelta = STALE_AFTER, now=None) -> int:
+    """Put back jobs whose worker died mid-run (still ``running`` after ``older_than``)."""
+    cutoff = (now or timezone.now()) - older_than
+    return Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.Status.QUEUED, locked_at=None, locked_by=''
+    )
+
+
+def run_pending(worker: str = 'inline', limit: int = 100) -> int:
+    """Claim and run due jobs in this thread until none are left; returns how many ran."""
+    ran = 0
+    while ran < limit:
+        jobs = claim_jobs(worker, 1)
+        if not jobs:
+            break
+        run_job(jobs[0])
+        ran += 1
+    return ran
@@ -3,12 +3,21 @@
 This mirrors the prototype's applyOps + autoMerge behavior in Python.
 """
 from __future__ import annotations
+import time
 import uuid
 from collections import defaultdict
 from dataclasses import dataclass
+from datetime import timedelta
 from typing import Dict, Iterable, List, Any
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, DateTimeField, ExpressionWrapper, F, Max, Q
 from django.utils import timezone
-from .models import Block, Change, Entry, Vote, EntryHistory
+from .caching import SECTION_INDEXES
+from .events import publish
+from .jobs import enqueue, handler
+from .metrics import MERGE_DURATION, MERGE_OPS, NEEDS_UPDATE, VOTE_TO_MERGE
+from .models import Block, Change, ChangeVote, Entry, Project, ProjectEvent, Section
 
 
 @dataclass
@@ -90,6 +99,17 @@ def build_section_index(entry: Entry, blocks: List[Block] | None = None) -> Sect
     return SectionIndex(sections_by_section, sections_by_heading)
 
 
+def cached_section_index(entry: Entry) -> SectionIndex:
+    """``build_section_index`` for the entry's current version, shared via the cache."""
+    return SECTION_INDEXES.get_or_set((entry.id, f"v{entry.entry_version_int}"), lambda: build_section_index(entry))
+
+
+async def acached_section_index(entry: Entry) -> SectionIndex:
+    return await SECTION_INDEXES.aget_or_set(
+        (entry.id, f"v{entry.entry_version_int}"), sync_to_async(lambda: build_section_index(entry))
+    )
+
+
 def outline(blocks: List[Block]) -> str:
     if not blocks:
         return ""
@@ -108,9 +128,35 @@ def outline(blocks: List[Block]) -> str:
     return "\n".join(lines)
 
 
-def apply_ops(entry: Entry, ops: List[Dict[str, Any]]):
-    blocks = list(entry.blocks.order_by('position', 'id'))
+@dataclass
+class BlockState:
+    """In-memory block the op engine works on, loaded from ``Block`` rows or a history snapshot."""
+
+    stable_id: str
+    type: str
+    text: str
+    parent_stable_id: str | None
+    position: float
+    order_key: int = 0  # breaks position ties the way the primary key does for rows
+
+    @classmethod
+    def from_block(cls, block: Block) -> 'BlockState':
+        return cls(block.stable_id, block.type, block.text, block.parent_stable_id, block.position, block.pk or 0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'id': self.stable_id, 'type': self.type, 'text': self.text, 'parent': self.parent_stable_id}
+
+
+def run_ops(blocks: List[BlockState], ops: List[Dict[str, Any]]):
+    """Apply ``ops`` to ``blocks`` in memory; the merge engine shared by merges and history replay.
+
+    ``blocks`` must be in document order and is mutated in place. Returns the resulting
+    blocks in document order with positions normalized to 1..n, the ids of changed blocks,
+    and the op batch with generated block ids filled in so replaying it is deterministic.
+    """
     by_id = {b.stable_id: b for b in blocks}
+    next_key = max((b.order_key for b in blocks), default=0) + 1
+
     def new_position(after_id):
         if after_id is None:
             # insert at start
@@ -126,6 +172,7 @@ def apply_ops(entry: Entry, ops: List[Dict[str, Any]]):
         return (anchor.position + next_pos) / 2.0
 
     changed_ids = set()
+    resolved_ops: List[Dict[str, Any]] = []
     for op in ops:
         t = op.get('type')
         if t == 'UPDATE_TEXT':
@@ -133,7 +180,6 @@ def apply_ops(entry: Entry, ops: List[Dict[str, Any]]):
             b = by_id.get(bid)
             if b:
                 b.text = op.get('new_text', b.text)
-                b.save()
                 changed_ids.add(bid)
         elif t == 'INSERT_BLOCK':
             after_id = op.get('after_id')
@@ -143,62 +189,192 @@ def apply_ops(entry: Entry, ops: List[Dict[str, Any]]):
             if not stable_id:
                 prefix = 'h_' if block_type == 'h2' else 'b_'
                 stable_id = f"{prefix}{uuid.uuid4().hex[:12]}"
-            pos = new_position(after_id)
-            b = Block.objects.create(
-                entry=entry,
+                op = {**op, 'new_block': {**new_block, 'id': stable_id}}
+            b = BlockState(
                 stable_id=stable_id,
                 type=block_type,
                 text=new_block.get('text', ''),
                 parent_stable_id=new_block.get('parent') or None,
-                position=pos,
+                position=new_position(after_id),
+                order_key=next_key,
             )
+            next_key += 1
             blocks.append(b)
             by_id[stable_id] = b
             changed_ids.add(stable_id)
         elif t == 'DELETE_BLOCK':
             bid = op.get('block_id')
-            b = by_id.get(bid)
-            if b:
-                b.delete()
-                by_id.pop(bid, None)
-                blocks = [x for x in blocks if x.stable_id != bid]
+            if by_id.pop(bid, None):
+                blocks[:] = [x for x in blocks if x.stable_id != bid]
         elif t == 'MOVE_BLOCK':
             bid = op.get('block_id')
             after_id = op.get('after_id')
             b = by_id.get(bid)
             if b:
                 new_parent = op.get('new_parent')
-                update_fields = ['position']
                 if new_parent == '':
                     new_parent = None
                 if new_parent is not None and new_parent != b.parent_stable_id:
                     b.parent_stable_id = new_parent
-                    update_fields.append('parent_stable_id')
                 b.position = new_position(after_id)
-                b.save(update_fields=update_fields)
                 changed_ids.add(bid)
+        resolved_ops.append(op)
 
     # Re-normalize positions to simple integers
-    ordered = list(entry.blocks.order_by('position', 'id'))
+    ordered = sorted(blocks, key=lambda b: (b.position, b.order_key))
     for i, b in enumerate(ordered):
-        if b.position != i + 1:
-            b.position = i + 1
-            b.save(update_fields=['position'])
-    return changed_ids
+        b.position = i + 1
+    return ordered, changed_ids, resolved_ops
+
+
+def _apply_ops(entry: Entry, ops: List[Dict[str, Any]]):
+    """Run ``ops`` through the engine against the entry's rows and persist only the difference.
+
+    Returns the engine's result plus the stable ids of the blocks that were deleted.
+    """
+    rows = list(entry.blocks.order_by('position', 'id'))
+    before = {b.stable_id: b for b in rows}
+    ordered, changed_ids, resolved_ops = run_ops([BlockState.from_block(b) for b in rows], ops)
+    kept = {b.stable_id for b in ordered}
+    removed = [b for b in rows if b.stable_id not in kept]
+    if removed:
+        Block.objects.filter(pk__in=[b.pk for b in removed]).delete()
+    updates, created = [], []
+    for state in ordered:
+        row = before.get(state.stable_id)
+        if row is None:
+            created.append(Block(
+                entry=entry,
+                stable_id=state.stable_id,
+                type=state.type,
+                text=state.text,
+                parent_stable_id=state.parent_stable_id,
+                position=state.position,
+            ))
+            continue
+        fields = (state.type, state.text, state.parent_stable_id, state.position)
+        if (row.type, row.text, row.parent_stable_id, row.position) != fields:
+            row.type, row.text, row.parent_stable_id, row.position = fields
+            updates.append(row)
+    if updates:
+        Block.objects.bulk_update(updates, ['type', 'text', 'parent_stable_id', 'position'])
+    if created:
+        Block.objects.bulk_create(created)
+    return ordered, changed_ids, resolved_ops, {b.stable_id for b in removed}
+
+
+def apply_ops(entry: Entry, ops: List[Dict[str, Any]]):
+    return _apply_ops(entry, ops)[1]
+
+
+def sync_sections(entry: Entry, blocks: List[BlockState]) -> Dict[str, int]:
+    """Bring ``entry``'s ``Section`` rows in line with its heading blocks.
+
+    ``blocks`` is the full block list in document order. Each ``h2`` block maps to the
+    section whose ``stable_id`` is the heading id without ``h_``, with the heading text,
+    the joined text of its paragraphs as body, its parent heading's section as parent and
+    its pre-order index as position. Only sections that differ are written: new headings
+    are inserted, edited ones updated (reviving orphaned ones), and sections whose heading
+    is gone are marked orphaned rather than deleted, so their comments survive. Returns
+    per-operation counts.
+    """
+    bodies: Dict[str, List[str]] = defaultdict(list)
+    for block in blocks:
+        if block.type != 'h2' and block.parent_stable_id:
+            bodies[block.parent_stable_id].append(block.text)
+
+    def section_id(heading_id: str) -> str:
+        return heading_id[2:] if heading_id.startswith('h_') else heading_id
+
+    headings = [b for b in blocks if b.type == 'h2']
+    heading_ids = {b.stable_id for b in headings}
+    desired = {}
+    for position, heading in enumerate(headings, start=1):
+        parent = heading.parent_stable_id if heading.parent_stable_id in heading_ids else None
+        desired[section_id(heading.stable_id)] = (
+            heading.text[:300],
+            '\n\n'.join(bodies.get(heading.stable_id, [])).strip(),
+            section_id(parent) if parent else None,
+            float(position),
+        )
+
+    existing: Dict[str, Section] = {}
+    stale: List[int] = []
+    for section in Section.objects.filter(entry=entry).order_by('id'):
+        if section.stable_id in desired and section.stable_id not in existing:
+            existing[section.stable_id] = section
+        elif section.orphaned_at is None:
+            stale.append(section.pk)
+
+    missing = [sid for sid in desired if sid not in existing]
+    if missing:
+        created = Section.objects.bulk_create([
+            Section(entry=entry, stable_id=sid, heading=desired[sid][0], body=desired[sid][1], position=desired[sid][3])
+            for sid in missing
+        ])
+        if any(section.pk is None for section in created):
+            created = list(Section.objects.filter(entry=entry, stable_id__in=missing))
+        existing.update((section.stable_id, section) for section in created)
+
+    updates = []
+    for sid, (heading, body, parent_sid, position) in desired.items():
+        section = existing[sid]
+        parent_id = existing[parent_sid].pk if parent_sid else None
+        current = (section.heading, section.body, section.parent_id, section.position, section.orphaned_at)
+        if current != (heading, body, parent_id, position, None):
+            section.heading, section.body, section.parent_id, section.position = heading, body, parent_id, position
+            section.orphaned_at = None
+            updates.append(section)
+    if updates:
+        Section.objects.bulk_update(updates, ['heading', 'body', 'parent', 'position', 'orphaned_at'])
+    if stale:
+        Section.objects.filter(pk__in=stale).update(orphaned_at=timezone.now(), parent=None)
+    return {'created': len(missing), 'updated': len(updates), 'orphaned': len(stale)}
 
 
 def recompute_patch_votes_cache(patch: Change):
-    yes = Vote.objects.filter(target_type='change', target_id=patch.id, value__gt=0).count()
-    no = Vote.objects.filter(target_type='change', target_id=patch.id, value__lt=0).count()
+    yes = ChangeVote.objects.filter(change=patch, value__gt=0).count()
+    no = ChangeVote.objects.filter(change=patch, value__lt=0).count()
     patch.votes_cache_int = yes - no
     patch.save(update_fields=['votes_cache_int'])
     return yes, no
 
 
+def cast_change_vote(patch: Change, user, value: int) -> int:
+    """Record ``user``'s vote (-1, 0 to withdraw, +1) on ``patch``; returns the previous value.
+
+    The vote is written with a single ``INSERT ... ON CONFLICT DO UPDATE``, so repeated or
+    concurrent submissions never raise ``IntegrityError``. The change row is locked first so
+    the previous value read and the ``votes_cache_int`` delta stay consistent with it.
+    """
+    with transaction.atomic():
+        list(Change.objects.select_for_update().filter(id=patch.id).values_list('id', flat=True))
+        previous = ChangeVote.objects.filter(change=patch, user=user).values_list('value', flat=True).first() or 0
+        if value == 0:
+            if previous:
+                ChangeVote.objects.filter(change=patch, user=user).delete()
+        else:
+            ChangeVote.objects.bulk_create(
+                [ChangeVote(change=patch, user=user, value=value)],
+                update_conflicts=True,
+                unique_fields=['change', 'user'],
+                update_fields=['value', 'updated_at'],
+            )
+        delta = value - previous
+        if delta:
+            Change.objects.filter(id=patch.id).update(votes_cache_int=F('votes_cache_int') + delta)
+            patch.votes_cache_int += delta
+            tally = ChangeVote.objects.filter(change=patch).aggregate(
+                yes=Count('id', filter=Q(value__gt=0)), no=Count('id', filter=Q(value__lt=0))
+            )
+            publish(patch.project_id, ProjectEvent.Kind.VOTE, change_id=patch.id, **tally)
+    return previous
+
+
 def is_passing(patch: Change) -> bool:
     """A patch passes when yes votes meet the project's configured approval threshold."""
 
-    yes = Vote.objects.filter(target_type='change', target_id=patch.id, value__gt=0).count()
+    yes = ChangeVote.objects.filter(change=patch, value__gt=0).count()
     project = patch.project
     required = project.required_yes_votes if project else 1
     return yes >= required
@@ -212,33 +388,127 @@ def auto_merge():
             apply_merge_core(p)
 
 
+def passing_change_ids(project: Project) -> List[int]:
+    """Ids of the project's open changes whose yes tally meets the current threshold.
+
+    Uses a single grouped aggregate over the votes of the project's published changes
+    instead of one COUNT per change.
+    """
+    return list(
+        ChangeVote.objects.filter(change__project=project, change__status='published', value__gt=0)
+        .values('change_id')
+        .annotate(yes=Count('id'))
+        .filter(yes__gte=project.required_yes_votes)
+        .values_list('change_id', flat=True)
+    )
+
+
+def reevaluate_open_changes(project: Project, changed_fields: Iterable[str]) -> List[int]:
+    """Re-check a project's open changes after its governance settings changed.
+
+    A new voting window shifts ``closes_at`` for every open change in one UPDATE; a new
+    pool size or threshold re-tallies the open changes and enqueues merges for the ones
+    that now pass (background jobs, see ``core.jobs``). Returns the ids queued.
+    """
+    changed_fields = set(changed_fields)
+    open_changes = Change.objects.filter(project=project, status='published')
+    if 'voting_duration_hours' in changed_fields:
+        window = timedelta(hours=project.voting_duration_hours or 24)
+        open_changes.filter(published_at__isnull=False).update(
+            closes_at=ExpressionWrapper(F('published_at') + window, output_field=DateTimeField())
+        )
+    if not changed_fields & {'voting_pool_size', 'approval_threshold'}:
+        return []
+    change_ids = passing_change_ids(project)
+    for patch in Change.objects.filter(id__in=change_ids).only('id', 'target_entry_id'):
+        request_merge_evaluation(patch)
+    return change_ids
+
+
 def apply_merge_core(patch: Change):
     if patch.status == 'merged':
         return
+    from .history import ensure_base_snapshot, record_version
+    from .search import index_entry_blocks
+
+    started = time.perf_counter()
     entry = patch.target_entry
-    # Snapshot before outline
-    before_outline = outline(list(entry.blocks.order_by('position', 'id')))
-    apply_ops(entry, patch.ops_json)
+    ensure_base_snapshot(entry)
+    blocks, changed_ids, resolved_ops, removed_ids = _apply_ops(entry, patch.ops_json)
     entry.entry_version_int += 1
     entry.save(update_fields=['entry_version_int'])
-    after_outline = outline(list(entry.blocks.order_by('position', 'id')))
     patch.status = 'merged'
     patch.merged_at = timezone.now()
     patch.save(update_fields=['status', 'merged_at'])
-    EntryHistory.objects.create(
-        entry=entry,
-        change=patch,
-        version_int=entry.entry_version_int,
-        outline_before=before_outline,
-        outline_after=after_outline,
-    )
-    # Mark overlapping patches needs_update (simplified: share any affected block id)
-    if patch.affected_blocks:
-        overlapping = Change.objects.filter(
-            target_entry=entry,
-            status='published',
-        ).exclude(id=patch.id)
-        for op in overlapping:
-            if set(op.affected_blocks).intersection(patch.affected_blocks):
-                op.status = 'needs_update'
-                op.save(update_fields=['status'])
+    record_version(entry, change=patch, ops=resolved_ops, blocks=blocks)
+    index_entry_blocks(entry, blocks, only_ids=changed_ids, removed_ids=removed_ids)
+    sync_sections(entry, blocks)
+    # In the merge transaction: a queued evaluation of an overlapping change must see it
+    # as needs_update before it can apply.
+    mark_overlapping_changes(patch)
+    enqueue('activity.merge', key=f"project:{entry.project_id}", change_id=patch.id, version=entry.entry_version_int)
+    MERGE_DURATION.observe(time.perf_counter() - started)
+    MERGE_OPS.observe(len(resolved_ops))
+
+
+def request_merge_evaluation(patch: Change) -> None:
+    """Queue a merge check for ``patch`` after its tally changed (one pending check per change)."""
+    enqueue('merge.evaluate', key=f"entry:{patch.target_entry_id}", dedupe=True, change_id=patch.id)
+
+
+def lock_entry_for_merge(patch: Change) -> None:
+    """Lock ``patch``'s entry row and reload the state a merge depends on.
+
+    Call inside a transaction. Merges racing in from another worker or request wait on
+    the lock and then see this merge's status and version.
+    """
+    Entry.objects.select_for_update().filter(id=patch.target_entry_id).values_list('id', flat=True).first()
+    patch.refresh_from_db(fields=['status'])
+    patch.target_entry.refresh_from_db(fields=['entry_version_int'])
+
+
+def merge_change(patch: Change) -> None:
+    """Owner-triggered merge, serialized with ``evaluate_merge`` by the entry lock."""
+    with transaction.atomic():
+        lock_entry_for_merge(patch)
+        apply_merge_core(patch)
+
+
+@handler('merge.evaluate')
+def evaluate_merge(change_id: int) -> None:
+    patch = Change.objects.select_related('project', 'target_entry').filter(id=change_id).first()
+    if patch is None or patch.status != 'published' or not is_passing(patch):
+        return
+    lock_entry_for_merge(patch)
+    if patch.status == 'published':
+        apply_merge_core(patch)
+        last_vote = ChangeVote.objects.filter(change=patch).aggregate(last=Max('updated_at'))['last']
+        if last_vote and patch.merged_at:
+            VOTE_TO_MERGE.observe(max(0.0, (patch.merged_at - last_vote).total_seconds()))
+
+
+def mark_overlapping_changes(patch: Change) -> int:
+    """Flag open changes that touch a block the merged ``patch`` touched as ``needs_update``."""
+    if not patch.affected_blocks:
+        return 0
+    affected = set(patch.affected_blocks)
+    stale = [
+        op for op in Change.objects.filter(target_entry_id=patch.target_entry_id, status='published')
+        .exclude(id=patch.id)
+        .only('id', 'affected_blocks', 'status')
+        if affected.intersection(op.affected_blocks or [])
+    ]
+    for op in stale:
+        op.status = 'needs_update'
+    Change.objects.bulk_update(stale, ['status'])
+    if stale:
+        NEEDS_UPDATE.inc(len(stale))
+    return len(stale)
+
+
+@handler('merge.overlaps')
+def mark_overlaps_job(change_id: int) -> None:
+    """Run overlap marking for jobs queued before it moved into the merge transaction."""
+    patch = Change.objects.filter(id=change_id).only('id', 'target_entry_id', 'affected_blocks').first()
+    if patch is not None:
+        mark_overlapping_changes(patch)
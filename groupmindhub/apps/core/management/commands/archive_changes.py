@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from groupmindhub.apps.core.archive import DEFAULT_RETENTION_DAYS, archivable_changes, archive_changes
+
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Move changes merged or closed more than N days ago into the archive table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=DEFAULT_RETENTION_DAYS,
+            help='Archive changes merged or closed more than this many days ago.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Number of changes moved per transaction.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many changes would be archived without moving them.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options['chunk_size'])
+        candidates = archivable_changes(days=max(0, options['days'])).order_by('id')
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Changes that would be archived: {candidates.count()}'))
+            return
+        archived = 0
+        while True:
+            # Archived rows leave the table, so each pass re-reads the oldest candidates.
+            chunk = list(candidates.values_list('id', flat=True)[:chunk_size])
+            if not chunk:
+                break
+            archived += len(archive_changes(chunk))
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'Archived {archived} changes (last id {chunk[-1]})')
+        self.stdout.write(self.style.SUCCESS(f'Changes archived: {archived}'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from groupmindhub.apps.core.history import compact_history
+from groupmindhub.apps.core.models import Entry, EntryHistory
+
+
+DEFAULT_CHUNK_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = 'Convert stored full-outline history rows into op batches plus periodic snapshots.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Number of entries compacted per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options['chunk_size'])
+        entry_ids = (
+            EntryHistory.objects.order_by('entry_id')
+            .values_list('entry_id', flat=True)
+            .distinct()
+            .iterator(chunk_size=chunk_size)
+        )
+        entries = 0
+        rewritten = 0
+        chunk = []
+        for entry_id in entry_ids:
+            chunk.append(entry_id)
+            if len(chunk) >= chunk_size:
+                rewritten += self._compact_chunk(chunk)
+                entries += len(chunk)
+                chunk = []
+        if chunk:
+            rewritten += self._compact_chunk(chunk)
+            entries += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f'History rows compacted: {rewritten} across {entries} entries'))
+
+    def _compact_chunk(self, entry_ids) -> int:
+        with transaction.atomic():
+            return sum(compact_history(entry) for entry in Entry.objects.filter(id__in=entry_ids))
@@ -1,28 +1,111 @@
+import time
+
 from django.core.management.base import BaseCommand
 from django.db import transaction
 
-from groupmindhub.apps.core.models import Entry, ProjectMembership
+from groupmindhub.apps.core.models import Entry, Project, ProjectMembership
+
+
+DEFAULT_CHUNK_SIZE = 2000
 
 
 class Command(BaseCommand):
     help = 'Ensure each project has an owner membership based on existing entry authors.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Number of projects examined per batch.',
+        )
+        parser.add_argument(
+            '--since-id',
+            type=int,
+            default=0,
+            help='Only examine projects with an id greater than this (resume from a previous run).',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the memberships that would be created without writing them.',
+        )
+
     def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        chunk_size = max(1, options['chunk_size'])
+        dry_run = options['dry_run']
+        project_ids = (
+            Project.objects.filter(id__gt=options['since_id'])
+            .order_by('id')
+            .values_list('id', flat=True)
+            .iterator(chunk_size=chunk_size)
+        )
+        started = time.monotonic()
+        scanned = 0
         created = 0
-        with transaction.atomic():
-            for entry in Entry.objects.select_related('project', 'author').order_by('project_id', 'id'):
-                project = entry.project
-                if not project:
-                    continue
-                if project.memberships.filter(role=ProjectMembership.Role.OWNER).exists():
-                    continue
-                author = entry.author
-                if author:
-                    membership, was_created = project.memberships.get_or_create(
-                        user=author,
-                        defaults={'role': ProjectMembership.Role.OWNER},
-                    )
-                    if was_created:
-                        created += 1
-                        self.stdout.write(f'Assigned owner role to {author} for project {project.id}')
-        self.stdout.write(self.style.SUCCESS(f'Owner memberships created: {created}'))
+        chunk = []
+        for project_id in project_ids:
+            chunk.append(project_id)
+            if len(chunk) >= chunk_size:
+                created += self._process_chunk(chunk, dry_run)
+                scanned += len(chunk)
+                self._report_progress(scanned, created, chunk[-1], started)
+                chunk = []
+        if chunk:
+            created += self._process_chunk(chunk, dry_run)
+            scanned += len(chunk)
+            self._report_progress(scanned, created, chunk[-1], started)
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS(f'Owner memberships that would be created: {created}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Owner memberships created: {created}'))
+
+    def _process_chunk(self, project_ids, dry_run: bool) -> int:
+        """Create owner memberships for the projects in ``project_ids`` that lack one."""
+        owned = set(
+            ProjectMembership.objects.filter(
+                project_id__in=project_ids,
+                role=ProjectMembership.Role.OWNER,
+            ).values_list('project_id', flat=True)
+        )
+        unowned = set(project_ids) - owned
+        if not unowned:
+            return 0
+        existing = set(
+            ProjectMembership.objects.filter(project_id__in=unowned).values_list('project_id', 'user_id')
+        )
+        authors = (
+            Entry.objects.filter(project_id__in=unowned, author__isnull=False)
+            .order_by('project_id', 'id')
+            .values_list('project_id', 'author_id')
+        )
+        # The first entry author without an existing membership becomes the owner.
+        missing = {}
+        for project_id, author_id in authors:
+            if project_id in missing or (project_id, author_id) in existing:
+                continue
+            missing[project_id] = author_id
+        if self.verbosity >= 2:
+            for project_id, author_id in missing.items():
+                self.stdout.write(f'Assigned owner role to user {author_id} for project {project_id}')
+        if missing and not dry_run:
+            with transaction.atomic():
+                ProjectMembership.objects.bulk_create(
+                    [
+                        ProjectMembership(project_id=project_id, user_id=author_id, role=ProjectMembership.Role.OWNER)
+                        for project_id, author_id in missing.items()
+                    ],
+                    ignore_conflicts=True,
+                )
+            ProjectMembership.forget_role_maps(missing)
+        return len(missing)
+
+    def _report_progress(self, scanned: int, created: int, last_id: int, started: float):
+        if self.verbosity < 2:
+            return
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'Scanned {scanned} projects (last id {last_id}), {created} owners assigned, '
+            f'{scanned / elapsed:.0f} projects/s'
+        )
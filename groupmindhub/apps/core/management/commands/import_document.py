@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from groupmindhub.apps.core.importer import DEFAULT_CHUNK_SIZE, FORMATS, import_document
+from groupmindhub.apps.core.models import Project
+
+
+class Command(BaseCommand):
+    help = "Import a Markdown or plain-text document into a project's entry as sections and blocks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('path', help='Path to the document to import.')
+        parser.add_argument('--format', choices=FORMATS, default='markdown')
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help=(
+                'Remove the entry\'s existing blocks and sections before importing. '
+                'Refused while any of its sections has comments.'
+            ),
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Number of sections written per batch.',
+        )
+
+    def handle(self, *args, **options):
+        project = Project.objects.filter(id=options['project_id']).first()
+        if not project:
+            raise CommandError(f"Project {options['project_id']} does not exist.")
+        entry = project.entries.order_by('id').first()
+        if not entry:
+            raise CommandError(f'Project {project.id} has no entry to import into.')
+        started = time.monotonic()
+        try:
+            with open(options['path'], encoding='utf-8') as handle:
+                result = import_document(
+                    entry,
+                    handle,
+                    fmt=options['format'],
+                    replace=options['replace'],
+                    chunk_size=options['chunk_size'],
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.sections} sections ({result.blocks} blocks) into entry {entry.id} '
+            f'v{result.version} in {elapsed:.1f}s'
+        ))
+        if result.stale_changes:
+            self.stdout.write(f'Flagged {result.stale_changes} open changes needs_update.')
@@ -0,0 +1,106 @@
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+DEFAULT_CONCURRENCY = 50
+DEFAULT_DURATION = 10.0
+ENDPOINTS = {
+    'entry': '/api/projects/{project}/entry',
+    'changes': '/api/projects/{project}/changes',
+    'comments': '/api/projects/{project}/comments?target_type=section&section_id={section}',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Poll the read-only project API endpoints of a running server with many concurrent clients '
+        'and report throughput and latency (compare the sync and ASGI worker classes with it).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help='Server to poll, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--project', type=int, required=True, help='Public project id to poll.')
+        parser.add_argument('--section', default='', help='Section stable id for the comments endpoint.')
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help='Number of clients polling at the same time.',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=DEFAULT_DURATION,
+            help='Seconds to keep polling.',
+        )
+        parser.add_argument(
+            '--endpoints',
+            default=','.join(ENDPOINTS),
+            help=f'Comma-separated subset of: {", ".join(ENDPOINTS)}.',
+        )
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds.')
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = [name for name in names if name not in ENDPOINTS]
+        if unknown or not names:
+            raise CommandError(f'Unknown endpoints: {", ".join(unknown) or "(none given)"}')
+        base_url = options['base_url'].rstrip('/')
+        urls = [
+            (name, base_url + ENDPOINTS[name].format(project=options['project'], section=options['section']))
+            for name in names
+        ]
+        concurrency = max(1, options['concurrency'])
+        deadline = time.monotonic() + max(0.1, options['duration'])
+        timeout = options['timeout']
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        lock = threading.Lock()
+
+        def poll(client: int):
+            turn = client
+            while time.monotonic() < deadline:
+                name, url = urls[turn % len(urls)]
+                turn += 1
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(url, timeout=timeout) as response:
+                        response.read()
+                    ok = True
+                except (urllib.error.URLError, OSError):
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if ok:
+                        latencies[name].append(elapsed)
+                    else:
+                        errors[name] += 1
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for client in range(concurrency):
+                pool.submit(poll, client)
+        wall = time.monotonic() - started
+
+        total = 0
+        for name, _url in urls:
+            samples = sorted(latencies[name])
+            total += len(samples)
+            if samples:
+                p50 = statistics.median(samples) * 1000
+                p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000
+                self.stdout.write(
+                    f'{name}: {len(samples)} ok, {errors[name]} failed, p50 {p50:.1f} ms, p95 {p95:.1f} ms'
+                )
+            else:
+                self.stdout.write(f'{name}: 0 ok, {errors[name]} failed')
+        self.stdout.write(self.style.SUCCESS(
+            f'Requests per second: {total / wall:.1f} ({concurrency} clients, {wall:.1f}s)'
+        ))
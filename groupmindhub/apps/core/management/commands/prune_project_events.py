@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from groupmindhub.apps.core.events import EVENT_RETENTION, prune_events
+from groupmindhub.apps.core.models import ProjectEvent
+
+
+class Command(BaseCommand):
+    help = 'Delete live-stream events older than the replay window.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=int(EVENT_RETENTION.total_seconds() // 3600),
+            help='Keep events from the last this many hours.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many events would be deleted without deleting them.',
+        )
+
+    def handle(self, *args, **options):
+        window = timedelta(hours=max(0, options['hours']))
+        if options['dry_run']:
+            stale = ProjectEvent.objects.filter(created_at__lt=timezone.now() - window).count()
+            self.stdout.write(self.style.SUCCESS(f'Events that would be deleted: {stale}'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'Events deleted: {prune_events(window)}'))
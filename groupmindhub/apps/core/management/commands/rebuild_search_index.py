@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from groupmindhub.apps.core.models import Project
+from groupmindhub.apps.core.search import rebuild_project_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents from blocks, change summaries and comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project',
+            type=int,
+            action='append',
+            help='Only rebuild this project id (repeatable).',
+        )
+
+    def handle(self, *args, **options):
+        projects = Project.objects.order_by('id')
+        if options['project']:
+            projects = projects.filter(id__in=options['project'])
+        documents = 0
+        for project_id in projects.values_list('id', flat=True).iterator():
+            with transaction.atomic():
+                documents += rebuild_project_index(project_id)
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'Indexed project {project_id}')
+        self.stdout.write(self.style.SUCCESS(f'Search documents indexed: {documents}'))
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from groupmindhub.apps.core.activity import refresh_activity
+from groupmindhub.apps.core.models import ProjectActivity
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Decay rolling project activity counters back to exact 24h/7d values (run periodically).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Number of rollup rows recomputed per batch.',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every project (and recount Project.stars_count) instead of only recently active ones.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options['chunk_size'])
+        full = options['full']
+        now = timezone.now()
+        rows = ProjectActivity.objects.order_by('project_id')
+        if not full:
+            # Only rows whose windows can still hold counts need decaying.
+            rows = rows.filter(
+                Q(changes_7d__gt=0) | Q(changes_24h__gt=0) | Q(last_activity_at__gte=now - timedelta(days=8))
+            )
+        refreshed = 0
+        chunk = []
+        for project_id in rows.values_list('project_id', flat=True).iterator(chunk_size=chunk_size):
+            chunk.append(project_id)
+            if len(chunk) >= chunk_size:
+                refreshed += len(refresh_activity(chunk, now=now, include_stars=full))
+                chunk = []
+        if chunk:
+            refreshed += len(refresh_activity(chunk, now=now, include_stars=full))
+        self.stdout.write(self.style.SUCCESS(f'Project activity rows refreshed: {refreshed}'))
@@ -0,0 +1,120 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from groupmindhub.benchmarks.runner import (
+    DEFAULT_ITERATIONS,
+    DEFAULT_MAX_EXTRA_QUERIES,
+    DEFAULT_MAX_SLOWDOWN,
+    DEFAULT_MIN_DELTA_MS,
+    DEFAULT_WARMUP,
+    SIZES,
+    compare,
+    run_suite,
+)
+
+
+BENCH_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmarks'}}
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the merge engine, serializers and API endpoints against seeded datasets in a throwaway '
+        'test database, print p50/p95 and query counts as JSON, and fail on regressions against a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='small,medium',
+            help=f'Comma-separated dataset sizes: {", ".join(SIZES)}.',
+        )
+        parser.add_argument('--only', default='', help='Comma-separated substrings of benchmark names to run.')
+        parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='Timed runs per benchmark.')
+        parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help='Untimed runs per benchmark.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+        parser.add_argument('--baseline', help='JSON report to compare against.')
+        parser.add_argument(
+            '--max-slowdown',
+            type=float,
+            default=DEFAULT_MAX_SLOWDOWN,
+            help='Allowed p95 increase over the baseline, as a fraction.',
+        )
+        parser.add_argument(
+            '--max-extra-queries',
+            type=int,
+            default=DEFAULT_MAX_EXTRA_QUERIES,
+            help='Allowed number of queries over the baseline.',
+        )
+        parser.add_argument(
+            '--min-delta-ms',
+            type=float,
+            default=DEFAULT_MIN_DELTA_MS,
+            help='p95 differences below this many milliseconds are treated as noise.',
+        )
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the test database between runs.')
+
+    def handle(self, *args, **options):
+        sizes = [size.strip() for size in options['sizes'].split(',') if size.strip()]
+        unknown = [size for size in sizes if size not in SIZES]
+        if unknown or not sizes:
+            raise CommandError(f'Unknown sizes: {", ".join(unknown) or "(none given)"}')
+        only = [part.strip() for part in options['only'].split(',') if part.strip()]
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Cannot read baseline: {exc}') from exc
+        verbosity = options['verbosity']
+
+        def progress(size, name, result):
+            if verbosity >= 2:
+                self.stderr.write(
+                    f"{size}/{name}: p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+                    f"{result['queries']} queries"
+                )
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'], aliases={'default'})
+        try:
+            with override_settings(CACHES=BENCH_CACHES, JOBS_EAGER=True):
+                report = run_suite(
+                    sizes,
+                    only=only,
+                    iterations=max(1, options['iterations']),
+                    warmup=max(0, options['warmup']),
+                    progress=progress,
+                )
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        payload = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(payload + '\n')
+        else:
+            self.stdout.write(payload)
+
+        if baseline is not None:
+            regressions = compare(
+                report,
+                baseline,
+                max_slowdown=options['max_slowdown'],
+                max_extra_queries=options['max_extra_queries'],
+                min_delta_ms=options['min_delta_ms'],
+            )
+            for line in regressions:
+                self.stderr.write(line)
+            if regressions:
+                raise CommandError(f'{len(regressions)} benchmark regression(s) against {options["baseline"]}')
+            self.stderr.write(self.style.SUCCESS('No regressions against the baseline.'))
@@ -0,0 +1,100 @@
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from groupmindhub.apps.core.jobs import claim_jobs, requeue_stale, run_job
+
+
+DEFAULT_THREADS = 4
+DEFAULT_POLL_INTERVAL = 1.0
+STALE_CHECK_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (merge evaluation, activity fan-out).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=DEFAULT_THREADS,
+            help='Number of jobs run concurrently.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=DEFAULT_POLL_INTERVAL,
+            help='Seconds to wait before polling again when the queue is empty.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no due jobs are left instead of waiting for more.',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        threads = max(1, options['threads'])
+        poll_interval = max(0.05, options['poll_interval'])
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        stopping = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_args: stopping.set())
+
+        slots = threading.Semaphore(threads)
+        counts = {'ok': 0, 'failed': 0}
+        lock = threading.Lock()
+
+        def execute(job):
+            ok = False
+            try:
+                ok = run_job(job)
+            except DatabaseError:
+                # Recording the outcome failed; the job is requeued once it goes stale.
+                logger.exception('Job %s (%s) could not be recorded', job.id, job.kind)
+            finally:
+                close_old_connections()
+                slots.release()
+            with lock:
+                counts['ok' if ok else 'failed'] += 1
+            if self.verbosity >= 2:
+                self.stdout.write(f'{"Ran" if ok else "Failed"} job {job.id} ({job.kind})')
+
+        last_stale_check = 0.0
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='job') as pool:
+            while not stopping.is_set():
+                if time.monotonic() - last_stale_check > STALE_CHECK_SECONDS:
+                    requeue_stale()
+                    last_stale_check = time.monotonic()
+                free = 0
+                while slots.acquire(blocking=False):
+                    free += 1
+                try:
+                    jobs = claim_jobs(worker, free) if free else []
+                except DatabaseError:
+                    # A lock timeout or dropped connection should not stop the worker.
+                    logger.warning('Claiming jobs failed; retrying', exc_info=True)
+                    close_old_connections()
+                    for _unused in range(free):
+                        slots.release()
+                    stopping.wait(poll_interval)
+                    continue
+                for _unused in range(free - len(jobs)):
+                    slots.release()
+                for job in jobs:
+                    pool.submit(execute, job)
+                if jobs:
+                    continue
+                if options['once'] and free == threads:
+                    break
+                stopping.wait(poll_interval)
+        self.stdout.write(self.style.SUCCESS(f'Jobs run: {counts["ok"]}, failed: {counts["failed"]}'))
@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from groupmindhub.apps.core.benchdata import DEFAULT_CHUNK_SIZE, BenchSpec, project_name_prefix, seed_bench
+from groupmindhub.apps.core.models import Project
+
+
+DEFAULTS = BenchSpec()
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a deterministic benchmark dataset: projects with members, a deep section tree, '
+        'merged history, open proposals with votes, and comments, written with bulk inserts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=DEFAULTS.projects, help='Number of projects to create.')
+        parser.add_argument('--members', type=int, default=DEFAULTS.members, help='Members per project.')
+        parser.add_argument('--blocks', type=int, default=DEFAULTS.blocks, help='Blocks in each trunk entry.')
+        parser.add_argument('--depth', type=int, default=DEFAULTS.depth, help='Maximum section nesting depth.')
+        parser.add_argument('--changes', type=int, default=DEFAULTS.changes, help='Changes per project.')
+        parser.add_argument(
+            '--merged',
+            type=float,
+            default=DEFAULTS.merged,
+            help='Share of the changes that are merged into the entry history (0-1).',
+        )
+        parser.add_argument('--votes', type=int, default=DEFAULTS.votes, help='Average votes per change.')
+        parser.add_argument('--comments', type=int, default=DEFAULTS.comments, help='Comments per project.')
+        parser.add_argument('--seed', type=int, default=DEFAULTS.seed, help='Random seed; also names the projects.')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Number of rows written per insert.',
+        )
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Delete projects from an earlier run with the same seed first.',
+        )
+
+    def handle(self, *args, **options):
+        if options['blocks'] < 1 or options['depth'] < 1 or options['projects'] < 1:
+            raise CommandError('--projects, --blocks and --depth must be at least 1.')
+        existing = Project.objects.filter(name__startswith=project_name_prefix(options['seed']))
+        if existing.exists():
+            if not options['replace']:
+                raise CommandError(
+                    f"Benchmark projects for seed {options['seed']} already exist; pass --replace or another --seed."
+                )
+            existing.delete()
+        spec = BenchSpec(
+            projects=options['projects'],
+            members=max(1, options['members']),
+            blocks=options['blocks'],
+            depth=options['depth'],
+            changes=max(0, options['changes']),
+            merged=options['merged'],
+            votes=max(0, options['votes']),
+            comments=max(0, options['comments']),
+            seed=options['seed'],
+            chunk_size=max(1, options['chunk_size']),
+        )
+        verbosity = options['verbosity']
+        started = time.monotonic()
+
+        def progress(index, result):
+            if verbosity >= 2:
+                self.stdout.write(
+                    f'Project {index}/{spec.projects}: {result.rows} rows '
+                    f'({result.blocks} blocks, {result.changes} changes, {result.votes} votes) '
+                    f'after {time.monotonic() - started:.1f}s'
+                )
+
+        result = seed_bench(spec, progress=progress)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Rows created: {result.rows} in {elapsed:.1f}s ({result.projects} projects, {result.users} new users, '
+            f'{result.blocks} blocks, {result.sections} sections, {result.changes} changes, {result.votes} votes, '
+            f'{result.comments} comments, {result.history} history rows)'
+        ))
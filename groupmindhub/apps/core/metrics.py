@@ -0,0 +1,314 @@
+"""Prometheus-style counters and histograms for the hot paths, served at ``/metrics``.
+
+Metrics are plain in-process objects, cheap enough to update inline. To stay correct
+with several worker processes (gunicorn workers, ``run_worker``), each process writes
+its values to its own file in ``METRICS_DIR`` at most every ``FLUSH_SECONDS`` (and on
+exit), and ``/metrics`` sums the files of all processes, much like ``prometheus_client``'s
+multiprocess mode. File names carry the pid plus a per-process random token, so a new
+process that reuses a pid never overwrites an exited one's file. Processes that never
+recorded a value (``manage.py migrate``, ``check``, ...) write nothing. Each scrape folds
+the files of processes that have exited into ``_aggregate.json`` and deletes them, so
+counters never go backwards while the directory lives and the number of files stays
+bounded by the live processes. ``METRICS_DIR`` must be local to the host, since liveness
+is checked by pid. With ``METRICS_DIR`` empty (tests) only the serving process's values
+are reported.
+
+The per-namespace cache counters from ``caching.cache_stats()`` are exported the same
+way, as ``gmh_cache_events_total``.
+"""
+from __future__ import annotations
+
+import atexit
+import bisect
+import json
+import os
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX; dead files are then kept, not folded
+    fcntl = None
+
+FLUSH_SECONDS = 1.0
+AGGREGATE_FILE = '_aggregate.json'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BLOCK_COUNT_BUCKETS = (100, 1_000, 10_000, 100_000)
+CACHE_EVENTS = 'gmh_cache_events_total'
+CACHE_EVENTS_HELP = 'Shared cache events per namespace (hits, misses, computes, waits, invalidations).'
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_lock = threading.Lock()
+_registry: Dict[str, 'Metric'] = {}
+_last_flush = 0.0
+_file_name = ''
+_file_pid = 0
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.values: Dict[LabelKey, object] = {}
+        _registry[name] = self
+
+    def _key(self, labels: Dict[str, object]) -> LabelKey:
+        return tuple((label, str(labels.get(label, ''))) for label in self.labels)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        maybe_flush()
+
+
+class Histogram(Metric):
+    """Buckets are stored per bucket (last one is ``+Inf``) and made cumulative on output."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            state['buckets'][slot] += 1
+            state['sum'] += value
+            state['count'] += 1
+        maybe_flush()
+
+
+REQUEST_DURATION = Histogram(
+    'gmh_request_duration_seconds', 'Request wall time by URL name.', LATENCY_BUCKETS, labels=('url_name',)
+)
+MERGE_DURATION = Histogram('gmh_merge_duration_seconds', 'Time to apply a merge to the entry.', LATENCY_BUCKETS)
+MERGE_OPS = Histogram('gmh_merge_ops', 'Ops applied per merge.', (1, 2, 5, 10, 20, 50, 100, 200, 500))
+SERIALIZE_ENTRY_DURATION = Histogram(
+    'gmh_serialize_entry_seconds',
+    'serialize_entry time by entry size (upper bound of the block count).',
+    LATENCY_BUCKETS,
+    labels=('blocks',),
+)
+VOTE_TO_MERGE = Histogram(
+    'gmh_vote_to_merge_seconds',
+    'Time from the last vote on a change to its automatic merge.',
+    (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600),
+)
+NEEDS_UPDATE = Counter('gmh_needs_update_transitions_total', 'Open changes flagged needs_update by a merge.')
+
+
+def block_count_bucket(count: int) -> str:
+    for bound in BLOCK_COUNT_BUCKETS:
+        if count <= bound:
+            return str(bound)
+    return '+Inf'
+
+
+def _snapshot() -> List[dict]:
+    from .caching import cache_stats
+
+    with _lock:
+        rows = [
+            {'name': metric.name, 'labels': dict(key), 'value': value}
+            for metric in _registry.values()
+            for key, value in metric.values.items()
+        ]
+    for namespace, events in cache_stats().items():
+        for event, value in events.items():
+            rows.append({'name': CACHE_EVENTS, 'labels': {'namespace': namespace, 'event': event}, 'value': value})
+    return rows
+
+
+def _metrics_dir() -> Path | None:
+    directory = getattr(settings, 'METRICS_DIR', '')
+    return Path(directory) if directory else None
+
+
+def _own_file_name() -> str:
+    """``<pid>-<token>.json``, new after a fork so children never share the parent's file."""
+    global _file_name, _file_pid
+    pid = os.getpid()
+    if _file_pid != pid:
+        _file_name, _file_pid = f'{pid}-{secrets.token_hex(6)}.json', pid
+    return _file_name
+
+
+def flush() -> None:
+    """Write this process's values to its file in ``METRICS_DIR`` (atomically)."""
+    global _last_flush
+    directory = _metrics_dir()
+    _last_flush = time.monotonic()
+    if directory is None:
+        return
+    rows = _snapshot()
+    if not rows:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    _write_rows(directory / _own_file_name(), rows)
+
+
+def _write_rows(path: Path, rows: List[dict]) -> None:
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(rows), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def maybe_flush() -> None:
+    if time.monotonic() - _last_flush >= FLUSH_SECONDS:
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    try:
+        flush()
+    except OSError:
+        pass
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # alive, owned by another user
+        pass
+    return True
+
+
+def _read_rows(path: Path) -> List[dict]:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return []
+
+
+def fold_dead_processes(directory: Path) -> int:
+    """Merge the files of exited processes into ``AGGREGATE_FILE`` and delete them.
+
+    Runs under an exclusive ``flock`` so concurrent scrapes never fold a file twice.
+    Returns the number of files folded.
+    """
+    if fcntl is None:
+        return 0
+    with open(directory / '.fold.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        dead = [
+            path for path in directory.glob('*.json')
+            if path.name != AGGREGATE_FILE
+            and path.stem.split('-', 1)[0].isdigit()
+            and not _process_alive(int(path.stem.split('-', 1)[0]))
+        ]
+        if not dead:
+            return 0
+        aggregate = directory / AGGREGATE_FILE
+        rows = _read_rows(aggregate)
+        for path in dead:
+            rows.extend(_read_rows(path))
+        _write_rows(aggregate, [
+            {'name': name, 'labels': dict(key), 'value': value}
+            for name, series in _merge(rows).items()
+            for key, value in series.items()
+        ])
+        for path in dead:
+            path.unlink(missing_ok=True)
+    return len(dead)
+
+
+def collect() -> List[dict]:
+    """Rows of every process: the files in ``METRICS_DIR`` plus this process's live values."""
+    rows = _snapshot()
+    directory = _metrics_dir()
+    if directory is None or not directory.is_dir():
+        return rows
+    try:
+        fold_dead_processes(directory)
+    except OSError:
+        pass
+    own = _own_file_name()
+    for path in directory.glob('*.json'):
+        if path.name != own:
+            rows.extend(_read_rows(path))
+    return rows
+
+
+def _merge(rows: Iterable[dict]) -> Dict[str, Dict[LabelKey, object]]:
+    merged: Dict[str, Dict[LabelKey, object]] = {}
+    for row in rows:
+        key = tuple(sorted(row['labels'].items()))
+        series = merged.setdefault(row['name'], {})
+        value = row['value']
+        current = series.get(key)
+        if current is None:
+            series[key] = json.loads(json.dumps(value)) if isinstance(value, dict) else value
+        elif isinstance(value, dict):
+            current['buckets'] = [a + b for a, b in zip(current['buckets'], value['buckets'])]
+            current['sum'] += value['sum']
+            current['count'] += value['count']
+        else:
+            series[key] = current + value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    body = ','.join(f'{name}="{_escape(str(value))}"' for name, value in pairs)
+    return f'{{{body}}}' if body else ''
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    merged = _merge(collect())
+    lines: List[str] = []
+    families = [(m.name, m.kind, m.help_text, getattr(m, 'buckets', None)) for m in _registry.values()]
+    families.append((CACHE_EVENTS, 'counter', CACHE_EVENTS_HELP, None))
+    for name, kind, help_text, buckets in families:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for key, value in sorted(merged.get(name, {}).items()):
+            if kind == 'histogram':
+                running = 0
+                bounds = [*(_number(b) for b in buckets), '+Inf']
+                for bound, count in zip(bounds, value['buckets']):
+                    running += count
+                    lines.append(f'{name}_bucket{_labels(key + (("le", bound),))} {running}')
+                lines.append(f'{name}_sum{_labels(key)} {_number(value["sum"])}')
+                lines.append(f'{name}_count{_labels(key)} {value["count"]}')
+            else:
+                lines.append(f'{name}{_labels(key)} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics() -> None:
+    with _lock:
+        for metric in _registry.values():
+            metric.values.clear()
@@ -0,0 +1,187 @@
+"""Project middleware."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .instrumentation import QueryStats, aexecute_wrapper, record_view
+from .metrics import REQUEST_DURATION
+from .profiling import SqlTrace, StackSampler, can_profile, save_profile, task_is_running, wants_profile
+
+logger = logging.getLogger('groupmindhub.requests')
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that stays on the event loop under ASGI.
+
+    The stock middleware is sync-only, so Django would run every request (static or not)
+    through a worker thread and call async views back via ``async_to_sync``. Here only
+    static file hits go to a thread; everything else is awaited directly.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """Count queries, SQL time and wall time per request and per view.
+
+    Requests slower than ``SLOW_REQUEST_MS`` (or issuing more than
+    ``SLOW_REQUEST_QUERIES`` queries) are logged with their most repeated SQL shapes.
+    With ``DEBUG`` the numbers are also sent as a ``Server-Timing`` header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = QueryStats()
+        started = time.perf_counter()
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        return self._finish(request, response, stats, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        started = time.perf_counter()
+        async with aexecute_wrapper(stats):
+            response = await self.get_response(request)
+        return self._finish(request, response, stats, time.perf_counter() - started)
+
+    def _finish(self, request, response, stats: QueryStats, wall_seconds: float):
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name if match else '') or 'unresolved'
+        request.query_stats = stats
+        if response.streaming:
+            # Only the time to first byte is known; the stream itself is not a request cost.
+            return response
+        record_view(view_name, stats, wall_seconds)
+        REQUEST_DURATION.observe(wall_seconds, url_name=view_name)
+        wall_ms = wall_seconds * 1000
+        if wall_ms >= settings.SLOW_REQUEST_MS or stats.count > settings.SLOW_REQUEST_QUERIES:
+            repeated = '; '.join(f'{n}x {shape[:200]}' for shape, n in stats.repeated_shapes())
+            logger.warning(
+                'Slow request %s %s (%s): %.0f ms, %d queries, %.0f ms SQL. Repeated: %s',
+                request.method,
+                request.path,
+                view_name,
+                wall_ms,
+                stats.count,
+                stats.sql_seconds * 1000,
+                repeated or 'none',
+            )
+        if settings.DEBUG:
+            response['Server-Timing'] = (
+                f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.count} queries", '
+                f'app;dur={wall_ms:.1f}'
+            )
+        return response
+
+
+class ProfilingMiddleware:
+    """Run requests that ask for it (``?profile=1`` / ``X-Profile: 1``) under the profiler.
+
+    Only staff and owners of the requested project are profiled; everyone else gets the
+    normal response. The capture id is returned in an ``X-Profile-Id`` header. See
+    ``core.profiling``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not wants_profile(request) or not can_profile(request.user, request.path_info):
+            return self.get_response(request)
+        trace = SqlTrace()
+        sampler = StackSampler({threading.get_ident()}, settings.PROFILE_INTERVAL_MS / 1000)
+        started = time.perf_counter()
+        with connection.execute_wrapper(trace):
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+        meta = self._meta(request, request.user, response, sampler, time.perf_counter() - started)
+        response['X-Profile-Id'] = save_profile(meta, sampler.stacks, trace.queries)
+        return response
+
+    async def __acall__(self, request):
+        if not wants_profile(request):
+            return await self.get_response(request)
+        user = await request.auser()
+        if not await sync_to_async(can_profile)(user, request.path_info):
+            return await self.get_response(request)
+        trace = SqlTrace()
+        orm_thread = await sync_to_async(threading.get_ident)()
+        loop_thread = threading.get_ident()
+        sampler = StackSampler(
+            {loop_thread, orm_thread},
+            settings.PROFILE_INTERVAL_MS / 1000,
+            # The loop thread runs other requests' tasks too; keep only this request's.
+            owners={loop_thread: task_is_running(asyncio.get_running_loop(), asyncio.current_task())},
+        )
+        started = time.perf_counter()
+        async with aexecute_wrapper(trace):
+            sampler.start()
+            try:
+                response = await self.get_response(request)
+            finally:
+                sampler.stop()
+        meta = self._meta(request, user, response, sampler, time.perf_counter() - started)
+        response['X-Profile-Id'] = await sync_to_async(save_profile)(meta, sampler.stacks, trace.queries)
+        return response
+
+    @staticmethod
+    def _meta(request, user, response, sampler: StackSampler, wall_seconds: float):
+        match = getattr(request, 'resolver_match', None)
+        return {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': (match.view_name if match else '') or 'unresolved',
+            'user': user.get_username(),
+            'status': response.status_code,
+            'wall_ms': round(wall_seconds * 1000, 3),
+            'samples': sampler.samples,
+            'skipped_samples': sampler.skipped,
+            'interval_ms': settings.PROFILE_INTERVAL_MS,
+        }
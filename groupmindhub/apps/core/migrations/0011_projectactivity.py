@@ -0,0 +1,95 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:24
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+from django.utils import timezone
+
+
+def backfill_activity(apps, schema_editor):
+    Project = apps.get_model("core", "Project")
+    ProjectActivity = apps.get_model("core", "ProjectActivity")
+    Change = apps.get_model("core", "Change")
+    ProjectStar = apps.get_model("core", "ProjectStar")
+    now = timezone.now()
+    day_counts = dict(
+        Change.objects.filter(created_at__gte=now - timedelta(days=1))
+        .values_list("project_id")
+        .annotate(c=Count("id"))
+    )
+    week_counts = dict(
+        Change.objects.filter(created_at__gte=now - timedelta(days=7))
+        .values_list("project_id")
+        .annotate(c=Count("id"))
+    )
+    last_seen = dict(
+        Change.objects.values_list("project_id").annotate(last=Max("created_at"))
+    )
+    star_counts = dict(
+        ProjectStar.objects.values_list("project_id").annotate(c=Count("id"))
+    )
+    rows = []
+    for project_id in Project.objects.values_list("id", flat=True).iterator():
+        day = day_counts.get(project_id, 0)
+        week = week_counts.get(project_id, 0)
+        rows.append(
+            ProjectActivity(
+                project_id=project_id,
+                changes_24h=day,
+                changes_7d=week,
+                stars=star_counts.get(project_id, 0),
+                score=day + week * 0.2,
+                last_activity_at=last_seen.get(project_id),
+                refreshed_at=now,
+            )
+        )
+    ProjectActivity.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_comment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectActivity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("changes_24h", models.PositiveIntegerField(default=0)),
+                ("changes_7d", models.PositiveIntegerField(default=0)),
+                ("stars", models.PositiveIntegerField(default=0)),
+                ("score", models.FloatField(default=0)),
+                ("last_activity_at", models.DateTimeField(blank=True, null=True)),
+                ("refreshed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "project",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activity",
+                        to="core.project",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["-score", "-last_activity_at"],
+                        name="core_projec_score_60f0fb_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,210 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _heading_label(Block, labels, entry_id, section_id, fallback):
+    if section_id:
+        heading_id = section_id if section_id.startswith("h_") else f"h_{section_id}"
+        key = (entry_id, heading_id)
+        if key not in labels:
+            labels[key] = (
+                Block.objects.filter(entry_id=entry_id, stable_id=heading_id)
+                .values_list("text", flat=True)
+                .first()
+            )
+        if labels[key]:
+            return labels[key][:300]
+    return (fallback or "Section")[:300]
+
+
+def _author_name(user):
+    if not user:
+        return "Anonymous"
+    full_name = f"{user.first_name} {user.last_name}".strip()
+    return full_name or user.username or "Anonymous"
+
+
+def backfill_events(apps, schema_editor):
+    ActivityEvent = apps.get_model("core", "ActivityEvent")
+    EntryHistory = apps.get_model("core", "EntryHistory")
+    Change = apps.get_model("core", "Change")
+    Comment = apps.get_model("core", "Comment")
+    Block = apps.get_model("core", "Block")
+    labels = {}
+    events = []
+    proposals = Change.objects.exclude(status="draft").select_related("author")
+    for change in proposals.iterator(chunk_size=1000):
+        events.append(
+            ActivityEvent(
+                project_id=change.project_id,
+                entry_id=change.target_entry_id,
+                change_id=change.id,
+                actor_id=change.author_id,
+                kind="proposal",
+                summary=f"📝 {_author_name(change.author)} proposed: {change.summary or 'Change'}"[:300],
+                section_label=_heading_label(
+                    Block,
+                    labels,
+                    change.target_entry_id,
+                    change.target_section_id,
+                    change.summary,
+                ),
+                link=f"/entries/{change.target_entry_id}/?focus={change.target_section_id or ''}&proposal={change.id}",
+                created_at=change.published_at or change.created_at,
+            )
+        )
+    history = EntryHistory.objects.filter(change__isnull=False).select_related(
+        "entry", "change"
+    )
+    for record in history.iterator(chunk_size=1000):
+        change = record.change
+        events.append(
+            ActivityEvent(
+                project_id=record.entry.project_id,
+                entry_id=record.entry_id,
+                change_id=change.id,
+                kind="merge",
+                summary=f"#{change.id} merged into v{record.version_int}",
+                section_label=_heading_label(
+                    Block,
+                    labels,
+                    record.entry_id,
+                    change.target_section_id,
+                    change.summary,
+                ),
+                link=f"/entries/{record.entry_id}/?focus={change.target_section_id or ''}&proposal={change.id}",
+                created_at=record.created_at,
+            )
+        )
+    comments = Comment.objects.select_related("author", "section", "change")
+    for comment in comments.iterator(chunk_size=1000):
+        author = _author_name(comment.author)
+        preview = comment.body if len(comment.body) <= 60 else comment.body[:59] + "…"
+        if comment.section_id:
+            entry_id = comment.section.entry_id
+            section_label = comment.section.heading[:300]
+            link = f"/entries/{entry_id}/?focus={comment.section.stable_id}"
+        else:
+            change = comment.change
+            entry_id = change.target_entry_id
+            section_label = _heading_label(
+                Block, labels, entry_id, change.target_section_id, change.summary
+            )
+            link = f"/entries/{entry_id}/?focus={change.target_section_id or ''}&proposal={change.id}"
+        events.append(
+            ActivityEvent(
+                project_id=comment.project_id,
+                entry_id=entry_id,
+                change_id=comment.change_id,
+                comment_id=comment.id,
+                actor_id=comment.author_id,
+                kind="comment",
+                summary=f"💬 {author}: {preview}"[:300],
+                section_label=section_label,
+                link=link,
+                created_at=comment.created_at,
+            )
+        )
+    ActivityEvent.objects.bulk_create(events, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_projectactivity"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("proposal", "Proposal"),
+                            ("merge", "Merge"),
+                            ("comment", "Comment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("summary", models.CharField(max_length=300)),
+                ("section_label", models.CharField(blank=True, max_length=300)),
+                ("link", models.CharField(blank=True, max_length=300)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="activity_events",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "change",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="activity_events",
+                        to="core.change",
+                    ),
+                ),
+                (
+                    "comment",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activity_events",
+                        to="core.comment",
+                    ),
+                ),
+                (
+                    "entry",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activity_events",
+                        to="core.entry",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activity_events",
+                        to="core.project",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at", "-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["project", "-created_at", "-id"],
+                        name="core_activi_project_75f4e3_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
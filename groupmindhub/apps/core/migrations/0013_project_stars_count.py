@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:35
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_stars_count(apps, schema_editor):
+    Project = apps.get_model("core", "Project")
+    ProjectStar = apps.get_model("core", "ProjectStar")
+    star_counts = (
+        ProjectStar.objects.values_list("project_id").annotate(c=Count("id")).order_by()
+    )
+    projects = []
+    for project_id, count in star_counts:
+        projects.append(Project(id=project_id, stars_count=count))
+    Project.objects.bulk_update(projects, ["stars_count"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_activityevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="stars_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_stars_count, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="projectactivity",
+            name="stars",
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_project_stars_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entryhistory",
+            name="ops_json",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="entryhistory",
+            name="snapshot",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="entryhistory",
+            index=models.Index(
+                fields=["entry", "version_int"], name="core_entryh_entry_i_2e6d4c_idx"
+            ),
+        ),
+    ]
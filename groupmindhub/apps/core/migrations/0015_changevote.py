@@ -0,0 +1,135 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def copy_change_votes(apps, schema_editor):
+    Vote = apps.get_model("core", "Vote")
+    Change = apps.get_model("core", "Change")
+    ChangeVote = apps.get_model("core", "ChangeVote")
+    votes = Vote.objects.filter(
+        target_type="change", target_id__in=Change.objects.values("id")
+    ).order_by("id")
+    batch = []
+    for vote in votes.iterator(chunk_size=BATCH_SIZE):
+        batch.append(vote)
+        if len(batch) >= BATCH_SIZE:
+            _copy_batch(ChangeVote, batch)
+            batch = []
+    if batch:
+        _copy_batch(ChangeVote, batch)
+    Vote.objects.filter(target_type="change").delete()
+    _recompute_vote_caches(Change, ChangeVote)
+
+
+def _copy_batch(ChangeVote, votes):
+    created = ChangeVote.objects.bulk_create(
+        [
+            ChangeVote(change_id=vote.target_id, user_id=vote.user_id, value=vote.value)
+            for vote in votes
+        ]
+    )
+    # auto_now/auto_now_add overwrite timestamps on insert; restore the originals.
+    for row, vote in zip(created, votes):
+        row.created_at = vote.created_at
+        row.updated_at = vote.updated_at
+    if all(row.pk for row in created):
+        ChangeVote.objects.bulk_update(created, ["created_at", "updated_at"])
+
+
+def _recompute_vote_caches(Change, ChangeVote):
+    """Set ``votes_cache_int`` to yes minus no from the copied votes (0 without votes)."""
+    tallies = (
+        ChangeVote.objects.values("change_id")
+        .annotate(
+            yes=models.Count("id", filter=models.Q(value__gt=0)),
+            no=models.Count("id", filter=models.Q(value__lt=0)),
+        )
+        .order_by("change_id")
+    )
+    batch = []
+    for row in tallies.iterator(chunk_size=BATCH_SIZE):
+        batch.append(Change(id=row["change_id"], votes_cache_int=row["yes"] - row["no"]))
+        if len(batch) >= BATCH_SIZE:
+            Change.objects.bulk_update(batch, ["votes_cache_int"])
+            batch = []
+    if batch:
+        Change.objects.bulk_update(batch, ["votes_cache_int"])
+    Change.objects.exclude(id__in=ChangeVote.objects.values("change_id")).exclude(
+        votes_cache_int=0
+    ).update(votes_cache_int=0)
+
+
+def restore_change_votes(apps, schema_editor):
+    Vote = apps.get_model("core", "Vote")
+    ChangeVote = apps.get_model("core", "ChangeVote")
+    Vote.objects.bulk_create(
+        [
+            Vote(
+                user_id=vote.user_id,
+                target_type="change",
+                target_id=vote.change_id,
+                value=vote.value,
+            )
+            for vote in ChangeVote.objects.iterator(chunk_size=BATCH_SIZE)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_entryhistory_delta"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeVote",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("value", models.SmallIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "change",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="votes",
+                        to="core.change",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="change_votes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["change", "value"],
+                        name="core_change_change__db036d_idx",
+                    )
+                ],
+                "unique_together": {("change", "user")},
+            },
+        ),
+        migrations.RunPython(copy_change_votes, restore_change_votes),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0015_changevote"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedChange",
+            fields=[
+                (
+                    "id",
+                    models.PositiveBigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("summary", models.CharField(max_length=300)),
+                ("ops_json", models.JSONField(blank=True, default=list)),
+                ("affected_blocks", models.JSONField(blank=True, default=list)),
+                ("before_outline", models.TextField(blank=True)),
+                ("after_outline", models.TextField(blank=True)),
+                ("base_entry_version_int", models.PositiveIntegerField(default=1)),
+                ("status", models.CharField(max_length=20)),
+                (
+                    "target_section_id",
+                    models.CharField(blank=True, default="", max_length=100),
+                ),
+                ("yes_votes", models.PositiveIntegerField(default=0)),
+                ("no_votes", models.PositiveIntegerField(default=0)),
+                ("comments", models.JSONField(blank=True, default=list)),
+                ("created_at", models.DateTimeField()),
+                ("published_at", models.DateTimeField(blank=True, null=True)),
+                ("merged_at", models.DateTimeField(blank=True, null=True)),
+                ("closes_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "archived_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "author",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_changes",
+                        to="core.project",
+                    ),
+                ),
+                (
+                    "target_entry",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_changes",
+                        to="core.entry",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["project", "-created_at"],
+                        name="core_archiv_project_6cee2b_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,115 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5("
+    "body, content='core_searchdocument', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER core_searchdocument_ai AFTER INSERT ON core_searchdocument BEGIN "
+    "INSERT INTO core_searchdocument_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER core_searchdocument_ad AFTER DELETE ON core_searchdocument BEGIN "
+    "INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, body) "
+    "VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER core_searchdocument_au AFTER UPDATE ON core_searchdocument BEGIN "
+    "INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, body) "
+    "VALUES ('delete', old.id, old.body); "
+    "INSERT INTO core_searchdocument_fts(rowid, body) VALUES (new.id, new.body); END",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_searchdocument_au",
+    "DROP TRIGGER IF EXISTS core_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS core_searchdocument_ai",
+    "DROP TABLE IF EXISTS core_searchdocument_fts",
+]
+POSTGRES_FORWARD = [
+    "ALTER TABLE core_searchdocument ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', coalesce(body, ''))) STORED",
+    "CREATE INDEX core_searchdocument_vector_gin ON core_searchdocument "
+    "USING GIN (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS core_searchdocument_vector_gin",
+    "ALTER TABLE core_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0016_archivedchange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("block", "Block"),
+                            ("change", "Change"),
+                            ("comment", "Comment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("ref", models.CharField(max_length=120)),
+                ("label", models.CharField(blank=True, max_length=300)),
+                ("body", models.TextField(blank=True)),
+                ("link", models.CharField(blank=True, max_length=300)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "entry",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_documents",
+                        to="core.entry",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_documents",
+                        to="core.project",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["project", "kind"],
+                        name="core_search_project_b2bfc1_idx",
+                    )
+                ],
+                "unique_together": {("kind", "ref")},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
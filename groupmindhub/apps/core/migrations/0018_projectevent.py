@@ -0,0 +1,61 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0017_searchdocument"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("vote", "Vote"),
+                            ("proposal", "Proposal"),
+                            ("merge", "Merge"),
+                            ("comment", "Comment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("payload", models.JSONField(default=dict)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="live_events",
+                        to="core.project",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["project", "id"], name="core_projec_project_d0fecd_idx"
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="core_projec_created_39ea8b_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
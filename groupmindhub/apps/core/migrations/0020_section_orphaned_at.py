@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0019_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="section",
+            name="orphaned_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
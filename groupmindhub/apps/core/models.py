@@ -4,7 +4,10 @@ from decimal import Decimal
 
 from django.conf import settings
 from django.core.exceptions import PermissionDenied, ValidationError
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
 
@@ -33,10 +36,45 @@ class Project(models.Model):
         default=DEFAULT_APPROVAL_THRESHOLD,
     )
     voting_duration_hours = models.PositiveIntegerField(default=DEFAULT_VOTING_DURATION_HOURS)
+    stars_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        creating = self._state.adding
+        super().save(*args, **kwargs)
+        if creating:
+            ProjectActivity.objects.get_or_create(project=self)
+            from .caching import ROLLUPS
+
+            ROLLUPS.invalidate()
+
+    # --- star helpers -------------------------------------------------------
+    def toggle_star(self, user) -> tuple[bool, int]:
+        """Star or unstar for ``user``; returns ``(starred, stars_count)``.
+
+        One DELETE (or INSERT) plus one F-expression UPDATE of ``stars_count`` in the same
+        transaction; removals are counted by a ``post_delete`` receiver, so cascades from a
+        deleted user decrement the count too. The returned count is re-read after the
+        UPDATE, and the cached home page rows are retired once the transaction commits.
+        """
+        from .caching import ROLLUPS
+
+        with transaction.atomic():
+            deleted, _ = ProjectStar.objects.filter(project=self, user=user).delete()
+            if not deleted:
+                try:
+                    with transaction.atomic():
+                        ProjectStar.objects.create(project=self, user=user)
+                except IntegrityError:
+                    pass  # A concurrent request starred first; the end state is already "starred".
+                else:
+                    Project.objects.filter(id=self.id).update(stars_count=F('stars_count') + 1)
+            self.refresh_from_db(fields=['stars_count'])
+            transaction.on_commit(ROLLUPS.invalidate)
+        return not deleted, self.stars_count
+
     # --- membership helpers -------------------------------------------------
     def add_member(self, user, role: str = None):
         """Add or update a membership for the given user."""
@@ -53,11 +91,21 @@ class Project(models.Model):
             return None
         return self.memberships.filter(user=user).first()
 
+    def role_map(self) -> dict[int, str]:
+        """``{user_id: role}`` for every member, cached until a membership changes."""
+        from .caching import ROLE_MAPS
+
+        return ROLE_MAPS.get_or_set(
+            (self.id,), lambda: dict(self.memberships.values_list('user_id', 'role'))
+        )
+
     def has_role(self, user, role: str):
-        membership = self.membership_for(user)
-        if not membership:
+        if not user or not getattr(user, 'is_authenticated', False):
+            return False
+        current = self.role_map().get(user.id)
+        if current is None:
             return False
-        return membership.has_at_least(role)
+        return ProjectMembership.ROLE_ORDER.get(current, 0) >= ProjectMembership.ROLE_ORDER.get(role, 0)
 
     def require_role(self, user, role: str, invite=None):
         membership = self.membership_for(user)
@@ -155,8 +203,9 @@ class Change(models.Model):
 
 
 class Vote(models.Model):
+    """Entry votes; votes on changes live in ``ChangeVote``."""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    target_type = models.CharField(max_length=20)  # 'entry' | 'change'
+    target_type = models.CharField(max_length=20)  # 'entry'
     target_id = models.PositiveIntegerField()
     value = models.SmallIntegerField(default=0)  # -1 | 0 | +1
     created_at = models.DateTimeField(auto_now_add=True)
@@ -169,29 +218,84 @@ class Vote(models.Model):
         return f"Vote({self.user_id},{self.target_type}:{self.target_id})={self.value}"
 
 
+class ChangeVote(models.Model):
+    change = models.ForeignKey(Change, related_name='votes', on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='change_votes', on_delete=models.CASCADE)
+    value = models.SmallIntegerField(default=0)  # -1 | +1
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('change', 'user')
+        indexes = [models.Index(fields=['change', 'value'])]
+
+    def __str__(self):
+        return f"ChangeVote({self.user_id},change:{self.change_id})={self.value}"
+
+
+class ArchivedChange(models.Model):
+    """Cold copy of a merged or closed ``Change``; keeps the original id, votes collapse to tallies."""
+    id = models.PositiveBigIntegerField(primary_key=True)
+    project = models.ForeignKey(Project, related_name='archived_changes', on_delete=models.CASCADE)
+    target_entry = models.ForeignKey(Entry, related_name='archived_changes', on_delete=models.CASCADE)
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    summary = models.CharField(max_length=300)
+    ops_json = models.JSONField(default=list, blank=True)
+    affected_blocks = models.JSONField(default=list, blank=True)
+    before_outline = models.TextField(blank=True)
+    after_outline = models.TextField(blank=True)
+    base_entry_version_int = models.PositiveIntegerField(default=1)
+    status = models.CharField(max_length=20)
+    target_section_id = models.CharField(max_length=100, blank=True, default="")
+    yes_votes = models.PositiveIntegerField(default=0)
+    no_votes = models.PositiveIntegerField(default=0)
+    comments = models.JSONField(default=list, blank=True)  # read-only copies, oldest first
+    created_at = models.DateTimeField()
+    published_at = models.DateTimeField(null=True, blank=True)
+    merged_at = models.DateTimeField(null=True, blank=True)
+    closes_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['project', '-created_at'])]
+
+    def __str__(self):
+        return f"ArchivedChange #{self.pk} ({self.status})"
+
+
 class EntryHistory(models.Model):
     entry = models.ForeignKey(Entry, related_name='history', on_delete=models.CASCADE)
     change = models.ForeignKey('Change', null=True, blank=True, related_name='history_records', on_delete=models.SET_NULL)
     version_int = models.PositiveIntegerField()
+    # Legacy full-text outlines; new rows leave them blank (see core.history).
     outline_before = models.TextField(blank=True)
     outline_after = models.TextField(blank=True)
+    ops_json = models.JSONField(default=list, blank=True)
+    snapshot = models.BinaryField(null=True, blank=True)  # zlib-compressed block list
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['version_int', 'id']
+        indexes = [models.Index(fields=['entry', 'version_int'])]
 
     def __str__(self):
         return f"History(entry={self.entry_id}, v={self.version_int})"
 
 
 class Section(models.Model):
-    """Atomic editing unit: a heading + body text (multi-paragraph allowed)."""
+    """Atomic editing unit: a heading + body text (multi-paragraph allowed).
+
+    When a merge removes the heading, the row stays with ``orphaned_at`` set so its
+    comments survive; it is revived if a heading with the same ``stable_id`` returns.
+    """
     entry = models.ForeignKey(Entry, related_name='sections', on_delete=models.CASCADE)
     stable_id = models.CharField(max_length=100, db_index=True)
     heading = models.CharField(max_length=300)
     body = models.TextField(blank=True)
     position = models.FloatField(default=0, db_index=True)
     parent = models.ForeignKey('self', null=True, blank=True, related_name='children', on_delete=models.CASCADE)
+    orphaned_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -215,6 +319,34 @@ class ProjectStar(models.Model):
         return f"Star(p={self.project_id},u={self.user_id})"
 
 
+@receiver(post_delete, sender=ProjectStar)
+def _uncount_deleted_star(sender, instance, **kwargs):
+    # Also runs for cascades from a deleted user, which skip ``toggle_star``.
+    from .caching import ROLLUPS
+
+    Project.objects.filter(id=instance.project_id, stars_count__gt=0).update(stars_count=F('stars_count') - 1)
+    transaction.on_commit(ROLLUPS.invalidate)
+
+
+class ProjectActivity(models.Model):
+    """Per-project activity rollup kept current incrementally; read by the home page."""
+
+    project = models.OneToOneField(Project, related_name='activity', on_delete=models.CASCADE)
+    changes_24h = models.PositiveIntegerField(default=0)
+    changes_7d = models.PositiveIntegerField(default=0)
+    score = models.FloatField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score', '-last_activity_at']),
+        ]
+
+    def __str__(self):
+        return f"Activity(p={self.project_id},score={self.score})"
+
+
 class ProjectMembership(models.Model):
     class Role(models.TextChoices):
         OWNER = 'owner', 'Owner'
@@ -239,6 +371,18 @@ class ProjectMembership(models.Model):
     def __str__(self):
         return f"Membership(p={self.project_id},u={self.user_id},role={self.role})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.forget_role_maps([self.project_id])
+
+    @staticmethod
+    def forget_role_maps(project_ids) -> None:
+        """Drop cached role maps; call after writes that bypass ``save`` (``bulk_create``)."""
+        from .caching import ROLE_MAPS
+
+        for project_id in set(project_ids):
+            ROLE_MAPS.delete((project_id,))
+
     # Helper methods ---------------------------------------------------------
     def has_at_least(self, role: str) -> bool:
         required = self.ROLE_ORDER.get(role, 0)
@@ -254,6 +398,12 @@ class ProjectMembership(models.Model):
         return self.has_at_least(self.Role.EDITOR)
 
 
+@receiver(post_delete, sender=ProjectMembership)
+def _forget_deleted_membership_role(sender, instance, **kwargs):
+    # Also runs for cascades from a deleted user or project, which skip ``delete()``.
+    ProjectMembership.forget_role_maps([instance.project_id])
+
+
 class ProjectInvite(models.Model):
     project = models.ForeignKey(Project, related_name='invites', on_delete=models.CASCADE)
     email = models.EmailField()
@@ -417,10 +567,16 @@ class GovernanceProposal(models.Model):
             self.save(update_fields=['status', 'decided_at'])
 
     def apply_to_project(self):
+        from .logic import reevaluate_open_changes
+
+        fields = ['voting_pool_size', 'approval_threshold', 'voting_duration_hours']
+        changed = [field for field in fields if getattr(self.project, field) != getattr(self, field)]
         self.project.voting_pool_size = self.voting_pool_size
         self.project.approval_threshold = self.approval_threshold
         self.project.voting_duration_hours = self.voting_duration_hours
-        self.project.save(update_fields=['voting_pool_size', 'approval_threshold', 'voting_duration_hours'])
+        self.project.save(update_fields=fields)
+        if changed:
+            reevaluate_open_changes(self.project, changed)
 
 
 class GovernanceApproval(models.Model):
@@ -497,7 +653,20 @@ class Comment(models.Model):
         if self.change_id and not self.project_id:
             self.project = self.change.project
         self.full_clean(exclude={'project'})
+        creating = self._state.adding
         super().save(*args, **kwargs)
+        if creating:
+            from .activity import record_comment_event
+            from .search import index_comment
+
+            record_comment_event(self)
+            index_comment(self)
+
+    def delete(self, *args, **kwargs):
+        from .search import unindex_comment
+
+        unindex_comment(self.id)
+        return super().delete(*args, **kwargs)
 
     @property
     def target_type(self) -> str:
@@ -510,3 +679,130 @@ class Comment(models.Model):
         if self.section_id:
             return self.section.stable_id
         return None
+
+
+class ActivityEvent(models.Model):
+    """Denormalized feed row for the updates hub, read per followed project newest-first."""
+
+    class Kind(models.TextChoices):
+        PROPOSAL = 'proposal', 'Proposal'
+        MERGE = 'merge', 'Merge'
+        COMMENT = 'comment', 'Comment'
+
+    project = models.ForeignKey(Project, related_name='activity_events', on_delete=models.CASCADE)
+    entry = models.ForeignKey(Entry, related_name='activity_events', null=True, blank=True, on_delete=models.CASCADE)
+    change = models.ForeignKey(Change, related_name='activity_events', null=True, blank=True, on_delete=models.SET_NULL)
+    comment = models.ForeignKey(Comment, related_name='activity_events', null=True, blank=True, on_delete=models.CASCADE)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='activity_events',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    summary = models.CharField(max_length=300)
+    section_label = models.CharField(max_length=300, blank=True)
+    link = models.CharField(max_length=300, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['project', '-created_at', '-id']),
+        ]
+
+    def __str__(self):
+        return f"ActivityEvent(p={self.project_id},{self.kind})"
+
+
+class ProjectEvent(models.Model):
+    """Short-lived live-update row streamed to ``/api/projects/<id>/events`` subscribers.
+
+    Unlike ``ActivityEvent`` (the durable feed) this also carries vote tallies and is pruned
+    after a day; see ``core.events``.
+    """
+
+    class Kind(models.TextChoices):
+        VOTE = 'vote', 'Vote'
+        PROPOSAL = 'proposal', 'Proposal'
+        MERGE = 'merge', 'Merge'
+        COMMENT = 'comment', 'Comment'
+
+    project = models.ForeignKey(Project, related_name='live_events', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'id']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"ProjectEvent(p={self.project_id},{self.kind})"
+
+
+class Job(models.Model):
+    """Durable background job; claimed by ``manage.py run_worker``, see ``core.jobs``.
+
+    Jobs sharing a non-empty ``serialization_key`` (e.g. ``entry:12``) never run at the
+    same time. Successful jobs are deleted; jobs out of attempts stay as ``failed``.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        FAILED = 'failed', 'Failed'
+
+    kind = models.CharField(max_length=60)
+    payload = models.JSONField(default=dict)
+    serialization_key = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+            models.Index(fields=['serialization_key', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Job({self.kind},{self.status})"
+
+
+class SearchDocument(models.Model):
+    """Searchable text for one block, change summary or comment.
+
+    The full-text index over ``body`` is backend specific and created by migration: an
+    FTS5 table kept in sync by triggers on SQLite, a generated ``tsvector`` column with a
+    GIN index on PostgreSQL. See ``core.search``.
+    """
+
+    class Kind(models.TextChoices):
+        BLOCK = 'block', 'Block'
+        CHANGE = 'change', 'Change'
+        COMMENT = 'comment', 'Comment'
+
+    project = models.ForeignKey(Project, related_name='search_documents', on_delete=models.CASCADE)
+    entry = models.ForeignKey(Entry, related_name='search_documents', null=True, blank=True, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    ref = models.CharField(max_length=120)  # "<entry id>:<stable id>" for blocks, the row id otherwise
+    label = models.CharField(max_length=300, blank=True)
+    body = models.TextField(blank=True)
+    link = models.CharField(max_length=300, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'ref')
+        indexes = [models.Index(fields=['project', 'kind'])]
+
+    def __str__(self):
+        return f"SearchDocument({self.kind}:{self.ref})"
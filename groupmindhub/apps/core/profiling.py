@@ -0,0 +1,211 @@
+"""Opt-in profiling of single requests for project owners and staff.
+
+A request with ``?profile=1`` or an ``X-Profile: 1`` header from a staff user, or from
+an owner of the project the URL points at, runs under a sampling profiler (see
+``middleware.ProfilingMiddleware``). The stacks of the threads serving the request are
+read every ``PROFILE_INTERVAL_MS``, so ORM, serialization, template rendering and JSON
+encoding all show up, including the ``sync_to_async`` thread of async views. Each
+capture is written to ``PROFILE_DIR`` as ``<id>.folded`` (collapsed stacks for
+flamegraph.pl or speedscope) plus ``<id>.json`` (request details and SQL trace); only
+the newest ``PROFILE_RETENTION`` captures are kept.
+
+Under ASGI the event-loop thread serves every concurrent request, so its samples are
+kept only while the profiled request's task is the one running (``skipped_samples``
+counts the rest). Django's ASGI handler gives each request its own ``sync_to_async``
+thread, which is sampled as is. Work the request hands to other tasks or to
+``thread_sensitive=False`` executors is not captured.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List
+
+from django.conf import settings
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from .models import Change, Entry, Project, ProjectMembership
+
+PROFILE_PARAM = 'profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+SQL_TEXT_LIMIT = 2000
+PROFILE_ID_RE = re.compile(r'^\d{8}T\d{6}-[0-9a-f]{8}$')
+
+
+def wants_profile(request) -> bool:
+    return request.GET.get(PROFILE_PARAM) == '1' or request.META.get(PROFILE_HEADER) == '1'
+
+
+def can_profile(user, path: str) -> bool:
+    """Staff may profile any URL; owners may profile URLs of their own project."""
+    if not user or not user.is_authenticated:
+        return False
+    if user.is_staff:
+        return True
+    try:
+        kwargs = resolve(path).kwargs
+    except Resolver404:
+        return False
+    project_id = kwargs.get('project_id')
+    if project_id is None and 'entry_id' in kwargs:
+        project_id = Entry.objects.filter(id=kwargs['entry_id']).values_list('project_id', flat=True).first()
+    if project_id is None and 'change_id' in kwargs:
+        project_id = Change.objects.filter(id=kwargs['change_id']).values_list('project_id', flat=True).first()
+    project = Project.objects.filter(id=project_id).first() if project_id else None
+    return bool(project and project.has_role(user, ProjectMembership.Role.OWNER))
+
+
+@dataclass
+class SqlTrace:
+    """``execute_wrapper`` recording every statement (without parameters) and its duration."""
+
+    queries: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql[:SQL_TEXT_LIMIT],
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+                'many': many,
+            })
+
+
+@lru_cache(maxsize=8192)
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    for prefix in (str(settings.BASE_DIR), *sys.path):
+        if prefix and filename.startswith(prefix):
+            filename = filename[len(prefix):].lstrip('/')
+            break
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+def task_is_running(loop: asyncio.AbstractEventLoop, task: asyncio.Task) -> Callable[[], bool]:
+    """Predicate for ``StackSampler``: is ``task`` the one running on ``loop`` right now?"""
+    return lambda: asyncio.current_task(loop) is task
+
+
+class StackSampler:
+    """Collects the collapsed Python stacks of ``thread_ids`` from a background thread.
+
+    ``owners`` maps a thread id to a predicate; that thread is sampled only while the
+    predicate holds (checked before and after reading the stack), other samples of it
+    are counted in ``skipped``.
+    """
+
+    def __init__(
+        self,
+        thread_ids: Iterable[int],
+        interval: float,
+        owners: Dict[int, Callable[[], bool]] | None = None,
+    ):
+        self.thread_ids = set(thread_ids)
+        self.interval = interval
+        self.owners = owners or {}
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.skipped = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id not in self.thread_ids:
+                continue
+            owned = self.owners.get(thread_id)
+            if owned is not None and not owned():
+                self.skipped += 1
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if owned is not None and not owned():
+                self.skipped += 1
+                continue
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.stacks[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+
+def profile_dir() -> Path:
+    return Path(settings.PROFILE_DIR)
+
+
+def save_profile(meta: Dict[str, Any], stacks: Counter, queries: List[Dict[str, Any]]) -> str:
+    """Write a capture to disk, drop the oldest beyond ``PROFILE_RETENTION``; returns its id."""
+    now = timezone.now()
+    profile_id = f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    folded = ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+    (directory / f'{profile_id}.folded').write_text(folded, encoding='utf-8')
+    payload = {
+        **meta,
+        'id': profile_id,
+        'created_at': now.isoformat(),
+        'sql_count': len(queries),
+        'sql_ms': round(sum(q['ms'] for q in queries), 3),
+        'queries': queries,
+    }
+    (directory / f'{profile_id}.json').write_text(json.dumps(payload, indent=1), encoding='utf-8')
+    prune_profiles(settings.PROFILE_RETENTION)
+    return profile_id
+
+
+def prune_profiles(keep: int) -> int:
+    captures = sorted(profile_dir().glob('*.json'), reverse=True)
+    for stale in captures[max(0, keep):]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix('.folded').unlink(missing_ok=True)
+    return max(0, len(captures) - keep)
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Summaries of the stored captures, newest first (SQL traces left out)."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    out = []
+    for path in sorted(directory.glob('*.json'), reverse=True):
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        data.pop('queries', None)
+        out.append(data)
+    return out
+
+
+def profile_path(profile_id: str, kind: str) -> Path | None:
+    """Path of a capture's ``folded`` or ``json`` file, or ``None`` for unknown ids."""
+    if kind not in ('folded', 'json') or not PROFILE_ID_RE.match(profile_id):
+        return None
+    path = profile_dir() / f'{profile_id}.{kind}'
+    return path if path.is_file() else None
@@ -0,0 +1,232 @@
+"""Full-text search over block text, change summaries and comments.
+
+Writers keep one ``SearchDocument`` row per searchable object up to date (blocks on
+merge/import, summaries when a change is proposed, comments on create/delete); that
+table is the whole write-side interface. Matching and ranking come from the database:
+an FTS5 external-content table on SQLite and a generated ``tsvector`` column with a GIN
+index on PostgreSQL, both created by migration 0017. Other backends fall back to
+unranked ``icontains`` matching.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.text import Truncator
+
+from .logic import BlockState
+from .models import Change, Comment, Entry, SearchDocument
+
+SEARCH_PAGE_SIZE = 20
+MAX_TERMS = 8
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+BULK_BATCH_SIZE = 500
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    ref: str
+    entry_id: int | None
+    label: str
+    snippet: str
+    link: str
+    rank: float
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of ``query``; operators and quotes are dropped so user input is never query syntax."""
+    return TOKEN_RE.findall(query or '')[:MAX_TERMS]
+
+
+def block_ref(entry_id: int, stable_id: str) -> str:
+    return f"{entry_id}:{stable_id}"
+
+
+def _section_id(heading_id: str) -> str:
+    return heading_id[2:] if heading_id.startswith('h_') else heading_id
+
+
+def _upsert(documents: List[SearchDocument]) -> None:
+    if documents:
+        SearchDocument.objects.bulk_create(
+            documents,
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['kind', 'ref'],
+            update_fields=['project', 'entry', 'label', 'body', 'link', 'updated_at'],
+        )
+
+
+# --- indexing -----------------------------------------------------------------
+def index_entry_blocks(entry: Entry, blocks: List[BlockState], only_ids: Iterable[str] | None = None,
+                       removed_ids: Iterable[str] = ()) -> None:
+    """Upsert documents for ``entry``'s blocks (all, or just ``only_ids``) and drop removed ones.
+
+    ``blocks`` is the entry's full block list so labels can name each block's section.
+    A renamed heading also refreshes the labels of its direct children.
+    """
+    by_id = {b.stable_id: b for b in blocks}
+    selected = None
+    if only_ids is not None:
+        selected = set(only_ids)
+        headings = {bid for bid in selected if bid in by_id and by_id[bid].type == 'h2'}
+        selected |= {b.stable_id for b in blocks if b.parent_stable_id in headings}
+    documents = []
+    for block in blocks:
+        if selected is not None and block.stable_id not in selected:
+            continue
+        heading = block if block.type == 'h2' else by_id.get(block.parent_stable_id or '')
+        label = heading.text if heading else entry.title
+        focus = _section_id(heading.stable_id) if heading else ''
+        documents.append(SearchDocument(
+            project_id=entry.project_id,
+            entry=entry,
+            kind=SearchDocument.Kind.BLOCK,
+            ref=block_ref(entry.id, block.stable_id),
+            label=Truncator(label).chars(300),
+            body=block.text,
+            link=f"/entries/{entry.id}/?focus={focus}",
+        ))
+    removed_ids = list(removed_ids)
+    if removed_ids:
+        SearchDocument.objects.filter(
+            kind=SearchDocument.Kind.BLOCK, ref__in=[block_ref(entry.id, bid) for bid in removed_ids]
+        ).delete()
+    _upsert(documents)
+
+
+def reindex_entry(entry: Entry) -> None:
+    """Replace every block document of ``entry`` (after imports or bulk seeding)."""
+    SearchDocument.objects.filter(kind=SearchDocument.Kind.BLOCK, entry=entry).delete()
+    blocks = [BlockState.from_block(b) for b in entry.blocks.order_by('position', 'id')]
+    index_entry_blocks(entry, blocks)
+
+
+def _change_document(change: Change) -> SearchDocument:
+    return SearchDocument(
+        project_id=change.project_id,
+        entry_id=change.target_entry_id,
+        kind=SearchDocument.Kind.CHANGE,
+        ref=str(change.id),
+        label=Truncator(change.summary).chars(300),
+        body=change.summary,
+        link=f"/changes/{change.id}/",
+    )
+
+
+def index_change(change: Change) -> None:
+    _upsert([_change_document(change)])
+
+
+def _comment_document(comment: Comment) -> SearchDocument:
+    if comment.section_id:
+        section = comment.section
+        entry_id = section.entry_id
+        label = section.heading
+        link = f"/entries/{entry_id}/?focus={section.stable_id}"
+    else:
+        change = comment.change
+        entry_id = change.target_entry_id
+        label = change.summary
+        link = f"/changes/{change.id}/"
+    return SearchDocument(
+        project_id=comment.project_id,
+        entry_id=entry_id,
+        kind=SearchDocument.Kind.COMMENT,
+        ref=str(comment.id),
+        label=Truncator(label).chars(300),
+        body=comment.body,
+        link=link,
+    )
+
+
+def index_comment(comment: Comment) -> None:
+    _upsert([_comment_document(comment)])
+
+
+def unindex_comment(comment_id: int) -> None:
+    SearchDocument.objects.filter(kind=SearchDocument.Kind.COMMENT, ref=str(comment_id)).delete()
+
+
+def rebuild_project_index(project_id: int) -> int:
+    """Recreate every document of one project from source rows; returns the document count."""
+    SearchDocument.objects.filter(project_id=project_id).delete()
+    for entry in Entry.objects.filter(project_id=project_id):
+        reindex_entry(entry)
+    _upsert([_change_document(c) for c in Change.objects.filter(project_id=project_id)])
+    comments = Comment.objects.filter(project_id=project_id).select_related('section', 'change')
+    _upsert([_comment_document(c) for c in comments])
+    return SearchDocument.objects.filter(project_id=project_id).count()
+
+
+# --- querying -----------------------------------------------------------------
+def _sqlite_search(project_id: int, terms: List[str], limit: int, offset: int) -> List[Tuple[int, float]]:
+    match = ' '.join('"%s"' % term.replace('"', '') for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT d.id, bm25(core_searchdocument_fts) AS rank "
+            "FROM core_searchdocument_fts JOIN core_searchdocument d ON d.id = core_searchdocument_fts.rowid "
+            "WHERE core_searchdocument_fts MATCH %s AND d.project_id = %s "
+            "ORDER BY rank, d.id LIMIT %s OFFSET %s",
+            [match, project_id, limit, offset],
+        )
+        # bm25 is lower-is-better; flip it so callers always see higher-is-better.
+        return [(doc_id, -rank) for doc_id, rank in cursor.fetchall()]
+
+
+def _postgres_search(project_id: int, terms: List[str], limit: int, offset: int) -> List[Tuple[int, float]]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT id, ts_rank(search_vector, query) AS rank "
+            "FROM core_searchdocument, plainto_tsquery('english', %s) query "
+            "WHERE project_id = %s AND search_vector @@ query "
+            "ORDER BY rank DESC, id LIMIT %s OFFSET %s",
+            [' '.join(terms), project_id, limit, offset],
+        )
+        return list(cursor.fetchall())
+
+
+def _fallback_search(project_id: int, terms: List[str], limit: int, offset: int) -> List[Tuple[int, float]]:
+    condition = Q()
+    for term in terms:
+        condition &= Q(body__icontains=term)
+    ids = SearchDocument.objects.filter(condition, project_id=project_id).order_by('id').values_list('id', flat=True)
+    return [(doc_id, 0.0) for doc_id in ids[offset:offset + limit]]
+
+
+BACKENDS = {
+    'sqlite': _sqlite_search,
+    'postgresql': _postgres_search,
+}
+
+
+def search(project_id: int, query: str, page: int = 1, page_size: int = SEARCH_PAGE_SIZE) -> Tuple[List[SearchHit], bool]:
+    """One ranked page of hits for ``query`` in a project; returns ``(hits, has_next)``."""
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+    page = max(1, page)
+    backend = BACKENDS.get(connection.vendor, _fallback_search)
+    ranked = backend(project_id, terms, page_size + 1, (page - 1) * page_size)
+    has_next = len(ranked) > page_size
+    ranked = ranked[:page_size]
+    documents = SearchDocument.objects.in_bulk([doc_id for doc_id, _rank in ranked])
+    hits = []
+    for doc_id, rank in ranked:
+        doc = documents.get(doc_id)
+        if doc is None:
+            continue
+        hits.append(SearchHit(
+            kind=doc.kind,
+            ref=doc.ref,
+            entry_id=doc.entry_id,
+            label=doc.label,
+            snippet=Truncator(doc.body).chars(200),
+            link=doc.link,
+            rank=float(rank),
+        ))
+    return hits, has_next
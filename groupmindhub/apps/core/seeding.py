@@ -0,0 +1,125 @@
+"""Bulk creation of an entry's initial section tree (headings + bodies).
+
+``project_new`` submits the builder's nested ``sections_json``; the tree is flattened in
+memory and written with one ``bulk_create`` for the blocks and one per depth level for
+the sections (each level needs its parents' primary keys).
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from django.db import transaction
+
+from .models import Block, Entry, Section
+
+BULK_BATCH_SIZE = 500
+
+
+@dataclass
+class SeedNode:
+    stable_id: str
+    heading: str
+    body: str
+    parent_stable_id: str | None
+    depth: int
+    position: int
+
+
+def normalize_section_tree(nodes) -> List[Dict[str, Any]]:
+    """Drop empty nodes and coerce the builder payload into ``{heading, body, children}`` dicts."""
+    out = []
+    if not isinstance(nodes, list):
+        return out
+    for node in nodes:
+        heading = (node.get('heading') if isinstance(node, dict) else '') or ''
+        body = (node.get('body') if isinstance(node, dict) else '') or ''
+        children = normalize_section_tree(node.get('children') if isinstance(node, dict) else [])
+        if not heading.strip() and not body.strip() and not children:
+            continue
+        out.append({
+            'heading': heading.strip(),
+            'body': body.strip(),
+            'children': children,
+        })
+    return out
+
+
+def flatten_section_tree(tree: List[Dict[str, Any]]) -> List[SeedNode]:
+    """Pre-order walk assigning path-derived stable ids (``s1_2``) and section positions."""
+    flat: List[SeedNode] = []
+    stack = [(node, None, (idx,)) for idx, node in reversed(list(enumerate(tree, start=1)))]
+    while stack:
+        node, parent_stable_id, path = stack.pop()
+        stable_id = 's' + '_'.join(str(p) for p in path)
+        flat.append(SeedNode(
+            stable_id=stable_id,
+            heading=node['heading'] or f"Section {'.'.join(str(p) for p in path)}",
+            body=node['body'],
+            parent_stable_id=parent_stable_id,
+            depth=len(path),
+            position=len(flat) + 1,
+        ))
+        children = node.get('children') or []
+        for idx in range(len(children), 0, -1):
+            stack.append((children[idx - 1], stable_id, path + (idx,)))
+    return flat
+
+
+def seed_entry_sections(entry: Entry, tree: List[Dict[str, Any]]) -> int:
+    """Persist a normalized section tree as ``Section`` rows plus ``h2``/``p`` blocks.
+
+    Returns the number of sections created.
+    """
+    flat = flatten_section_tree(tree)
+    if not flat:
+        return 0
+    blocks: List[Block] = []
+    by_depth: Dict[int, List[SeedNode]] = defaultdict(list)
+    for node in flat:
+        by_depth[node.depth].append(node)
+        heading_block_id = f'h_{node.stable_id}'
+        blocks.append(Block(
+            entry=entry,
+            stable_id=heading_block_id,
+            type='h2',
+            text=node.heading,
+            parent_stable_id=f'h_{node.parent_stable_id}' if node.parent_stable_id else None,
+            position=len(blocks) + 1,
+        ))
+        if node.body:
+            blocks.append(Block(
+                entry=entry,
+                stable_id=f'p_{node.stable_id}',
+                type='p',
+                text=node.body,
+                parent_stable_id=heading_block_id,
+                position=len(blocks) + 1,
+            ))
+
+    with transaction.atomic():
+        section_ids: Dict[str, int] = {}
+        for depth in sorted(by_depth):
+            rows = [
+                Section(
+                    entry=entry,
+                    stable_id=node.stable_id,
+                    heading=node.heading,
+                    body=node.body,
+                    parent_id=section_ids.get(node.parent_stable_id) if node.parent_stable_id else None,
+                    position=node.position,
+                )
+                for node in by_depth[depth]
+            ]
+            created = Section.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE)
+            if any(row.pk is None for row in created):
+                # Backends without RETURNING support: look the new ids up by stable id.
+                section_ids.update(
+                    Section.objects.filter(entry=entry, stable_id__in=[n.stable_id for n in by_depth[depth]])
+                    .values_list('stable_id', 'id')
+                )
+            else:
+                section_ids.update((row.stable_id, row.pk) for row in created)
+        Block.objects.bulk_create(blocks, batch_size=BULK_BATCH_SIZE)
+    return len(flat)
@@ -0,0 +1,20 @@
+"""Test helper asserting how many queries a request may issue."""
+from django.db import connection
+
+from groupmindhub.apps.core.instrumentation import QueryStats
+
+
+class QueryBudgetMixin:
+    """Mix into a ``TestCase``; ``assertQueryBudget`` fails with the repeated SQL shapes."""
+
+    def assertQueryBudget(self, budget: int, method: str, path: str, **kwargs):
+        stats = QueryStats()
+        with connection.execute_wrapper(stats):
+            response = getattr(self.client, method.lower())(path, **kwargs)
+        if stats.count > budget:
+            repeated = '\n'.join(f'  {n}x {shape}' for shape, n in stats.repeated_shapes(10)) or '  (none)'
+            self.fail(
+                f'{method.upper()} {path} issued {stats.count} queries, budget is {budget}.\n'
+                f'Repeated shapes:\n{repeated}'
+            )
+        return response
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from groupmindhub.apps.core.activity import record_change_created
+from groupmindhub.apps.core.models import Change, Entry, Project, ProjectActivity, ProjectStar
+
+
+class ProjectActivityTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('member', password='pass-1234')
+        self.quiet = Project.objects.create(name='Quiet Project')
+        self.busy = Project.objects.create(name='Busy Project')
+        self.entry = Entry.objects.create(project=self.busy, title='Trunk', author=self.user)
+
+    def test_project_creation_seeds_rollup(self):
+        self.assertTrue(ProjectActivity.objects.filter(project=self.quiet).exists())
+
+    def test_incremental_counters(self):
+        record_change_created(self.busy.id)
+        record_change_created(self.busy.id)
+        busy = ProjectActivity.objects.get(project=self.busy)
+        self.assertEqual((busy.changes_24h, busy.changes_7d), (2, 2))
+        self.assertAlmostEqual(busy.score, 2.4)
+        self.assertIsNotNone(busy.last_activity_at)
+
+    def test_star_toggle_maintains_count(self):
+        client = Client()
+        client.force_login(self.user)
+        url = reverse('project_star_toggle', args=[self.quiet.id])
+        response = client.post(url)
+        self.assertEqual(response.json(), {'project_id': self.quiet.id, 'starred': True, 'stars': 1})
+        self.quiet.refresh_from_db()
+        self.assertEqual(self.quiet.stars_count, 1)
+        response = client.post(url)
+        self.assertEqual(response.json()['starred'], False)
+        self.quiet.refresh_from_db()
+        self.assertEqual(self.quiet.stars_count, 0)
+        self.assertFalse(ProjectStar.objects.filter(project=self.quiet).exists())
+
+    def test_star_toggle_is_two_statements(self):
+        ProjectStar.objects.create(project=self.quiet, user=self.user)
+        Project.objects.filter(id=self.quiet.id).update(stars_count=1)
+        self.quiet.refresh_from_db()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.quiet.toggle_star(self.user), (False, 0))
+        writes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith(('DELETE', 'UPDATE', 'INSERT'))]
+        self.assertEqual(len(writes), 2)
+
+    def test_star_toggle_returns_the_stored_count(self):
+        other = get_user_model().objects.create_user('other-starrer', password='pass-1234')
+        stale = Project.objects.get(id=self.quiet.id)
+        self.quiet.toggle_star(other)
+        self.assertEqual(stale.toggle_star(self.user), (True, 2))
+        self.assertEqual(stale.toggle_star(self.user), (False, 1))
+
+    def test_deleting_a_user_uncounts_their_stars(self):
+        other = get_user_model().objects.create_user('leaver', password='pass-1234')
+        self.quiet.toggle_star(other)
+        other.delete()
+        self.quiet.refresh_from_db()
+        self.assertEqual(self.quiet.stars_count, 0)
+
+    def test_refresh_full_recounts_stars(self):
+        ProjectStar.objects.create(project=self.busy, user=self.user)
+        call_command('refresh_project_activity', '--full', stdout=StringIO())
+        self.busy.refresh_from_db()
+        self.assertEqual(self.busy.stars_count, 1)
+
+    def test_refresh_command_decays_windows(self):
+        change = Change.objects.create(project=self.busy, target_entry=self.entry, summary='Old change')
+        Change.objects.filter(id=change.id).update(created_at=timezone.now() - timedelta(days=3))
+        record_change_created(self.busy.id)
+        call_command('refresh_project_activity', stdout=StringIO())
+        busy = ProjectActivity.objects.get(project=self.busy)
+        self.assertEqual((busy.changes_24h, busy.changes_7d), (0, 1))
+        self.assertAlmostEqual(busy.score, 0.2)
+
+    def test_index_orders_by_activity(self):
+        record_change_created(self.busy.id)
+        client = Client()
+        response = client.get(reverse('index'))
+        names = [row['name'] for row in response.context['projects']]
+        self.assertEqual(names, ['Busy Project', 'Quiet Project'])
+
+
+class ActivityEventMigrationTests(TransactionTestCase):
+    migrate_from = [('core', '0011_projectactivity')]
+    migrate_to = [('core', '0012_activityevent')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfills_events_for_published_proposals(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        old_apps = executor.loader.project_state(self.migrate_from).apps
+        User = old_apps.get_model('auth', 'User')
+        Project = old_apps.get_model('core', 'Project')
+        Entry = old_apps.get_model('core', 'Entry')
+        Change = old_apps.get_model('core', 'Change')
+        author = User.objects.create(username='legacy', first_name='Ada')
+        project = Project.objects.create(name='Legacy Project')
+        entry = Entry.objects.create(project=project, title='Trunk')
+        published = Change.objects.create(
+            project=project, target_entry=entry, author=author, summary='Quorum', status='published',
+            published_at=timezone.now() - timedelta(days=2),
+        )
+        Change.objects.create(project=project, target_entry=entry, author=author, summary='Draft', status='draft')
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        ActivityEvent = executor.loader.project_state(self.migrate_to).apps.get_model('core', 'ActivityEvent')
+
+        events = list(ActivityEvent.objects.filter(kind='proposal'))
+        self.assertEqual([event.change_id for event in events], [published.id])
+        self.assertEqual(events[0].summary, '📝 Ada proposed: Quorum')
+        self.assertEqual(events[0].created_at, published.published_at)
@@ -1,11 +1,14 @@
 import json
 from decimal import Decimal
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from groupmindhub.apps.core.models import (
     Block,
     Change,
+    ChangeVote,
     Entry,
     Project,
     ProjectMembership,
@@ -170,3 +173,26 @@ class ChangeApiTests(TestCase):
         self.assertIsNotNone(change.closes_at)
         expected_close = change.published_at + timezone.timedelta(hours=36)
         self.assertEqual(change.closes_at, expected_close)
+
+    def test_changes_list_tallies_votes_without_per_change_queries(self):
+        changes = [
+            Change.objects.create(project=self.project, target_entry=self.entry, summary=f'Change {i}', status='published')
+            for i in range(3)
+        ]
+        ChangeVote.objects.create(change=changes[0], user=self.user, value=1)
+        ChangeVote.objects.create(change=changes[0], user=self.viewer, value=-1)
+        ChangeVote.objects.create(change=changes[1], user=self.viewer, value=1)
+        self.client.force_login(self.user)
+        url = f'/api/projects/{self.project.id}/changes'
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        Change.objects.create(project=self.project, target_entry=self.entry, summary='One more', status='published')
+        with CaptureQueriesContext(connection) as more:
+            response = self.client.get(url)
+        self.assertEqual(len(more), len(few))
+        by_id = {item['id']: item for item in response.json()['changes']}
+        self.assertEqual((by_id[changes[0].id]['yes'], by_id[changes[0].id]['no']), (1, 1))
+        self.assertEqual(by_id[changes[0].id]['current_user_vote'], 1)
+        self.assertEqual(by_id[changes[1].id]['current_user_vote'], 0)
+        self.assertEqual(by_id[changes[2].id]['yes'], 0)
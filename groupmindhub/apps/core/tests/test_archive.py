@@ -0,0 +1,87 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.utils import timezone
+
+from groupmindhub.apps.core.models import (
+    ActivityEvent,
+    ArchivedChange,
+    Change,
+    ChangeVote,
+    Comment,
+    Entry,
+    Project,
+    ProjectMembership,
+)
+from groupmindhub.apps.core.search import index_change, search
+
+
+class ArchiveChangesTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user('owner', password='pass-1234')
+        self.voter = User.objects.create_user('voter', password='pass-1234')
+        self.project = Project.objects.create(name='Archive Project')
+        ProjectMembership.objects.create(project=self.project, user=self.owner, role=ProjectMembership.Role.OWNER)
+        self.entry = Entry.objects.create(project=self.project, title='Trunk', author=self.owner)
+        old = timezone.now() - timedelta(days=120)
+        self.merged = Change.objects.create(
+            project=self.project, target_entry=self.entry, author=self.owner, summary='Old merge',
+            status='merged', merged_at=old, ops_json=[{'type': 'UPDATE_TEXT', 'block_id': 'p_a', 'new_text': 'x'}],
+        )
+        self.closed = Change.objects.create(
+            project=self.project, target_entry=self.entry, summary='Expired', status='published', closes_at=old,
+        )
+        self.recent = Change.objects.create(
+            project=self.project, target_entry=self.entry, summary='Recent merge',
+            status='merged', merged_at=timezone.now(),
+        )
+        ChangeVote.objects.create(change=self.merged, user=self.owner, value=1)
+        ChangeVote.objects.create(change=self.merged, user=self.voter, value=-1)
+        Comment.objects.create(change=self.merged, author=self.voter, body='Looks good')
+
+    def test_archived_comments_leave_the_search_index(self):
+        self.assertEqual([hit.kind for hit in search(self.project.id, 'looks good')[0]], ['comment'])
+        call_command('archive_changes', stdout=StringIO())
+        self.assertEqual(search(self.project.id, 'looks good')[0], [])
+
+    def test_archived_changes_leave_the_search_index(self):
+        index_change(self.merged)
+        index_change(self.recent)
+        self.assertEqual([hit.kind for hit in search(self.project.id, 'old merge')[0]], ['change'])
+        call_command('archive_changes', stdout=StringIO())
+        self.assertEqual(search(self.project.id, 'old merge')[0], [])
+        self.assertEqual([hit.kind for hit in search(self.project.id, 'recent merge')[0]], ['change'])
+
+    def test_command_moves_old_changes_with_tallies(self):
+        call_command('archive_changes', '--days', '90', stdout=StringIO())
+
+        self.assertEqual(list(Change.objects.values_list('id', flat=True)), [self.recent.id])
+        archived = ArchivedChange.objects.get(id=self.merged.id)
+        self.assertEqual((archived.yes_votes, archived.no_votes), (1, 1))
+        self.assertEqual(archived.ops_json, self.merged.ops_json)
+        self.assertEqual([c['body'] for c in archived.comments], ['Looks good'])
+        self.assertTrue(ArchivedChange.objects.filter(id=self.closed.id, status='published').exists())
+        self.assertFalse(ChangeVote.objects.exists())
+        self.assertTrue(ActivityEvent.objects.filter(kind=ActivityEvent.Kind.COMMENT, comment__isnull=True).exists())
+
+    def test_archived_changes_stay_readable(self):
+        call_command('archive_changes', stdout=StringIO())
+        client = Client()
+        client.force_login(self.owner)
+
+        listing = client.get(f'/api/projects/{self.project.id}/changes', {'archived': '1'}).json()
+        self.assertEqual([c['id'] for c in listing['changes']], [self.recent.id])
+        archived = {c['id']: c for c in listing['archived_changes']}
+        self.assertEqual((archived[self.merged.id]['yes'], archived[self.merged.id]['no']), (1, 1))
+
+        comments = client.get(
+            f'/api/projects/{self.project.id}/comments', {'target_type': 'change', 'change_id': self.merged.id}
+        ).json()
+        self.assertEqual([c['body'] for c in comments['results']], ['Looks good'])
+
+        page = client.get(f'/changes/{self.merged.id}/')
+        self.assertContains(page, 'Final tally: 1 yes / 1 no')
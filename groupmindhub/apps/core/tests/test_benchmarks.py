@@ -0,0 +1,53 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from groupmindhub.apps.core.benchdata import BenchSpec
+from groupmindhub.apps.core.models import Project
+from groupmindhub.benchmarks.runner import SIZES, compare, run_suite
+
+
+def report(p95_ms, queries):
+    return {'results': {'small': {'api.project_entry': {'p95_ms': p95_ms, 'queries': queries}}}}
+
+
+class CompareTests(TestCase):
+    def test_flags_slowdown_beyond_threshold(self):
+        regressions = compare(report(20.0, 6), report(10.0, 6), max_slowdown=0.5)
+        self.assertEqual(regressions, ['small/api.project_entry: p95 10.0 ms -> 20.0 ms'])
+
+    def test_ignores_slowdown_within_threshold_or_noise(self):
+        self.assertEqual(compare(report(12.0, 6), report(10.0, 6), max_slowdown=0.25), [])
+        self.assertEqual(compare(report(1.5, 6), report(1.0, 6), max_slowdown=0.1, min_delta_ms=2.0), [])
+
+    def test_flags_extra_queries(self):
+        self.assertEqual(compare(report(10.0, 8), report(10.0, 6)), ['small/api.project_entry: queries 6 -> 8'])
+        self.assertEqual(compare(report(10.0, 8), report(10.0, 6), max_extra_queries=2), [])
+
+    def test_ignores_benchmarks_missing_from_baseline(self):
+        self.assertEqual(compare(report(10.0, 6), {'results': {}}), [])
+
+
+@override_settings(JOBS_EAGER=True)
+class RunSuiteTests(TestCase):
+    def test_reports_each_benchmark_and_rolls_back(self):
+        tiny = BenchSpec(members=4, blocks=80, depth=3, changes=12, comments=6, seed=991)
+        with mock.patch.dict(SIZES, {'tiny': tiny}):
+            result = run_suite(
+                ['tiny'],
+                only=['engine.outline', 'engine.auto_merge', 'engine.seed_entry_sections', 'api.project_entry'],
+                iterations=2,
+                warmup=0,
+            )
+        benches = result['results']['tiny']
+        self.assertEqual(
+            set(benches), {'engine.outline', 'engine.auto_merge', 'engine.seed_entry_sections', 'api.project_entry'}
+        )
+        for stats in benches.values():
+            self.assertLessEqual(stats['p50_ms'], stats['p95_ms'])
+            self.assertEqual(stats['iterations'], 2)
+        self.assertEqual(benches['engine.outline']['queries'], 0)
+        self.assertGreater(benches['engine.seed_entry_sections']['queries'], 0)
+        self.assertGreater(benches['api.project_entry']['queries'], 0)
+        self.assertEqual(result['meta']['sizes'], {'tiny': 80})
+        self.assertFalse(Project.objects.exists())
@@ -0,0 +1,111 @@
+import threading
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from groupmindhub.apps.core.caching import ROLLUPS, CacheNamespace, cache_stats, reset_cache_stats
+from groupmindhub.apps.core.models import Entry, Project, ProjectMembership
+
+
+class CacheNamespaceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.ns = CacheNamespace('test-ns', timeout=60, schema=3)
+
+    def test_keys_are_namespaced_and_versioned(self):
+        self.assertEqual(self.ns.key(7, 'v2'), 'gmh:test-ns:s3:7:v2')
+        generational = CacheNamespace('test-gen', generational=True)
+        self.assertEqual(generational.key('x'), 'gmh:test-gen:s1:g1:x')
+        generational.invalidate()
+        self.assertEqual(generational.key('x'), 'gmh:test-gen:s1:g2:x')
+
+    def test_get_or_set_counts_hits_and_misses(self):
+        self.assertEqual(self.ns.get_or_set(('a',), lambda: 1), 1)
+        self.assertEqual(self.ns.get_or_set(('a',), lambda: 2), 1)
+        self.assertIsNone(self.ns.get(('missing',)))
+        stats = cache_stats()['test-ns']
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['computes'], 1)
+
+    def test_none_is_cached(self):
+        calls = []
+        self.ns.get_or_set(('none',), lambda: calls.append(1))
+        self.ns.get_or_set(('none',), lambda: calls.append(1))
+        self.assertEqual(len(calls), 1)
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.ns.get_or_set(('slow',), compute)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['value'] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache_stats()['test-ns']['waits'], 3)
+
+    def test_plain_namespace_cannot_be_invalidated_wholesale(self):
+        with self.assertRaises(ValueError):
+            self.ns.invalidate()
+
+
+class CachedRollupsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user('member', password='pass-1234')
+        self.project = Project.objects.create(name='Cached Project')
+
+    def test_role_map_follows_membership_changes(self):
+        self.assertFalse(self.project.has_role(self.user, ProjectMembership.Role.VIEWER))
+        membership = self.project.add_member(self.user, ProjectMembership.Role.EDITOR)
+        self.assertTrue(self.project.has_role(self.user, ProjectMembership.Role.EDITOR))
+        with self.assertNumQueries(0):
+            self.assertFalse(self.project.has_role(self.user, ProjectMembership.Role.OWNER))
+        membership.delete()
+        self.assertFalse(self.project.has_role(self.user, ProjectMembership.Role.VIEWER))
+
+    def test_role_map_follows_bulk_grants_and_cascades(self):
+        Entry.objects.create(project=self.project, title='Trunk', author=self.user)
+        self.assertFalse(self.project.has_role(self.user, ProjectMembership.Role.OWNER))
+        call_command('ensure_project_memberships', stdout=StringIO())
+        self.assertTrue(self.project.has_role(self.user, ProjectMembership.Role.OWNER))
+        self.user.delete()
+        self.assertFalse(self.project.has_role(self.user, ProjectMembership.Role.VIEWER))
+
+    def test_star_toggle_refreshes_index_rows(self):
+        self.client.get('/')
+        generation = ROLLUPS.key('index', 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.toggle_star(self.user)
+            self.assertEqual(ROLLUPS.key('index', 1), generation)  # not before the commit
+        self.assertNotEqual(ROLLUPS.key('index', 1), generation)
+        self.client.force_login(self.user)
+        response = self.client.get('/')
+        row = next(row for row in response.context['projects'] if row['id'] == self.project.id)
+        self.assertEqual(row['stars'], 1)
+        self.assertTrue(row['starred'])
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/api/cache/stats').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/cache/stats')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('namespaces', response.json())
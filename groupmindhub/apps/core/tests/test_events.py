@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+
+from groupmindhub.apps.core.events import EventBus, bus, publish
+from groupmindhub.apps.core.logic import apply_merge_core, cast_change_vote
+from groupmindhub.apps.core.models import Block, Change, Comment, Entry, Project, ProjectEvent
+
+
+class ProjectEventWriterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('voter', password='pass-1234')
+        self.project = Project.objects.create(name='Live Project')
+        self.entry = Entry.objects.create(project=self.project, title='Trunk')
+        Block.objects.create(entry=self.entry, stable_id='h_a', type='h2', text='A', position=1)
+        self.change = Change.objects.create(
+            project=self.project,
+            target_entry=self.entry,
+            summary='Rename',
+            ops_json=[{'type': 'UPDATE_TEXT', 'block_id': 'h_a', 'new_text': 'B'}],
+            status='published',
+        )
+
+    def _events(self, kind):
+        return list(ProjectEvent.objects.filter(project=self.project, kind=kind).order_by('id'))
+
+    def test_votes_publish_tallies_only_when_they_change(self):
+        cast_change_vote(self.change, self.user, 1)
+        cast_change_vote(self.change, self.user, 1)
+        cast_change_vote(self.change, self.user, -1)
+        payloads = [event.payload for event in self._events(ProjectEvent.Kind.VOTE)]
+        self.assertEqual(payloads, [
+            {'change_id': self.change.id, 'yes': 1, 'no': 0},
+            {'change_id': self.change.id, 'yes': 0, 'no': 1},
+        ])
+
+    def test_merge_and_comment_events(self):
+        apply_merge_core(self.change)
+        merge = self._events(ProjectEvent.Kind.MERGE)[0]
+        self.assertEqual(merge.payload['version'], 2)
+        Comment.objects.create(project=self.project, change=self.change, author=self.user, body='Nice')
+        comment = self._events(ProjectEvent.Kind.COMMENT)[0]
+        self.assertEqual(comment.payload['change_id'], self.change.id)
+
+
+class EventStreamTests(TransactionTestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name='Stream Project')
+        self.other = Project.objects.create(name='Other Project')
+
+    def test_one_poll_fans_out_to_each_project_subscriber(self):
+        local_bus = EventBus(tick=3600)
+
+        async def scenario():
+            first, _cursor = await local_bus.subscribe(self.project.id)
+            second, _cursor = await local_bus.subscribe(self.project.id)
+            elsewhere, _cursor = await local_bus.subscribe(self.other.id)
+            await asyncio.to_thread(publish, self.project.id, ProjectEvent.Kind.PROPOSAL, change_id=7)
+            delivered = await local_bus.poll()
+            return delivered, first.get_nowait(), second.get_nowait(), elsewhere.empty()
+
+        delivered, first, second, elsewhere_empty = async_to_sync(scenario)()
+        self.assertEqual(delivered, 1)
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(first.payload, {'change_id': 7})
+        self.assertTrue(elsewhere_empty)
+
+    def test_poll_delivers_events_committed_behind_the_cursor_once(self):
+        local_bus = EventBus(tick=3600)
+
+        async def scenario():
+            queue, _cursor = await local_bus.subscribe(self.project.id)
+            # ``late`` gets the lower id but only becomes visible after the bus read ``later``;
+            # filing it under an unfollowed project stands in for the open transaction.
+            late = await asyncio.to_thread(publish, self.other.id, ProjectEvent.Kind.VOTE, change_id=2, yes=1, no=0)
+            await asyncio.to_thread(publish, self.project.id, ProjectEvent.Kind.MERGE, change_id=1, version=2)
+            first = await local_bus.poll()
+            await asyncio.to_thread(ProjectEvent.objects.filter(id=late.id).update, project_id=self.project.id)
+            second = await local_bus.poll()
+            third = await local_bus.poll()
+            return (first, second, third), [queue.get_nowait().id for _ in range(2)], late.id
+
+        counts, ids, late_id = async_to_sync(scenario)()
+        self.assertEqual(counts, (1, 1, 0))
+        self.assertEqual(ids[1], late_id)
+        self.assertGreater(ids[0], late_id)
+
+    def test_following_a_project_later_skips_its_history(self):
+        local_bus = EventBus(tick=3600)
+
+        async def scenario():
+            await local_bus.subscribe(self.other.id)
+            await asyncio.to_thread(publish, self.project.id, ProjectEvent.Kind.PROPOSAL, change_id=3)
+            await local_bus.poll()
+            await asyncio.to_thread(publish, self.other.id, ProjectEvent.Kind.PROPOSAL, change_id=4)
+            await local_bus.poll()
+            queue, _cursor = await local_bus.subscribe(self.project.id)
+            return await local_bus.poll(), queue.empty()
+
+        delivered, empty = async_to_sync(scenario)()
+        self.assertEqual(delivered, 0)
+        self.assertTrue(empty)
+
+    def test_stream_replays_after_last_event_id(self):
+        seen = publish(self.project.id, ProjectEvent.Kind.VOTE, change_id=1, yes=1, no=0)
+        missed = publish(self.project.id, ProjectEvent.Kind.MERGE, change_id=1, version=3)
+
+        async def scenario():
+            response = await self.async_client.get(
+                f'/api/projects/{self.project.id}/events', headers={'Last-Event-ID': str(seen.id)}
+            )
+            stream = response.streaming_content
+            frames = [await anext(stream), await anext(stream)]
+            await stream.aclose()
+            return response, frames
+
+        response, frames = async_to_sync(scenario)()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(frames[0].startswith(b'retry:'))
+        lines = frames[1].decode().splitlines()
+        self.assertEqual(lines[0], f'id: {missed.id}')
+        self.assertEqual(lines[1], 'event: merge')
+        self.assertEqual(json.loads(lines[2][len('data: '):])['version'], 3)
+        self.assertFalse(bus._subscribers.get(self.project.id))
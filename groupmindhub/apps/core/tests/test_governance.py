@@ -1,9 +1,19 @@
+from datetime import timedelta
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
 
-from groupmindhub.apps.core.models import Project, ProjectMembership, GovernanceProposal
+from groupmindhub.apps.core.models import (
+    Block,
+    Change,
+    ChangeVote,
+    Entry,
+    GovernanceProposal,
+    Project,
+    ProjectMembership,
+)
 
 
 class GovernanceProposalTests(TestCase):
@@ -51,3 +61,60 @@ class GovernanceProposalTests(TestCase):
         self.project.refresh_from_db()
         self.assertEqual(proposal.status, GovernanceProposal.Status.REJECTED)
         self.assertNotEqual(self.project.voting_pool_size, 12)
+
+
+class GovernanceReevaluationTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user('owner', password='pass-1234')
+        self.voter = User.objects.create_user('voter', password='pass-1234')
+        self.project = Project.objects.create(
+            name='Reevaluate Project',
+            voting_pool_size=5,
+            approval_threshold=Decimal('0.60'),
+            voting_duration_hours=24,
+        )
+        ProjectMembership.objects.create(project=self.project, user=self.owner, role=ProjectMembership.Role.OWNER)
+        self.entry = Entry.objects.create(project=self.project, title='Entry', author=self.owner)
+        Block.objects.create(entry=self.entry, stable_id='h_root', type='h2', text='Root', position=1)
+        self.published_at = timezone.now()
+        self.change = Change.objects.create(
+            project=self.project,
+            target_entry=self.entry,
+            author=self.owner,
+            summary='Rename root',
+            ops_json=[{'type': 'UPDATE_TEXT', 'block_id': 'h_root', 'new_text': 'Renamed'}],
+            affected_blocks=['h_root'],
+            target_section_id='root',
+            status='published',
+            published_at=self.published_at,
+            closes_at=self.published_at + timedelta(hours=24),
+        )
+        for user in (self.owner, self.voter):
+            ChangeVote.objects.create(user=user, change=self.change, value=1)
+
+    def _apply(self, **settings):
+        values = {
+            'voting_pool_size': self.project.voting_pool_size,
+            'approval_threshold': self.project.approval_threshold,
+            'voting_duration_hours': self.project.voting_duration_hours,
+        }
+        values.update(settings)
+        proposal = GovernanceProposal.objects.create(project=self.project, created_by=self.owner, **values)
+        with self.captureOnCommitCallbacks(execute=True):
+            proposal.initialize_approvals(auto_approve_user=self.owner)
+        self.change.refresh_from_db()
+
+    def test_lower_threshold_merges_open_changes(self):
+        self._apply(approval_threshold=Decimal('0.40'))
+        self.assertEqual(self.change.status, 'merged')
+        self.assertEqual(Block.objects.get(entry=self.entry, stable_id='h_root').text, 'Renamed')
+
+    def test_higher_threshold_keeps_changes_open(self):
+        self._apply(voting_pool_size=10)
+        self.assertEqual(self.change.status, 'published')
+
+    def test_duration_change_recomputes_closes_at(self):
+        self._apply(voting_duration_hours=48)
+        self.assertEqual(self.change.status, 'published')
+        self.assertEqual(self.change.closes_at, self.published_at + timedelta(hours=48))
@@ -0,0 +1,150 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+
+from groupmindhub.apps.core.history import (
+    SNAPSHOT_INTERVAL,
+    checkout_cache_key,
+    current_blocks,
+    reconstruct_blocks,
+    reconstruct_outline,
+)
+from groupmindhub.apps.core.logic import apply_merge_core, outline
+from groupmindhub.apps.core.models import Block, Change, Entry, EntryHistory, Project
+
+
+def _shape(blocks):
+    return [(b.stable_id, b.type, b.text, b.parent_stable_id) for b in blocks]
+
+
+class EntryHistoryTests(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name='History Project')
+        self.entry = Entry.objects.create(project=self.project, title='Trunk')
+        Block.objects.create(entry=self.entry, stable_id='h_a', type='h2', text='Section A', position=1)
+        Block.objects.create(entry=self.entry, stable_id='p_a', type='p', text='Body A', parent_stable_id='h_a', position=2)
+
+    def _merge(self, ops):
+        change = Change.objects.create(
+            project=self.project,
+            target_entry=self.entry,
+            summary='Edit',
+            ops_json=ops,
+            status='published',
+        )
+        apply_merge_core(change)
+        self.entry.refresh_from_db()
+
+    def test_reconstructs_every_version_from_snapshots_and_ops(self):
+        states = {1: _shape(current_blocks(self.entry))}
+        for i in range(SNAPSHOT_INTERVAL + 5):
+            if i % 3 == 0:
+                ops = [{'type': 'INSERT_BLOCK', 'after_id': 'h_a', 'new_block': {'type': 'p', 'text': f'Note {i}', 'parent': 'h_a'}}]
+            elif i % 3 == 1:
+                ops = [{'type': 'UPDATE_TEXT', 'block_id': 'p_a', 'new_text': f'Body A rev {i}'}]
+            else:
+                ops = [{'type': 'MOVE_BLOCK', 'block_id': 'p_a', 'after_id': 'h_a', 'new_parent': 'h_a'}]
+            self._merge(ops)
+            states[self.entry.entry_version_int] = _shape(current_blocks(self.entry))
+
+        snapshots = list(
+            EntryHistory.objects.filter(entry=self.entry, snapshot__isnull=False).values_list('version_int', flat=True)
+        )
+        self.assertEqual(snapshots, [1, SNAPSHOT_INTERVAL])
+        self.assertFalse(EntryHistory.objects.exclude(outline_after='').exists())
+        for version, expected in states.items():
+            self.assertEqual(_shape(reconstruct_blocks(self.entry, version)), expected, version)
+        self.assertIsNone(reconstruct_blocks(self.entry, self.entry.entry_version_int + 1))
+
+    def test_compaction_rewrites_legacy_rows(self):
+        legacy = Change.objects.create(
+            project=self.project,
+            target_entry=self.entry,
+            summary='Old merge',
+            ops_json=[{'type': 'UPDATE_TEXT', 'block_id': 'p_a', 'new_text': 'Old body'}],
+            status='merged',
+        )
+        EntryHistory.objects.create(
+            entry=self.entry, change=legacy, version_int=2, outline_before='1 Section A', outline_after='1 Section A (old)',
+        )
+        self.entry.entry_version_int = 2
+        self.entry.save(update_fields=['entry_version_int'])
+
+        call_command('compact_entry_history', stdout=StringIO())
+
+        row = EntryHistory.objects.get(entry=self.entry, version_int=2)
+        self.assertEqual(row.ops_json, legacy.ops_json)
+        self.assertIsNotNone(row.snapshot)
+        self.assertEqual((row.outline_before, row.outline_after), ('1 Section A', ''))
+        self.assertEqual(
+            reconstruct_outline(self.entry, 2),
+            outline(list(self.entry.blocks.order_by('position', 'id'))),
+        )
+        self.assertEqual(reconstruct_outline(self.entry, 1), '1 Section A')
+
+    def test_compaction_keeps_text_of_versions_before_the_first_snapshot(self):
+        for version in (2, 3):
+            EntryHistory.objects.create(
+                entry=self.entry,
+                version_int=version,
+                outline_before=f'1 Section A (v{version - 1})',
+                outline_after=f'1 Section A (v{version})',
+            )
+        EntryHistory.objects.create(entry=self.entry, version_int=4, outline_before='1 Section A (v3)')
+        self.entry.entry_version_int = 4
+        self.entry.save(update_fields=['entry_version_int'])
+
+        call_command('compact_entry_history', stdout=StringIO())
+
+        self.assertEqual(EntryHistory.objects.get(entry=self.entry, version_int=4).outline_before, '1 Section A (v3)')
+        for version in (1, 2, 3):
+            self.assertEqual(reconstruct_outline(self.entry, version), f'1 Section A (v{version})')
+
+
+class EntryCheckoutApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.project = Project.objects.create(name='Checkout Project')
+        self.entry = Entry.objects.create(project=self.project, title='Trunk')
+        Block.objects.create(entry=self.entry, stable_id='h_a', type='h2', text='Section A', position=1)
+        Block.objects.create(entry=self.entry, stable_id='p_a', type='p', text='Body A', parent_stable_id='h_a', position=2)
+        for text in ('Body B', 'Body C'):
+            change = Change.objects.create(
+                project=self.project,
+                target_entry=self.entry,
+                summary=text,
+                ops_json=[
+                    {'type': 'UPDATE_TEXT', 'block_id': 'p_a', 'new_text': text},
+                    {'type': 'INSERT_BLOCK', 'after_id': 'p_a', 'new_block': {'type': 'p', 'text': f'After {text}', 'parent': 'h_a'}},
+                ],
+                status='published',
+            )
+            apply_merge_core(change)
+        self.entry.refresh_from_db()
+        self.url = f'/api/projects/{self.project.id}/entry'
+
+    def test_returns_block_list_for_old_version(self):
+        response = Client().get(self.url, {'version': 2})
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()['entry']
+        self.assertEqual(payload['version'], 2)
+        self.assertEqual([b['text'] for b in payload['blocks']], ['Section A', 'Body B', 'After Body B'])
+        self.assertEqual([b['position'] for b in payload['blocks']], [1, 2, 3])
+        self.assertEqual(payload['blocks'][2]['parent'], 'h_a')
+        self.assertIsNotNone(cache.get(checkout_cache_key(self.entry, 2)))
+
+        latest = Client().get(self.url).json()['entry']
+        self.assertEqual(latest['version'], 3)
+        self.assertEqual(len(latest['blocks']), 4)
+
+    def test_cached_checkout_skips_history_queries(self):
+        Client().get(self.url, {'version': 1})
+        with self.assertNumQueries(2):  # project + latest entry; no history rows are read
+            response = Client().get(self.url, {'version': 1})
+        self.assertEqual([b['text'] for b in response.json()['entry']['blocks']], ['Section A', 'Body A'])
+
+    def test_rejects_unknown_or_invalid_versions(self):
+        self.assertEqual(Client().get(self.url, {'version': 99}).status_code, 404)
+        self.assertEqual(Client().get(self.url, {'version': 'latest'}).status_code, 400)
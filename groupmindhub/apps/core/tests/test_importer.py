@@ -0,0 +1,147 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+
+from groupmindhub.apps.core.importer import import_document, parse_document
+from groupmindhub.apps.core.models import Block, Change, Comment, Entry, Project, ProjectMembership, Section
+
+SAMPLE = """Preamble text.
+
+# Governance
+Members vote on changes.
+
+## Quorum
+Quorum is 25%.
+Second line.
+
+## Meetings
+### Schedule
+Monthly.
+
+# Finance
+"""
+
+
+class ParseDocumentTests(TestCase):
+    def test_headings_nest_by_level(self):
+        parsed = [(s.path, s.heading, s.paragraphs) for s in parse_document(SAMPLE.splitlines())]
+        self.assertEqual(parsed, [
+            ((1,), 'Introduction', ['Preamble text.']),
+            ((2,), 'Governance', ['Members vote on changes.']),
+            ((2, 1), 'Quorum', ['Quorum is 25%.\nSecond line.']),
+            ((2, 2), 'Meetings', []),
+            ((2, 2, 1), 'Schedule', ['Monthly.']),
+            ((3,), 'Finance', []),
+        ])
+
+    def test_plain_text_has_single_section(self):
+        parsed = list(parse_document(['# not a heading', '', 'Body'], fmt='text'))
+        self.assertEqual(len(parsed), 1)
+        self.assertEqual(parsed[0].paragraphs, ['# not a heading', 'Body'])
+
+
+class ImportDocumentTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user('owner', password='pass-1234')
+        self.editor = User.objects.create_user('editor', password='pass-1234')
+        self.project = Project.objects.create(name='Manual')
+        ProjectMembership.objects.create(project=self.project, user=self.owner, role=ProjectMembership.Role.OWNER)
+        ProjectMembership.objects.create(project=self.project, user=self.editor, role=ProjectMembership.Role.EDITOR)
+        self.entry = Entry.objects.create(project=self.project, title='Trunk', author=self.owner)
+
+    def test_import_builds_blocks_and_sections_across_chunks(self):
+        result = import_document(self.entry, SAMPLE.splitlines(), chunk_size=2)
+        self.assertEqual((result.sections, result.blocks, result.version), (6, 10, 2))
+        quorum = Block.objects.get(entry=self.entry, type='h2', text='Quorum')
+        governance = Block.objects.get(entry=self.entry, type='h2', text='Governance')
+        self.assertEqual(quorum.parent_stable_id, governance.stable_id)
+        schedule = Section.objects.get(entry=self.entry, heading='Schedule')
+        self.assertEqual(schedule.parent.heading, 'Meetings')
+        self.assertEqual(schedule.parent.parent.heading, 'Governance')
+        self.assertEqual(Section.objects.get(entry=self.entry, heading='Quorum').body, 'Quorum is 25%.\nSecond line.')
+        positions = list(self.entry.blocks.order_by('position').values_list('text', flat=True))
+        self.assertEqual(positions[:3], ['Introduction', 'Preamble text.', 'Governance'])
+
+    def test_stable_ids_are_deterministic(self):
+        import_document(self.entry, SAMPLE.splitlines(), namespace='manual')
+        first = list(self.entry.blocks.order_by('position').values_list('stable_id', flat=True))
+        import_document(self.entry, SAMPLE.splitlines(), namespace='manual', replace=True)
+        second = list(self.entry.blocks.order_by('position').values_list('stable_id', flat=True))
+        self.assertEqual(first, second)
+
+    def test_replace_is_refused_while_sections_have_comments(self):
+        import_document(self.entry, SAMPLE.splitlines(), namespace='manual')
+        comment = Comment.objects.create(section=Section.objects.get(entry=self.entry, heading='Quorum'), body='25% is low')
+        with self.assertRaisesMessage(ValueError, 'sections have comments'):
+            import_document(self.entry, SAMPLE.splitlines(), namespace='manual', replace=True)
+        self.assertTrue(Comment.objects.filter(id=comment.id).exists())
+        self.assertEqual(Section.objects.filter(entry=self.entry).count(), 6)
+
+        client = Client()
+        client.force_login(self.owner)
+        response = client.post(
+            f'/api/projects/{self.project.id}/import',
+            data=json.dumps({'content': SAMPLE, 'replace': True}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_replace_flags_open_changes_needs_update(self):
+        import_document(self.entry, SAMPLE.splitlines(), namespace='manual')
+        quorum = Block.objects.get(entry=self.entry, type='h2', text='Quorum')
+        open_change = Change.objects.create(
+            project=self.project,
+            target_entry=self.entry,
+            summary='Raise quorum',
+            ops_json=[{'type': 'UPDATE_TEXT', 'block_id': quorum.stable_id, 'new_text': 'Quorum'}],
+            affected_blocks=[quorum.stable_id],
+            status='published',
+        )
+        draft = Change.objects.create(project=self.project, target_entry=self.entry, summary='Draft', status='draft')
+        result = import_document(self.entry, SAMPLE.splitlines(), namespace='replaced', replace=True)
+        self.assertEqual(result.stale_changes, 1)
+        open_change.refresh_from_db()
+        draft.refresh_from_db()
+        self.assertEqual((open_change.status, draft.status), ('needs_update', 'draft'))
+
+    def test_management_command(self):
+        handle, path = tempfile.mkstemp(suffix='.md')
+        with os.fdopen(handle, 'w', encoding='utf-8') as fh:
+            fh.write(SAMPLE)
+        try:
+            out = StringIO()
+            call_command('import_document', str(self.project.id), path, stdout=out)
+        finally:
+            os.remove(path)
+        self.assertIn('Imported 6 sections', out.getvalue())
+        self.assertEqual(Section.objects.filter(entry=self.entry).count(), 6)
+
+    def test_api_requires_owner(self):
+        client = Client()
+        client.force_login(self.editor)
+        response = client.post(
+            f'/api/projects/{self.project.id}/import',
+            data=json.dumps({'content': SAMPLE}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_api_streams_raw_markdown(self):
+        client = Client()
+        client.force_login(self.owner)
+        response = client.post(
+            f'/api/projects/{self.project.id}/import?format=markdown',
+            data=SAMPLE,
+            content_type='text/markdown',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['sections'], 6)
+        entry = client.get(f'/api/projects/{self.project.id}/entry').json()['entry']
+        self.assertEqual(entry['version'], 2)
+        self.assertEqual([s['heading_text'] for s in entry['sections']][:3], ['Introduction', 'Governance', 'Quorum'])
@@ -0,0 +1,57 @@
+from django.test import TestCase, override_settings
+
+from groupmindhub.apps.core.instrumentation import QueryStats, aexecute_wrapper, reset_view_stats, sql_shape, view_stats
+from groupmindhub.apps.core.models import Project
+
+
+class SqlShapeTests(TestCase):
+    def test_literals_and_in_lists_collapse(self):
+        self.assertEqual(
+            sql_shape('SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'x\'  AND n > 10'),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? AND n > ?",
+        )
+
+
+class AsyncExecuteWrapperTests(TestCase):
+    async def test_nested_wrappers_each_see_async_orm_queries(self):
+        outer, inner = QueryStats(), QueryStats()
+        async with aexecute_wrapper(outer):
+            async with aexecute_wrapper(inner):
+                await Project.objects.acount()
+            await Project.objects.acount()
+        await Project.objects.acount()
+        self.assertEqual((outer.count, inner.count), (2, 1))
+
+
+class RequestMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        reset_view_stats()
+        self.project = Project.objects.create(name='Metrics Project')
+
+    @override_settings(DEBUG=True)
+    def test_server_timing_header_in_debug(self):
+        response = self.client.get(f'/api/projects/{self.project.id}/entry')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+
+    def test_no_server_timing_header_without_debug(self):
+        response = self.client.get(f'/api/projects/{self.project.id}/entry')
+        self.assertNotIn('Server-Timing', response)
+
+    def test_records_totals_per_view(self):
+        self.client.get(f'/api/projects/{self.project.id}/entry')
+        self.client.get(f'/api/projects/{self.project.id}/entry')
+        totals = view_stats()['api_project_entry']
+        self.assertEqual(totals['requests'], 2)
+        self.assertGreater(totals['queries'], 0)
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged_with_repeated_shapes(self):
+        with self.assertLogs('groupmindhub.requests', 'WARNING') as logs:
+            self.client.get(f'/api/projects/{self.project.id}/entry')
+        self.assertIn('Slow request GET', logs.output[0])
+        self.assertIn('api_project_entry', logs.output[0])
+
+    async def test_counts_queries_of_async_views_under_asgi(self):
+        # The async ORM runs on the sync_to_async thread, not the one handling the request.
+        await self.async_client.get(f'/api/projects/{self.project.id}/entry')
+        self.assertGreater(view_stats()['api_project_entry']['queries'], 0)
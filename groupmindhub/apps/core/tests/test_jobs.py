@@ -0,0 +1,236 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models.query import QuerySet
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from groupmindhub.apps.core import jobs
+from groupmindhub.apps.core.jobs import claim_jobs, enqueue, handler, run_job, run_pending
+from groupmindhub.apps.core.logic import merge_change
+from groupmindhub.apps.core.models import (
+    ActivityEvent,
+    Block,
+    Change,
+    Entry,
+    Job,
+    Project,
+    ProjectMembership,
+)
+
+FLAKY_CALLS = []
+
+
+@handler('test.flaky')
+def flaky(fail: bool = True):
+    FLAKY_CALLS.append(fail)
+    if fail:
+        raise RuntimeError('boom')
+
+
+@override_settings(JOBS_EAGER=False)
+class JobQueueTests(TestCase):
+    def test_jobs_with_one_key_run_one_at_a_time(self):
+        first = enqueue('test.flaky', key='entry:1', fail=False)
+        enqueue('test.flaky', key='entry:1', fail=False)
+        other = enqueue('test.flaky', key='entry:2', fail=False)
+        claimed = claim_jobs('w1', 10)
+        self.assertEqual({job.id for job in claimed}, {first.id, other.id})
+        self.assertEqual(claim_jobs('w2', 10), [])
+        for job in claimed:
+            self.assertTrue(run_job(job))
+        self.assertEqual(len(claim_jobs('w2', 10)), 1)
+
+    def test_second_worker_skips_a_key_whose_head_is_being_claimed(self):
+        head = enqueue('test.flaky', key='entry:1', fail=False)
+        enqueue('test.flaky', key='entry:1', fail=False)
+        other = enqueue('test.flaky', key='entry:2', fail=False)
+        original = QuerySet.select_for_update
+
+        def head_locked_by_w1(queryset, *args, **kwargs):
+            # w1's claim has locked ``head`` but not committed: SKIP LOCKED hides the row
+            # from w2 while it still reads as queued.
+            return original(queryset, *args, **kwargs).exclude(id=head.id)
+
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=head_locked_by_w1):
+            claimed = claim_jobs('w2', 10)
+        self.assertEqual([job.id for job in claimed], [other.id])
+
+    def test_backing_off_job_holds_its_key(self):
+        first = enqueue('test.flaky', key='entry:1', fail=False)
+        enqueue('test.flaky', key='entry:1', fail=False)
+        Job.objects.filter(id=first.id).update(run_after=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(claim_jobs('w', 10), [])
+
+    def test_failures_back_off_then_park(self):
+        job = enqueue('test.flaky', max_attempts=2)
+        with self.assertLogs('groupmindhub.apps.core.jobs', 'WARNING'):
+            self.assertFalse(run_job(claim_jobs('w', 1)[0]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 1))
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIn('RuntimeError: boom', job.last_error)
+        self.assertEqual(claim_jobs('w', 1), [])
+        Job.objects.filter(id=job.id).update(run_after=timezone.now() - timedelta(seconds=1))
+        with self.assertLogs('groupmindhub.apps.core.jobs', 'WARNING'):
+            self.assertFalse(run_job(claim_jobs('w', 1)[0]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+
+    def test_failed_dequeue_reschedules_the_job(self):
+        job = enqueue('test.flaky', fail=False)
+        claimed = claim_jobs('w', 1)[0]
+        with mock.patch.object(QuerySet, 'delete', side_effect=OperationalError('database table is locked')):
+            with self.assertLogs('groupmindhub.apps.core.jobs', 'WARNING'):
+                self.assertFalse(run_job(claimed))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 1))
+        self.assertIn('database table is locked', job.last_error)
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = enqueue('test.flaky', fail=False)
+        claim_jobs('dead-worker', 1)
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+
+
+@override_settings(JOBS_EAGER=False)
+class VoteMergeJobTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user('owner', password='pass-1234')
+        self.project = Project.objects.create(name='Queue Project', voting_pool_size=1)
+        self.project.add_member(self.owner, ProjectMembership.Role.OWNER)
+        self.entry = Entry.objects.create(project=self.project, title='Trunk')
+        Block.objects.create(entry=self.entry, stable_id='h_a', type='h2', text='A', position=1)
+        self.change = Change.objects.create(
+            project=self.project,
+            target_entry=self.entry,
+            summary='Rename',
+            ops_json=[{'type': 'UPDATE_TEXT', 'block_id': 'h_a', 'new_text': 'B'}],
+            affected_blocks=['h_a'],
+            status='published',
+        )
+        self.overlapping = Change.objects.create(
+            project=self.project, target_entry=self.entry, summary='Other', affected_blocks=['h_a'], status='published'
+        )
+        self.client = Client()
+        self.client.force_login(self.owner)
+
+    def _vote(self, value):
+        return self.client.post(
+            f'/api/changes/{self.change.id}/votes', data=json.dumps({'value': value}), content_type='application/json'
+        )
+
+    def test_vote_defers_merge_to_the_worker(self):
+        response = self._vote(1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['change']['status'], 'published')
+        self._vote(-1)
+        self._vote(1)
+        self.assertEqual(Job.objects.filter(kind='merge.evaluate').count(), 1)
+
+        self.assertEqual(run_pending(), 2)  # evaluate, then the merge fan-out
+        self.change.refresh_from_db()
+        self.overlapping.refresh_from_db()
+        self.assertEqual(self.change.status, 'merged')
+        self.assertEqual(self.overlapping.status, 'needs_update')
+        self.assertTrue(ActivityEvent.objects.filter(change=self.change, kind=ActivityEvent.Kind.MERGE).exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_queued_evaluation_skips_a_change_made_stale_by_an_earlier_merge(self):
+        Change.objects.filter(id=self.overlapping.id).update(
+            ops_json=[{'type': 'UPDATE_TEXT', 'block_id': 'h_a', 'new_text': 'C'}]
+        )
+        self._vote(1)
+        self.client.post(
+            f'/api/changes/{self.overlapping.id}/votes', data=json.dumps({'value': 1}), content_type='application/json'
+        )
+        self.assertEqual(Job.objects.filter(kind='merge.evaluate').count(), 2)
+        run_pending()
+        self.overlapping.refresh_from_db()
+        self.entry.refresh_from_db()
+        self.assertEqual(self.overlapping.status, 'needs_update')
+        self.assertEqual(self.entry.entry_version_int, 2)
+        self.assertEqual(self.entry.blocks.get(stable_id='h_a').text, 'B')
+
+    def test_owner_merge_and_queued_evaluation_merge_once(self):
+        self._vote(1)
+        stale = Change.objects.get(id=self.change.id)
+        response = self.client.post(f'/api/changes/{self.change.id}/merge')
+        self.assertEqual(response.json()['change']['status'], 'merged')
+        merge_change(stale)  # a racing owner request that loaded the change before the merge
+        run_pending()
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.entry_version_int, 2)
+        self.assertEqual(ActivityEvent.objects.filter(change=self.change, kind=ActivityEvent.Kind.MERGE).count(), 1)
+
+
+@override_settings(JOBS_EAGER=False)
+class RunWorkerCommandTests(TransactionTestCase):
+    def test_drains_queue_with_once(self):
+        del FLAKY_CALLS[:]
+        for index in range(5):
+            enqueue('test.flaky', key=f'k{index % 2}', fail=False)
+        # One thread: the in-memory SQLite test database fails concurrent writers with
+        # "table is locked" instead of waiting for them.
+        call_command('run_worker', '--once', '--threads', '1', '--poll-interval', '0.05', stdout=open('/dev/null', 'w'))
+        self.assertEqual(len(FLAKY_CALLS), 5)
+        self.assertFalse(Job.objects.exists())
+
+    def test_keeps_running_after_a_failed_claim(self):
+        del FLAKY_CALLS[:]
+        enqueue('test.flaky', fail=False)
+        calls = []
+
+        def locked_once(worker, limit):
+            calls.append(limit)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return claim_jobs(worker, limit)
+
+        with mock.patch('groupmindhub.apps.core.management.commands.run_worker.claim_jobs', side_effect=locked_once):
+            with self.assertLogs('groupmindhub.apps.core.management.commands.run_worker', 'WARNING'):
+                call_command('run_worker', '--once', '--threads', '1', '--poll-interval', '0.05', stdout=open('/dev/null', 'w'))
+        self.assertEqual(FLAKY_CALLS, [False])
+        self.assertEqual(calls[0], calls[1])  # the failed claim gave its slots back
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(JOBS_EAGER=True)
+class EagerJobTests(TransactionTestCase):
+    def test_eager_merge_locks_the_entry_inside_a_transaction(self):
+        User = get_user_model()
+        owner = User.objects.create_user('owner', password='pass-1234')
+        project = Project.objects.create(name='Eager Project', voting_pool_size=1)
+        project.add_member(owner, ProjectMembership.Role.OWNER)
+        entry = Entry.objects.create(project=project, title='Trunk')
+        Block.objects.create(entry=entry, stable_id='h_a', type='h2', text='A', position=1)
+        change = Change.objects.create(
+            project=project,
+            target_entry=entry,
+            summary='Rename',
+            ops_json=[{'type': 'UPDATE_TEXT', 'block_id': 'h_a', 'new_text': 'B'}],
+            status='published',
+        )
+        locks = []
+        original = QuerySet.select_for_update
+
+        def record(queryset, *args, **kwargs):
+            locks.append((queryset.model, connection.in_atomic_block))
+            return original(queryset, *args, **kwargs)
+
+        client = Client()
+        client.force_login(owner)
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=record):
+            client.post(f'/api/changes/{change.id}/votes', data=json.dumps({'value': 1}), content_type='application/json')
+        change.refresh_from_db()
+        self.assertEqual(change.status, 'merged')
+        self.assertIn((Entry, True), locks)
+        self.assertNotIn((Entry, False), locks)
@@ -1,8 +1,12 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.test import TestCase
 
-from groupmindhub.apps.core.models import Entry, Project, ProjectMembership
+from groupmindhub.apps.core.history import current_blocks, decode_snapshot
+from groupmindhub.apps.core.logic import build_section_index, run_ops
+from groupmindhub.apps.core.models import Change, ChangeVote, Entry, EntryHistory, Project, ProjectMembership
 
 
 class EnsureMembershipsCommandTests(TestCase):
@@ -23,3 +27,68 @@ class EnsureMembershipsCommandTests(TestCase):
         ProjectMembership.objects.create(project=self.project, user=self.owner, role=ProjectMembership.Role.OWNER)
         call_command('ensure_project_memberships')
         self.assertEqual(self.project.memberships.count(), 1)
+
+    def test_dry_run_reports_without_writing(self):
+        out = StringIO()
+        call_command('ensure_project_memberships', '--dry-run', stdout=out)
+        self.assertFalse(self.project.memberships.exists())
+        self.assertIn('would be created: 1', out.getvalue())
+
+    def test_since_id_skips_earlier_projects(self):
+        later = Project.objects.create(name='Later Project')
+        Entry.objects.create(project=later, title='Trunk', author=self.owner)
+        call_command('ensure_project_memberships', '--since-id', str(self.project.id), '--chunk-size', '1', stdout=StringIO())
+        self.assertFalse(self.project.memberships.exists())
+        self.assertEqual(later.memberships.get().role, ProjectMembership.Role.OWNER)
+
+    def test_progress_lines_only_when_verbose(self):
+        out = StringIO()
+        call_command('ensure_project_memberships', '--dry-run', stdout=out)
+        self.assertNotIn('Scanned', out.getvalue())
+        out = StringIO()
+        call_command('ensure_project_memberships', '--dry-run', verbosity=2, stdout=out)
+        self.assertIn('Scanned 1 projects', out.getvalue())
+
+
+class SeedBenchCommandTests(TestCase):
+    ARGS = ['--members', '6', '--blocks', '300', '--depth', '5', '--changes', '60', '--comments', '20', '--seed', '7']
+
+    def seed(self, *extra):
+        out = StringIO()
+        call_command('seed_bench', *self.ARGS, *extra, stdout=out)
+        return out.getvalue()
+
+    def test_builds_consistent_dataset(self):
+        output = self.seed()
+        self.assertIn('Rows created:', output)
+        project = Project.objects.get(name__startswith='Bench 7-')
+        entry = project.entries.get()
+        self.assertEqual(project.memberships.count(), 6)
+        self.assertGreaterEqual(entry.blocks.count(), 300)
+        self.assertEqual(entry.sections.count(), entry.blocks.filter(type='h2').count())
+        self.assertEqual(max(info.depth for info in build_section_index(entry).by_section_id.values()), 5)
+        merged = Change.objects.filter(project=project, status='merged').count()
+        self.assertEqual(merged, 15)
+        self.assertEqual(entry.entry_version_int, merged + 1)
+        self.assertEqual(project.comments.count(), 20)
+        required = project.required_yes_votes
+        for change in Change.objects.filter(project=project, status='merged'):
+            self.assertGreaterEqual(ChangeVote.objects.filter(change=change, value=1).count(), required)
+
+        # Replaying the recorded op batches onto the base snapshot yields the stored blocks.
+        rows = list(EntryHistory.objects.filter(entry=entry).order_by('version_int'))
+        blocks = decode_snapshot(rows[0].snapshot)
+        for row in rows[1:]:
+            blocks, _changed, _resolved = run_ops(blocks, row.ops_json)
+        as_rows = lambda states: [(b.stable_id, b.type, b.text, b.parent_stable_id) for b in states]
+        self.assertEqual(as_rows(blocks), as_rows(current_blocks(entry)))
+
+    def test_same_seed_reproduces_dataset(self):
+        self.seed()
+        first = list(Change.objects.order_by('id').values_list('summary', 'ops_json', 'votes_cache_int'))
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed('--replace')
+        self.assertEqual(Project.objects.filter(name__startswith='Bench 7-').count(), 1)
+        second = list(Change.objects.order_by('id').values_list('summary', 'ops_json', 'votes_cache_int'))
+        self.assertEqual(first, second)
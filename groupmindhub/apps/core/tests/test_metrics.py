@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from groupmindhub.apps.core import metrics
+from groupmindhub.apps.core.api import serialize_entry
+from groupmindhub.apps.core.caching import reset_cache_stats
+from groupmindhub.apps.core.models import Block, Change, Entry, Project, ProjectMembership
+
+
+def sample(text, line_prefix):
+    """Value of the exposition line starting with ``line_prefix`` (a name plus its labels)."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f'{line_prefix} not found in:\n{text}')
+
+
+class RenderTests(TestCase):
+    def setUp(self):
+        metrics.reset_metrics()
+        reset_cache_stats()
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics.MERGE_OPS.observe(1)
+        metrics.MERGE_OPS.observe(3)
+        metrics.MERGE_OPS.observe(1000)
+        text = metrics.render()
+        self.assertIn('# TYPE gmh_merge_ops histogram', text)
+        self.assertEqual(sample(text, 'gmh_merge_ops_bucket{le="1"}'), 1)
+        self.assertEqual(sample(text, 'gmh_merge_ops_bucket{le="5"}'), 2)
+        self.assertEqual(sample(text, 'gmh_merge_ops_bucket{le="500"}'), 2)
+        self.assertEqual(sample(text, 'gmh_merge_ops_bucket{le="+Inf"}'), 3)
+        self.assertEqual(sample(text, 'gmh_merge_ops_sum'), 1004)
+        self.assertEqual(sample(text, 'gmh_merge_ops_count'), 3)
+
+    def test_label_values_are_escaped(self):
+        metrics.REQUEST_DURATION.observe(0.02, url_name='odd"name')
+        text = metrics.render()
+        self.assertIn('gmh_request_duration_seconds_count{url_name="odd\\"name"} 1', text)
+
+    def test_block_count_bucket(self):
+        self.assertEqual(metrics.block_count_bucket(0), '100')
+        self.assertEqual(metrics.block_count_bucket(100), '100')
+        self.assertEqual(metrics.block_count_bucket(101), '1000')
+        self.assertEqual(metrics.block_count_bucket(10 ** 6), '+Inf')
+
+    def test_sums_files_of_other_processes(self):
+        metrics.NEEDS_UPDATE.inc(2)
+        metrics.MERGE_OPS.observe(1)
+        other = [
+            {'name': 'gmh_needs_update_transitions_total', 'labels': {}, 'value': 3},
+            {'name': 'gmh_merge_ops', 'labels': {}, 'value': {'buckets': [1] + [0] * 9, 'sum': 1, 'count': 1}},
+        ]
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            Path(directory, f'{os.getpid() + 1}-aaaa.json').write_text(json.dumps(other), encoding='utf-8')
+            Path(directory, 'broken.json').write_text('{', encoding='utf-8')
+            metrics.flush()
+            self.assertEqual(len(list(Path(directory).glob(f'{os.getpid()}-*.json'))), 1)
+            text = metrics.render()
+        self.assertEqual(sample(text, 'gmh_needs_update_transitions_total'), 5)
+        self.assertEqual(sample(text, 'gmh_merge_ops_bucket{le="1"}'), 2)
+        self.assertEqual(sample(text, 'gmh_merge_ops_count'), 2)
+
+    def test_keeps_the_file_of_an_exited_process_with_a_reused_pid(self):
+        metrics.NEEDS_UPDATE.inc(2)
+        exited = [{'name': 'gmh_needs_update_transitions_total', 'labels': {}, 'value': 3}]
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            dead = Path(directory, f'{os.getpid()}-0123456789ab.json')
+            dead.write_text(json.dumps(exited), encoding='utf-8')
+            metrics.flush()
+            self.assertEqual(json.loads(dead.read_text(encoding='utf-8')), exited)
+            text = metrics.render()
+        self.assertEqual(sample(text, 'gmh_needs_update_transitions_total'), 5)
+
+    def test_process_without_values_writes_no_file(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            metrics.flush()
+            self.assertEqual(list(Path(directory).glob('*.json')), [])
+
+    def test_folds_files_of_exited_processes(self):
+        metrics.NEEDS_UPDATE.inc(1)
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            for pid, value in ((1001, 2), (1002, 3)):
+                row = {'name': 'gmh_needs_update_transitions_total', 'labels': {}, 'value': value}
+                Path(directory, f'{pid}-aaaa.json').write_text(json.dumps([row]), encoding='utf-8')
+            with mock.patch.object(metrics, '_process_alive', side_effect=lambda pid: pid == os.getpid()):
+                first = metrics.render()
+                second = metrics.render()
+            names = sorted(path.name for path in Path(directory).glob('*.json'))
+        self.assertEqual(names, [metrics.AGGREGATE_FILE])
+        self.assertEqual(sample(first, 'gmh_needs_update_transitions_total'), 6)
+        self.assertEqual(sample(second, 'gmh_needs_update_transitions_total'), 6)
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset_metrics()
+        reset_cache_stats()
+        User = get_user_model()
+        self.owner = User.objects.create_user('owner', password='pass-1234')
+        self.project = Project.objects.create(name='Metrics Project', voting_pool_size=1)
+        self.project.add_member(self.owner, ProjectMembership.Role.OWNER)
+        self.entry = Entry.objects.create(project=self.project, title='Trunk')
+        Block.objects.create(entry=self.entry, stable_id='h_a', type='h2', text='A', position=1)
+        self.change = Change.objects.create(
+            project=self.project,
+            target_entry=self.entry,
+            summary='Rename',
+            ops_json=[{'type': 'UPDATE_TEXT', 'block_id': 'h_a', 'new_text': 'B'}],
+            affected_blocks=['h_a'],
+            status='published',
+        )
+        Change.objects.create(
+            project=self.project, target_entry=self.entry, summary='Other', affected_blocks=['h_a'], status='published'
+        )
+        self.client = Client()
+        self.client.force_login(self.owner)
+
+    def test_vote_merge_records_merge_metrics(self):
+        response = self.client.post(
+            f'/api/changes/{self.change.id}/votes', data=json.dumps({'value': 1}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        text = metrics.render()
+        self.assertEqual(sample(text, 'gmh_merge_duration_seconds_count'), 1)
+        self.assertEqual(sample(text, 'gmh_merge_ops_sum'), 1)
+        self.assertEqual(sample(text, 'gmh_vote_to_merge_seconds_count'), 1)
+        self.assertEqual(sample(text, 'gmh_needs_update_transitions_total'), 1)
+        self.assertEqual(sample(text, 'gmh_request_duration_seconds_count{url_name="api_change_vote"}'), 1)
+
+    def test_entry_requests_record_serialize_time_and_cache_events(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get(f'/api/projects/{self.project.id}/entry').status_code, 200)
+        serialize_entry(self.entry)
+        text = metrics.render()
+        self.assertEqual(sample(text, 'gmh_serialize_entry_seconds_count{blocks="100"}'), 2)
+        self.assertEqual(sample(text, 'gmh_cache_events_total{event="hits",namespace="entries"}'), 1)
+
+
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        metrics.reset_metrics()
+        User = get_user_model()
+        self.staff = User.objects.create_user('staff', password='pass-1234', is_staff=True)
+        self.member = User.objects.create_user('member', password='pass-1234')
+
+    def test_requires_staff_or_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    def test_staff_get_exposition_text(self):
+        self.client.force_login(self.staff)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIn('# TYPE gmh_request_duration_seconds histogram', response.content.decode())
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_bearer_token(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from groupmindhub.apps.core.models import Entry, Project, ProjectMembership
+from groupmindhub.apps.core.profiling import StackSampler, list_profiles, task_is_running
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir, ignore_errors=True)
+        override = override_settings(PROFILE_DIR=self.profile_dir, PROFILE_RETENTION=3, PROFILE_INTERVAL_MS=1)
+        override.enable()
+        self.addCleanup(override.disable)
+        User = get_user_model()
+        self.owner = User.objects.create_user('owner', password='pass12345')
+        self.editor = User.objects.create_user('editor', password='pass12345')
+        self.staff = User.objects.create_user('staff', password='pass12345', is_staff=True)
+        self.project = Project.objects.create(name='Profiled Project')
+        self.entry = Entry.objects.create(project=self.project, title='Trunk', status='published')
+        ProjectMembership.objects.create(project=self.project, user=self.owner, role=ProjectMembership.Role.OWNER)
+        ProjectMembership.objects.create(project=self.project, user=self.editor, role=ProjectMembership.Role.EDITOR)
+
+    def test_owner_profiles_page_with_query_param(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(f'/entries/{self.entry.id}/?profile=1')
+        self.assertEqual(response.status_code, 200)
+        profile_id = response['X-Profile-Id']
+        [summary] = list_profiles()
+        self.assertEqual(summary['id'], profile_id)
+        self.assertEqual(summary['view'], 'entry_detail')
+        self.assertEqual(summary['user'], 'owner')
+        self.assertGreater(summary['sql_count'], 0)
+        self.assertNotIn('queries', summary)
+
+    def test_header_profiles_async_endpoint_with_sql_trace(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(f'/api/projects/{self.project.id}/entry', HTTP_X_PROFILE='1')
+        profile_id = response['X-Profile-Id']
+        self.client.force_login(self.staff)
+        trace = json.loads(self.client.get(f'/admin/profiles/{profile_id}.json').content)
+        self.assertEqual(trace['view'], 'api_project_entry')
+        self.assertTrue(any('core_block' in q['sql'] for q in trace['queries']))
+
+    def test_non_owner_is_served_without_profiling(self):
+        self.client.force_login(self.editor)
+        response = self.client.get(f'/entries/{self.entry.id}/?profile=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(list_profiles(), [])
+
+    def test_staff_profiles_any_project_and_retention_cap_applies(self):
+        self.client.force_login(self.staff)
+        ids = [self.client.get(f'/projects/{self.project.id}/?profile=1')['X-Profile-Id'] for _ in range(5)]
+        self.assertEqual(len(set(ids)), 5)
+        self.assertEqual(len(list_profiles()), 3)
+
+    def test_admin_page_lists_profiles_for_staff_only(self):
+        self.client.force_login(self.owner)
+        profile_id = self.client.get(f'/entries/{self.entry.id}/?profile=1')['X-Profile-Id']
+        self.assertEqual(self.client.get('/admin/profiles/').status_code, 302)
+        self.client.force_login(self.staff)
+        response = self.client.get('/admin/profiles/')
+        self.assertContains(response, profile_id)
+        stacks = self.client.get(f'/admin/profiles/{profile_id}.folded')
+        self.assertEqual(stacks['Content-Type'], 'text/plain; charset=utf-8')
+        self.assertEqual(self.client.get('/admin/profiles/../settings.folded').status_code, 404)
+        self.assertEqual(self.client.get(f'/admin/profiles/{profile_id}.py').status_code, 404)
+
+
+class StackSamplerTests(SimpleTestCase):
+    def test_loop_thread_samples_only_the_owning_task(self):
+        def profiled_frame(sampler):
+            sampler.sample()
+
+        def other_frame(sampler):
+            sampler.sample()
+
+        async def other(sampler):
+            other_frame(sampler)
+
+        async def scenario():
+            thread_id = threading.get_ident()
+            owner = task_is_running(asyncio.get_running_loop(), asyncio.current_task())
+            sampler = StackSampler({thread_id}, 1, owners={thread_id: owner})
+            profiled_frame(sampler)
+            await asyncio.create_task(other(sampler))
+            return sampler
+
+        sampler = asyncio.run(scenario())
+        self.assertEqual((sampler.samples, sampler.skipped), (2, 1))
+        [stack] = sampler.stacks
+        self.assertIn('profiled_frame', stack)
+
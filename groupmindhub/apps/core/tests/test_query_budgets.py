@@ -0,0 +1,101 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from groupmindhub.apps.core.logic import cast_change_vote
+from groupmindhub.apps.core.models import Block, Change, Comment, Entry, Project, ProjectMembership
+from groupmindhub.apps.core.search import reindex_entry
+from groupmindhub.apps.core.seeding import seed_entry_sections
+
+from .budgets import QueryBudgetMixin
+
+CHANGES = 12
+VOTERS = 4
+
+# Query budgets per endpoint, sized for the fixture below (CHANGES changes with VOTERS votes
+# each, comments on every change). They must not grow with the fixture: a budget blown by
+# a few queries per change means an N+1 crept in.
+BUDGETS = {
+    'index': 5,
+    'project_detail': 5,
+    'entry_detail': 5,
+    'change_detail': 5,
+    'updates': 7,
+    'api_project_entry': 6,
+    'api_project_changes_list': 8,
+    'api_project_comments': 7,
+    'api_project_search': 6,
+    'api_change_vote': 19,
+}
+
+
+@override_settings(JOBS_EAGER=False)
+class EndpointQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user('owner', password='pass-1234')
+        voters = [User.objects.create_user(f'voter{i}', password='pass-1234') for i in range(VOTERS)]
+        cls.project = Project.objects.create(name='Budget Project')
+        cls.project.add_member(cls.owner, ProjectMembership.Role.OWNER)
+        for voter in voters:
+            cls.project.add_member(voter, ProjectMembership.Role.EDITOR)
+        cls.entry = Entry.objects.create(project=cls.project, title='Trunk', author=cls.owner, status='published')
+        seed_entry_sections(cls.entry, [
+            {'heading': f'Section {i}', 'body': f'Body {i} budget', 'children': []} for i in range(6)
+        ])
+        reindex_entry(cls.entry)
+        heading = Block.objects.filter(entry=cls.entry, type='h2').order_by('position').first()
+        cls.section_id = heading.stable_id[2:]
+        cls.changes = []
+        for i in range(CHANGES):
+            change = Change.objects.create(
+                project=cls.project,
+                target_entry=cls.entry,
+                author=voters[i % VOTERS],
+                summary=f'Budget change {i}',
+                target_section_id=cls.section_id,
+                ops_json=[{'type': 'UPDATE_TEXT', 'block_id': heading.stable_id, 'new_text': f'Heading {i}'}],
+                status='published',
+            )
+            for voter in voters:
+                cast_change_vote(change, voter, 1 if (i + voter.id) % 2 else -1)
+            Comment.objects.create(project=cls.project, change=change, author=cls.owner, body=f'Comment {i}')
+            cls.changes.append(change)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.owner)
+
+    def _check(self, name, method, path, **kwargs):
+        response = self.assertQueryBudget(BUDGETS[name], method, path, **kwargs)
+        self.assertLess(response.status_code, 400, f'{name}: {response.status_code}')
+        return response
+
+    def test_web_views(self):
+        change = self.changes[0]
+        self._check('index', 'get', '/')
+        self._check('project_detail', 'get', f'/projects/{self.project.id}/')
+        self._check('entry_detail', 'get', f'/entries/{self.entry.id}/')
+        self._check('change_detail', 'get', f'/changes/{change.id}/')
+        self._check('updates', 'get', '/updates/')
+
+    def test_api_reads(self):
+        base = f'/api/projects/{self.project.id}'
+        self._check('api_project_entry', 'get', f'{base}/entry')
+        self._check('api_project_changes_list', 'get', f'{base}/changes')
+        self._check('api_project_comments', 'get', f'{base}/comments', data={
+            'target_type': 'change', 'change_id': self.changes[0].id,
+        })
+        self._check('api_project_search', 'get', f'{base}/search', data={'q': 'budget'})
+
+    def test_vote(self):
+        self._check(
+            'api_change_vote',
+            'post',
+            f'/api/changes/{self.changes[0].id}/votes',
+            data=json.dumps({'value': 1}),
+            content_type='application/json',
+        )
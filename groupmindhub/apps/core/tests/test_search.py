@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+
+from groupmindhub.apps.core.logic import apply_merge_core
+from groupmindhub.apps.core.models import Block, Change, Comment, Entry, Project, ProjectMembership, Section
+from groupmindhub.apps.core.search import reindex_entry, search
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.member = User.objects.create_user('member', password='pass-1234')
+        self.outsider = User.objects.create_user('outsider', password='pass-1234')
+        self.project = Project.objects.create(name='Search Project', visibility=Project.Visibility.PRIVATE)
+        ProjectMembership.objects.create(project=self.project, user=self.member, role=ProjectMembership.Role.EDITOR)
+        self.entry = Entry.objects.create(project=self.project, title='Charter')
+        Block.objects.create(entry=self.entry, stable_id='h_rules', type='h2', text='Voting rules', position=1)
+        Block.objects.create(
+            entry=self.entry, stable_id='p_rules', type='p', text='A quorum of members must vote.',
+            parent_stable_id='h_rules', position=2,
+        )
+        Block.objects.create(entry=self.entry, stable_id='h_money', type='h2', text='Finance', position=3)
+        self.section = Section.objects.create(entry=self.entry, stable_id='rules', heading='Voting rules')
+        reindex_entry(self.entry)
+
+    def test_block_hits_are_labelled_with_their_section(self):
+        hits, has_next = search(self.project.id, 'quorum')
+        self.assertFalse(has_next)
+        self.assertEqual([(h.kind, h.label, h.link) for h in hits], [
+            ('block', 'Voting rules', f'/entries/{self.entry.id}/?focus=rules'),
+        ])
+
+    def test_merge_and_comments_update_the_index(self):
+        change = Change.objects.create(
+            project=self.project,
+            target_entry=self.entry,
+            summary='Lower quorum',
+            status='published',
+            ops_json=[
+                {'type': 'UPDATE_TEXT', 'block_id': 'p_rules', 'new_text': 'A majority of members must vote.'},
+                {'type': 'INSERT_BLOCK', 'after_id': 'h_money', 'new_block': {'type': 'p', 'text': 'Quorum for budgets is 25%.', 'parent': 'h_money'}},
+            ],
+        )
+        apply_merge_core(change)
+        self.assertEqual([h.label for h in search(self.project.id, 'quorum')[0]], ['Finance'])
+        self.assertEqual(len(search(self.project.id, 'majority')[0]), 1)
+
+        comment = Comment.objects.create(section=self.section, author=self.member, body='Quorum seems too low')
+        self.assertEqual({h.kind for h in search(self.project.id, 'quorum')[0]}, {'block', 'comment'})
+        comment.delete()
+        self.assertEqual({h.kind for h in search(self.project.id, 'quorum')[0]}, {'block'})
+
+    def test_endpoint_paginates_and_respects_visibility(self):
+        for i in range(3):
+            Block.objects.create(entry=self.entry, stable_id=f'p_x{i}', type='p', text=f'quorum note {i}', position=10 + i)
+        reindex_entry(self.entry)
+        url = f'/api/projects/{self.project.id}/search'
+
+        client = Client()
+        client.force_login(self.outsider)
+        self.assertEqual(client.get(url, {'q': 'quorum'}).status_code, 403)
+
+        client.force_login(self.member)
+        first = client.get(url, {'q': 'quorum', 'page_size': 3}).json()
+        self.assertEqual(len(first['results']), 3)
+        self.assertTrue(first['has_next'])
+        second = client.get(url, {'q': 'quorum', 'page_size': 3, 'page': 2}).json()
+        self.assertEqual(len(second['results']), 1)
+        self.assertFalse(second['has_next'])
+        self.assertEqual(client.get(url, {'q': '"('}).json()['results'], [])
+        self.assertEqual(client.get(url).status_code, 400)
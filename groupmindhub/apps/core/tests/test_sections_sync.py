@@ -0,0 +1,68 @@
+from django.test import TestCase
+
+from groupmindhub.apps.core.logic import apply_merge_core
+from groupmindhub.apps.core.models import Block, Change, Comment, Entry, Project, Section
+from groupmindhub.apps.core.seeding import seed_entry_sections
+
+
+class SectionSyncTests(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name='Sync Project')
+        self.entry = Entry.objects.create(project=self.project, title='Charter')
+        seed_entry_sections(self.entry, [
+            {'heading': 'Rules', 'body': 'Vote weekly.', 'children': [
+                {'heading': 'Quorum', 'body': 'Half the members.', 'children': []},
+            ]},
+            {'heading': 'Finance', 'body': '', 'children': []},
+        ])
+
+    def _merge(self, ops):
+        change = Change.objects.create(
+            project=self.project, target_entry=self.entry, summary='Edit', status='published', ops_json=ops,
+        )
+        apply_merge_core(change)
+
+    def _sections(self):
+        return [
+            (s.stable_id, s.heading, s.body, s.parent.stable_id if s.parent_id else None, s.position)
+            for s in Section.objects.filter(entry=self.entry, orphaned_at__isnull=True)
+            .select_related('parent')
+            .order_by('position')
+        ]
+
+    def test_merge_updates_inserts_and_reparents_sections(self):
+        rules = Section.objects.get(entry=self.entry, stable_id='s1')
+        self._merge([
+            {'type': 'UPDATE_TEXT', 'block_id': 'h_s1', 'new_text': 'Voting rules'},
+            {'type': 'UPDATE_TEXT', 'block_id': 'p_s1', 'new_text': 'Vote monthly.'},
+            {'type': 'INSERT_BLOCK', 'after_id': 'h_s2', 'new_block': {'id': 'h_audit', 'type': 'h2', 'text': 'Audit', 'parent': 'h_s2'}},
+            {'type': 'MOVE_BLOCK', 'block_id': 'h_s1_1', 'after_id': 'h_audit', 'new_parent': 'h_s2'},
+            {'type': 'MOVE_BLOCK', 'block_id': 'p_s1_1', 'after_id': 'h_s1_1', 'new_parent': 'h_s1_1'},
+        ])
+        self.assertEqual(self._sections(), [
+            ('s1', 'Voting rules', 'Vote monthly.', None, 1.0),
+            ('s2', 'Finance', '', None, 2.0),
+            ('audit', 'Audit', '', 's2', 3.0),
+            ('s1_1', 'Quorum', 'Half the members.', 's2', 4.0),
+        ])
+        self.assertEqual(Section.objects.get(entry=self.entry, stable_id='s1').pk, rules.pk)
+
+    def test_deleted_heading_orphans_its_section_and_keeps_comments(self):
+        quorum = Section.objects.get(entry=self.entry, stable_id='s1_1')
+        comment = Comment.objects.create(section=quorum, body='Too high?')
+        self._merge([
+            {'type': 'DELETE_BLOCK', 'block_id': 'h_s1_1'},
+            {'type': 'DELETE_BLOCK', 'block_id': 'p_s1_1'},
+        ])
+        self.assertEqual([s[0] for s in self._sections()], ['s1', 's2'])
+        self.assertFalse(Block.objects.filter(entry=self.entry, stable_id='h_s1_1').exists())
+        quorum.refresh_from_db()
+        self.assertIsNotNone(quorum.orphaned_at)
+        self.assertEqual(Comment.objects.get(id=comment.id).section_id, quorum.pk)
+
+        self._merge([
+            {'type': 'INSERT_BLOCK', 'after_id': 'p_s1', 'new_block': {'id': 'h_s1_1', 'type': 'h2', 'text': 'Quorum', 'parent': 'h_s1'}},
+        ])
+        quorum.refresh_from_db()
+        self.assertIsNone(quorum.orphaned_at)
+        self.assertEqual([s[0] for s in self._sections()], ['s1', 's1_1', 's2'])
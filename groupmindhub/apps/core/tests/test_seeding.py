@@ -0,0 +1,86 @@
+import json
+import math
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from groupmindhub.apps.core.models import Block, Entry, Project, Section
+from groupmindhub.apps.core.seeding import BULK_BATCH_SIZE, normalize_section_tree, seed_entry_sections
+
+
+class SeedEntrySectionsTests(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name='Seed Project')
+        self.entry = Entry.objects.create(project=self.project, title='Trunk', status='published')
+
+    def test_nested_tree_layout(self):
+        tree = normalize_section_tree([
+            {'heading': 'One', 'body': 'Body one', 'children': [
+                {'heading': '', 'body': 'Nested body', 'children': []},
+            ]},
+            {'heading': '', 'body': '', 'children': []},
+            {'heading': 'Two', 'body': '', 'children': []},
+        ])
+        self.assertEqual(seed_entry_sections(self.entry, tree), 3)
+        blocks = list(self.entry.blocks.order_by('position').values_list('stable_id', 'type', 'text', 'parent_stable_id'))
+        self.assertEqual(blocks, [
+            ('h_s1', 'h2', 'One', None),
+            ('p_s1', 'p', 'Body one', 'h_s1'),
+            ('h_s1_1', 'h2', 'Section 1.1', 'h_s1'),
+            ('p_s1_1', 'p', 'Nested body', 'h_s1_1'),
+            ('h_s2', 'h2', 'Two', None),
+        ])
+        child = Section.objects.get(entry=self.entry, stable_id='s1_1')
+        self.assertEqual(child.parent.stable_id, 's1')
+        self.assertEqual(child.position, 2)
+
+    def test_thousand_section_seed_uses_bulk_inserts(self):
+        tree = [
+            {
+                'heading': f'Chapter {chapter}',
+                'body': f'Intro {chapter}',
+                'children': [
+                    {'heading': f'Clause {chapter}.{clause}', 'body': 'Text', 'children': []}
+                    for clause in range(1, 10)
+                ],
+            }
+            for chapter in range(1, 101)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            created = seed_entry_sections(self.entry, normalize_section_tree(tree))
+        self.assertEqual(created, 1000)
+        self.assertEqual(Section.objects.filter(entry=self.entry).count(), 1000)
+        self.assertEqual(Block.objects.filter(entry=self.entry).count(), 2000)
+        # One INSERT per batch: sections of depth 1 (100) and depth 2 (900), then the 2000
+        # blocks. Batches are capped by BULK_BATCH_SIZE and the backend's parameter limit.
+        expected = sum(
+            math.ceil(rows / min(BULK_BATCH_SIZE, self._batch_size(model)))
+            for model, rows in ((Section, 100), (Section, 900), (Block, 2000))
+        )
+        inserts = [query['sql'] for query in ctx.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), expected)
+        self.assertEqual(len(ctx.captured_queries) - len(inserts), 2)  # SAVEPOINT / RELEASE
+
+    @staticmethod
+    def _batch_size(model):
+        fields = [field for field in model._meta.concrete_fields if field.column != 'id']
+        return connection.ops.bulk_batch_size(fields, [None]) or BULK_BATCH_SIZE
+
+
+class ProjectNewSeedingTests(TestCase):
+    def test_project_new_seeds_sections(self):
+        user = get_user_model().objects.create_user('creator', password='pass-1234')
+        client = Client()
+        client.force_login(user)
+        response = client.post('/projects/new/', {
+            'name': 'Bylaws',
+            'voting_pool_size': 5,
+            'approval_threshold': '0.40',
+            'voting_duration_hours': 24,
+            'sections_json': json.dumps([{'heading': 'Purpose', 'body': 'Why', 'children': []}]),
+        })
+        self.assertEqual(response.status_code, 302)
+        entry = Entry.objects.get(project__name='Bylaws')
+        self.assertEqual(list(entry.blocks.values_list('stable_id', flat=True)), ['h_s1', 'p_s1'])
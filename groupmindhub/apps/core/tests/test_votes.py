@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from groupmindhub.apps.core.logic import cast_change_vote
+from groupmindhub.apps.core.models import Change, ChangeVote, Entry, Project
+
+
+class CastChangeVoteTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('voter', password='pass-1234')
+        self.project = Project.objects.create(name='Vote Project')
+        self.entry = Entry.objects.create(project=self.project, title='Trunk')
+        self.change = Change.objects.create(
+            project=self.project, target_entry=self.entry, summary='Proposal', status='published'
+        )
+
+    def _cache(self):
+        return Change.objects.values_list('votes_cache_int', flat=True).get(id=self.change.id)
+
+    def test_returns_previous_value_and_applies_delta(self):
+        self.assertEqual(cast_change_vote(self.change, self.user, 1), 0)
+        self.assertEqual(self._cache(), 1)
+        self.assertEqual(cast_change_vote(self.change, self.user, 1), 1)
+        self.assertEqual(self._cache(), 1)
+        self.assertEqual(cast_change_vote(self.change, self.user, -1), 1)
+        self.assertEqual(self._cache(), -1)
+        self.assertEqual(cast_change_vote(self.change, self.user, 0), -1)
+        self.assertEqual(self._cache(), 0)
+        self.assertFalse(ChangeVote.objects.filter(change=self.change).exists())
+
+    def test_vote_is_written_with_one_upsert(self):
+        cast_change_vote(self.change, self.user, 1)
+        with CaptureQueriesContext(connection) as ctx:
+            cast_change_vote(self.change, self.user, -1)
+        writes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith(('INSERT INTO "core_changevote"', 'UPDATE "core_changevote"'))]
+        self.assertEqual(len(writes), 1)
+        self.assertIn('ON CONFLICT', writes[0])
+        self.assertEqual(ChangeVote.objects.get(change=self.change, user=self.user).value, -1)
+
+
+class ChangeVoteMigrationTests(TransactionTestCase):
+    migrate_from = [('core', '0014_entryhistory_delta')]
+    migrate_to = [('core', '0015_changevote')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_copies_legacy_votes_and_recomputes_tallies(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        old_apps = executor.loader.project_state(self.migrate_from).apps
+        User = old_apps.get_model('auth', 'User')
+        Project = old_apps.get_model('core', 'Project')
+        Entry = old_apps.get_model('core', 'Entry')
+        Change = old_apps.get_model('core', 'Change')
+        Vote = old_apps.get_model('core', 'Vote')
+        users = [User.objects.create(username=f'legacy{i}') for i in range(3)]
+        project = Project.objects.create(name='Legacy Project')
+        entry = Entry.objects.create(project=project, title='Trunk')
+        voted = Change.objects.create(project=project, target_entry=entry, summary='Voted', votes_cache_int=7)
+        stale = Change.objects.create(project=project, target_entry=entry, summary='Stale', votes_cache_int=3)
+        for user, value in zip(users, (1, 1, -1)):
+            Vote.objects.create(user=user, target_type='change', target_id=voted.id, value=value)
+        Vote.objects.create(user=users[0], target_type='entry', target_id=entry.id, value=1)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        new_apps = executor.loader.project_state(self.migrate_to).apps
+        ChangeVote = new_apps.get_model('core', 'ChangeVote')
+        Change = new_apps.get_model('core', 'Change')
+        Vote = new_apps.get_model('core', 'Vote')
+
+        self.assertEqual(
+            sorted(ChangeVote.objects.filter(change_id=voted.id).values_list('value', flat=True)), [-1, 1, 1]
+        )
+        self.assertEqual(Change.objects.get(id=voted.id).votes_cache_int, 1)
+        self.assertEqual(Change.objects.get(id=stale.id).votes_cache_int, 0)
+        self.assertEqual(list(Vote.objects.values_list('target_type', flat=True)), ['entry'])
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, 'core_changevote')
+        self.assertTrue(
+            any(c['index'] and c['columns'] == ['change_id', 'value'] for c in constraints.values())
+        )
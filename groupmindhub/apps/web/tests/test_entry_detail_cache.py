@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from groupmindhub.apps.core.models import Block, Entry, Project, ProjectMembership
+
+
+class EntryDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user('reader', password='pass-1234')
+        self.project = Project.objects.create(name='Cached Project')
+        ProjectMembership.objects.create(project=self.project, user=self.user, role=ProjectMembership.Role.OWNER)
+        self.entry = Entry.objects.create(project=self.project, title='Trunk', author=self.user, status='published')
+        Block.objects.create(entry=self.entry, stable_id='h_rules', type='h2', text='Rules', position=1)
+        Block.objects.create(entry=self.entry, stable_id='p_rules', type='p', text='Be kind.', parent_stable_id='h_rules', position=2)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('entry_detail', args=[self.entry.id])
+
+    def _block_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response, [q for q in ctx.captured_queries if 'core_block' in q['sql']]
+
+    def test_sections_rendered_server_side_and_cached(self):
+        response, block_queries = self._block_queries()
+        self.assertContains(response, 'data-section-id="rules"')
+        self.assertTrue(block_queries)
+        response, block_queries = self._block_queries()
+        self.assertContains(response, 'Be kind.')
+        self.assertEqual(block_queries, [])
+
+    def test_new_version_rebuilds_payload(self):
+        self.client.get(self.url)
+        Block.objects.filter(entry=self.entry, stable_id='h_rules').update(text='House rules')
+        Entry.objects.filter(id=self.entry.id).update(entry_version_int=2)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'House rules')
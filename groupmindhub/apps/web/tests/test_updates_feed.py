@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from groupmindhub.apps.core.models import (
+    ActivityEvent,
+    Change,
+    Comment,
+    Entry,
+    Project,
+    ProjectActivity,
+    ProjectMembership,
+    ProjectStar,
+    SearchDocument,
+    Section,
+)
+
+
+class FollowedActivityFeedTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user('follower', password='pass-1234')
+        self.followed = Project.objects.create(name='Followed Project')
+        self.starred = Project.objects.create(name='Starred Project')
+        self.other = Project.objects.create(name='Other Project')
+        ProjectMembership.objects.create(project=self.followed, user=self.user, role=ProjectMembership.Role.VIEWER)
+        ProjectStar.objects.create(project=self.starred, user=self.user)
+        self.sections = {}
+        for project in (self.followed, self.starred, self.other):
+            entry = Entry.objects.create(project=project, title='Trunk')
+            self.sections[project.id] = {
+                'meetings': Section.objects.create(entry=entry, stable_id='meetings', heading='Meetings', position=1),
+                'budget': Section.objects.create(entry=entry, stable_id='budget', heading='Budget', position=2),
+            }
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def _comment(self, project, section_key, body):
+        return Comment.objects.create(project=project, section=self.sections[project.id][section_key], author=self.user, body=body)
+
+    def _activity(self, **params):
+        response = self.client.get(reverse('updates'), params)
+        return response, [item['summary'] for item in response.context['followed_activity']]
+
+    def test_comment_creation_writes_event(self):
+        comment = self._comment(self.followed, 'meetings', 'Hello there')
+        event = ActivityEvent.objects.get(comment=comment)
+        self.assertEqual(event.kind, ActivityEvent.Kind.COMMENT)
+        self.assertEqual(event.section_label, 'Meetings')
+
+    def test_feed_limited_to_followed_and_starred_projects(self):
+        self._comment(self.followed, 'meetings', 'member note')
+        self._comment(self.starred, 'meetings', 'starred note')
+        self._comment(self.other, 'meetings', 'stranger note')
+        _response, summaries = self._activity()
+        self.assertEqual(len(summaries), 2)
+        self.assertFalse(any('stranger' in summary for summary in summaries))
+
+    def test_section_filter_applies_before_limit(self):
+        for idx in range(30):
+            self._comment(self.followed, 'budget', f'budget {idx}')
+        self._comment(self.followed, 'meetings', 'meeting note')
+        _response, summaries = self._activity(section='meetings')
+        self.assertEqual(len(summaries), 1)
+        self.assertIn('meeting note', summaries[0])
+
+    def test_keyset_pagination(self):
+        for idx in range(30):
+            self._comment(self.followed, 'budget', f'budget {idx}')
+        response, first_page = self._activity()
+        self.assertEqual(len(first_page), 25)
+        next_url = response.context['next_activity_url']
+        self.assertTrue(next_url)
+        response = self.client.get(reverse('updates') + next_url)
+        second_page = [item['summary'] for item in response.context['followed_activity']]
+        self.assertEqual(len(second_page), 5)
+        self.assertFalse(set(first_page) & set(second_page))
+        self.assertIsNone(response.context['next_activity_url'])
+
+
+class ChangeDetailPublishTests(TestCase):
+    def test_publishing_from_the_page_runs_the_proposal_fan_out(self):
+        User = get_user_model()
+        user = User.objects.create_user('author', password='pass-1234')
+        project = Project.objects.create(name='Publish Project')
+        ProjectMembership.objects.create(project=project, user=user, role=ProjectMembership.Role.EDITOR)
+        entry = Entry.objects.create(project=project, title='Trunk')
+        change = Change.objects.create(project=project, target_entry=entry, author=user, summary='Tighten quorum')
+        client = Client()
+        client.force_login(user)
+
+        client.post(reverse('change_detail', args=[change.id]), {'action': 'publish_change'})
+
+        change.refresh_from_db()
+        self.assertEqual(change.status, 'published')
+        self.assertTrue(ActivityEvent.objects.filter(change=change, kind=ActivityEvent.Kind.PROPOSAL).exists())
+        self.assertEqual(ProjectActivity.objects.get(project=project).changes_24h, 1)
+        self.assertTrue(SearchDocument.objects.filter(kind=SearchDocument.Kind.CHANGE, ref=str(change.id)).exists())
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from groupmindhub.apps.core.models import (
+    Block,
+    Change,
+    Comment,
+    Entry,
+    EntryHistory,
+    Project,
+    ProjectMembership,
+)
+
+
+class UpdatesQueryCountTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user('hub-user', password='pass-1234')
+        self.project = Project.objects.create(name='Hub Project')
+        ProjectMembership.objects.create(project=self.project, user=self.user, role=ProjectMembership.Role.OWNER)
+        self.entry = Entry.objects.create(project=self.project, title='Trunk', author=self.user)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.serial = 0
+
+    def _add_activity(self, count: int):
+        for _ in range(count):
+            self.serial += 1
+            heading_id = f'h_s{self.serial}'
+            Block.objects.create(entry=self.entry, stable_id=heading_id, type='h2', text=f'Section {self.serial}', position=self.serial)
+            change = Change.objects.create(
+                project=self.project,
+                target_entry=self.entry,
+                author=self.user,
+                summary=f'Proposal {self.serial}',
+                target_section_id=heading_id[2:],
+                status='published',
+                published_at=timezone.now(),
+            )
+            merged = Change.objects.create(
+                project=self.project,
+                target_entry=self.entry,
+                author=self.user,
+                summary=f'Merged {self.serial}',
+                target_section_id=heading_id[2:],
+                status='merged',
+            )
+            EntryHistory.objects.create(entry=self.entry, change=merged, version_int=self.serial + 1)
+            Comment.objects.create(project=self.project, change=change, author=self.user, body=f'Note {self.serial}')
+
+    def _count_queries(self) -> int:
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('updates'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_items(self):
+        self._add_activity(1)
+        baseline = self._count_queries()
+        self._add_activity(10)
+        self.assertEqual(self._count_queries(), baseline)
+
+    def test_section_labels_resolved_from_headings(self):
+        self._add_activity(2)
+        response = self.client.get(reverse('updates'))
+        sections = {item['section'] for item in response.context['open_votings']}
+        self.assertEqual(sections, {'Section 1', 'Section 2'})
@@ -1,7 +1,11 @@
 from __future__ import annotations
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 from django.urls import reverse
 import json
 from datetime import timedelta
@@ -10,60 +14,64 @@ from groupmindhub.apps.core.models import (
     Project,
     Entry,
     Change,
-    Vote,
+    ArchivedChange,
     Block,
-    Section,
     ProjectStar,
-    EntryHistory,
+    ProjectActivity,
     ProjectMembership,
     ProjectInvite,
-    Comment,
     GovernanceProposal,
 )
-from groupmindhub.apps.core.api import serialize_entry
-from django.http import HttpResponse, HttpResponseForbidden
+from groupmindhub.apps.core.caching import ENTRIES, ROLLUPS
+from groupmindhub.apps.core.api import ENTRY_CACHE_TIMEOUT, cached_entry_payload, entry_cache_key
+from groupmindhub.apps.core.logic import cast_change_vote
+from groupmindhub.apps.core.search import reindex_entry
+from groupmindhub.apps.core.seeding import normalize_section_tree, seed_entry_sections
+from groupmindhub.apps.core.activity import followed_events
+from groupmindhub.apps.core.jobs import enqueue
+from groupmindhub.apps.core.profiling import list_profiles, profile_path
+from django.http import Http404, HttpResponse, HttpResponseForbidden
 from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
 from pathlib import Path
 
 from .forms import ProjectInviteForm, ProjectGovernanceForm
 from groupmindhub.apps.core.access import resolve_invite, forget_invite
-from django.utils.text import Truncator
+
+INDEX_PAGE_SIZE = 50
 
 
 def index(request):
     """Home page listing projects with stars + activity; creation moved to /projects/new/."""
-    from django.db.models import Count
-    from django.utils import timezone
-    now = timezone.now()
-    day_ago = now - timezone.timedelta(days=1)
-    week_ago = now - timezone.timedelta(days=7)
-    # Prefetch related counts cheaply
-    projects = list(Project.objects.all().order_by('-created_at'))
+    # Rows come straight from the activity rollup, ordered along its (score, last activity) index.
+    activity_qs = ProjectActivity.objects.select_related('project').order_by('-score', '-last_activity_at', '-project_id')
+    page = Paginator(activity_qs, INDEX_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    def build_rows():
+        return [
+            {
+                'id': rollup.project.id,
+                'name': rollup.project.name,
+                'created_at': rollup.project.created_at,
+                'stars': rollup.project.stars_count,
+                'activity': rollup.score,
+            }
+            for rollup in page.object_list
+        ]
+
+    # Shared across visitors; the per-user "starred" flag is layered on below.
+    rows = [dict(row) for row in ROLLUPS.get_or_set(('index', page.number), build_rows)]
     user_star_ids = set()
     if request.user.is_authenticated:
-        user_star_ids = set(ProjectStar.objects.filter(user=request.user, project__in=projects).values_list('project_id', flat=True))
-    # Build activity (simple heuristic for now): changes<24h *1 + changes<7d *0.2
-    patch_qs = Change.objects.filter(project__in=projects)
-    recent_counts = {
-        'day': dict(patch_qs.filter(created_at__gte=day_ago).values_list('project_id').annotate(c=Count('id'))),
-        'week': dict(patch_qs.filter(created_at__gte=week_ago).values_list('project_id').annotate(c=Count('id'))),
-    }
-    star_counts = dict(ProjectStar.objects.filter(project__in=projects).values_list('project_id').annotate(c=Count('id')))
-    rows = []
-    for p in projects:
-        day_c = recent_counts['day'].get(p.id, 0)
-        week_c = recent_counts['week'].get(p.id, 0)
-        activity = day_c + week_c * 0.2
-        rows.append({
-            'id': p.id,
-            'name': p.name,
-            'created_at': p.created_at,
-            'stars': star_counts.get(p.id, 0),
-            'starred': p.id in user_star_ids,
-            'activity': activity,
-        })
-    # Sort by created_at already; activity can be used client-side for filtering later.
-    return render(request, 'index.html', { 'projects': rows })
+        user_star_ids = set(
+            ProjectStar.objects.filter(
+                user=request.user,
+                project_id__in=[row['id'] for row in rows],
+            ).values_list('project_id', flat=True)
+        )
+    for row in rows:
+        row['starred'] = row['id'] in user_star_ids
+    return render(request, 'index.html', { 'projects': rows, 'page_obj': page })
 
 
 @login_required
@@ -112,72 +120,8 @@ def project_new(request):
             except Exception:
                 parsed = []
 
-            from itertools import count
-
-            def normalize(nodes):
-                out = []
-                if not isinstance(nodes, list):
-                    return out
-                for node in nodes:
-                    heading = (node.get('heading') if isinstance(node, dict) else '') or ''
-                    body = (node.get('body') if isinstance(node, dict) else '') or ''
-                    children = normalize(node.get('children') if isinstance(node, dict) else [])
-                    if not heading.strip() and not body.strip() and not children:
-                        continue
-                    out.append({
-                        'heading': heading.strip(),
-                        'body': body.strip(),
-                        'children': children,
-                    })
-                return out
-
-            sections_tree = normalize(parsed)
-
-            section_counter = count(1)
-            block_counter = count(1)
-
-            def stable_id_from_path(path):
-                return 's' + '_'.join(str(p) for p in path)
-
-            def default_heading_from_path(path):
-                return f"Section {'.'.join(str(p) for p in path)}"
-
-            def build(nodes, parent_section=None, path_prefix=()):
-                for idx, node in enumerate(nodes, start=1):
-                    path = path_prefix + (idx,)
-                    stable_id = stable_id_from_path(path)
-                    heading_text = node['heading'] or default_heading_from_path(path)
-                    body_text = node['body']
-                    section = Section.objects.create(
-                        entry=entry,
-                        stable_id=stable_id,
-                        heading=heading_text,
-                        body=body_text,
-                        parent=parent_section,
-                        position=next(section_counter),
-                    )
-                    heading_block_id = f'h_{stable_id}'
-                    parent_heading = f'h_{parent_section.stable_id}' if parent_section else None
-                    Block.objects.create(
-                        entry=entry,
-                        stable_id=heading_block_id,
-                        type='h2',
-                        text=heading_text,
-                        parent_stable_id=parent_heading,
-                        position=next(block_counter),
-                    )
-                    if body_text:
-                        Block.objects.create(
-                            entry=entry,
-                            stable_id=f'p_{stable_id}',
-                            type='p',
-                            text=body_text,
-                            parent_stable_id=heading_block_id,
-                            position=next(block_counter),
-                        )
-                    build(node['children'], section, path)
-
-            build(sections_tree)
+            seed_entry_sections(entry, normalize_section_tree(parsed))
+            reindex_entry(entry)
 
             return redirect('project_detail', project_id=project.id)
     return render(request, 'project_new.html', {'governance_form': governance_form})
@@ -193,14 +137,7 @@ def project_star_toggle(request, project_id: int):
     if not request.user.is_authenticated:
         return JsonResponse({'error': 'auth required'}, status=401)
     project = get_object_or_404(Project, id=project_id)
-    star, created = ProjectStar.objects.get_or_create(project=project, user=request.user)
-    if not created:
-        # Toggle off
-        star.delete()
-        starred = False
-    else:
-        starred = True
-    count = ProjectStar.objects.filter(project=project).count()
+    starred, count = project.toggle_star(request.user)
     return JsonResponse({'project_id': project.id, 'starred': starred, 'stars': count})
 
 
@@ -365,6 +302,22 @@ def project_settings(request, project_id: int):
     })
 
 
+def _entry_render_bundle(entry: Entry):
+    """JSON payload and server-rendered section tree for an entry, cached per entry version.
+
+    Only user-independent data lives here; per-user fields are added by the view.
+    """
+    def render():
+        payload = cached_entry_payload(entry)
+        payload['title'] = payload.get('title') or 'Trunk'
+        payload['project_governance'] = entry.project.governance_snapshot()
+        sections_html = render_to_string('_section_tree.html', {'sections': payload.get('sections_tree') or []})
+        return json.dumps(payload), str(sections_html)
+
+    entry_json, sections_html = ENTRIES.get_or_set(entry_cache_key(entry, 'render'), render, ENTRY_CACHE_TIMEOUT)
+    return entry_json, mark_safe(sections_html)
+
+
 @login_required
 def entry_detail(request, entry_id: int):
     """Interactive entry page using the exact prototype UI & client logic.
@@ -380,47 +333,7 @@ def entry_detail(request, entry_id: int):
     except PermissionDenied:
         return HttpResponseForbidden()
 
-    # Build block list from DB (fallback to a default prototype content if empty)
-    if entry.blocks.exists():
-        blocks = [
-            {
-                'id': b.stable_id,
-                'type': b.type,
-                'text': b.text,
-                'parent': b.parent_stable_id,
-            }
-            for b in entry.blocks.order_by('position', 'id')
-        ]
-    else:
-        # Default prototype seed (matches clone.html) – not persisted unless later saved
-        blocks = [
-            { 'id':'h_purpose', 'type':'h2', 'text':'Purpose', 'parent':None },
-            { 'id':'p_purpose', 'type':'p',  'text':'These bylaws guide the operation of the Willow Creek Community Garden and ensure fair access, safety, and shared stewardship.', 'parent':'h_purpose' },
-            { 'id':'h_meet', 'type':'h2', 'text':'Meetings', 'parent':None },
-            { 'id':'p_meet', 'type':'p',  'text':'The HOA meets monthly on the first Saturday at 10:00 AM at the tool shed. Minutes are posted to the bulletin board within 7 days.', 'parent':'h_meet' },
-            { 'id':'h_quorum', 'type':'h2', 'text':'Quorum', 'parent':None },
-            { 'id':'p_quorum', 'type':'p',  'text':'Quorum is established when at least 25% of plot holders are present. Votes pass with a simple majority of those present.', 'parent':'h_quorum' },
-            { 'id':'h_maint', 'type':'h2', 'text':'Plot Maintenance', 'parent':None },
-            { 'id':'p_maint', 'type':'p',  'text':'Gardeners must weed, water, and maintain plots weekly. Neglected plots may be reassigned after two warnings.', 'parent':'h_maint' },
-            { 'id':'h_tools', 'type':'h2', 'text':'Tools & Safety', 'parent':None },
-            { 'id':'p_tools', 'type':'p',  'text':'Common tools are shared on a first-come basis. Return tools clean. Children must be supervised at all times.', 'parent':'h_tools' }
-        ]
-
-    # Prepare JSON for template injection (safe because we control keys)
-    if entry.pk:
-        entry_json = serialize_entry(entry)
-        entry_json['title'] = entry_json.get('title') or 'Trunk'
-    else:
-        entry_json = {
-            'id': entry.id,
-            'project_id': entry.project_id,
-            'title': entry.title or 'Trunk v1',
-            'version': entry.entry_version_int,
-            'votes': entry.votes_cache_int,
-            'blocks': blocks,
-            'sections': [],
-        }
-    entry_json['project_governance'] = entry.project.governance_snapshot()
+    entry_json, sections_html = _entry_render_bundle(entry)
 
     display_name = request.user.get_full_name() or request.user.get_username()
     user_payload = {
@@ -436,8 +349,8 @@ def entry_detail(request, entry_id: int):
 
     return render(request, 'entry_detail.html', {
         'entry': entry,
-        'ENTRY_JSON': json.dumps(entry_json),
-        'entry_sections_tree': entry_json.get('sections_tree') or [],
+        'ENTRY_JSON': entry_json,
+        'entry_sections_html': sections_html,
         'project_membership': membership,
         'user_payload': user_payload,
         'project_governance': entry.project.governance_snapshot(),
@@ -457,6 +370,34 @@ def _format_time_remaining(delta):
     return f"{minutes}m"
 
 
+def _heading_block_id(section_id) -> str:
+    section_id = str(section_id or '')
+    if not section_id:
+        return ''
+    return section_id if section_id.startswith('h_') else f'h_{section_id}'
+
+
+def _section_labels_for_changes(changes) -> dict:
+    """Map change id -> target section heading text using one query for all changes."""
+    targets = {}
+    for change in changes:
+        heading_id = _heading_block_id(change.target_section_id)
+        if heading_id and change.target_entry_id:
+            targets[change.id] = (change.target_entry_id, heading_id)
+    if not targets:
+        return {}
+    entry_ids = {entry_id for entry_id, _heading in targets.values()}
+    heading_ids = {heading for _entry_id, heading in targets.values()}
+    headings = {
+        (entry_id, stable_id): text
+        for entry_id, stable_id, text in Block.objects.filter(
+            entry_id__in=entry_ids,
+            stable_id__in=heading_ids,
+        ).values_list('entry_id', 'stable_id', 'text')
+    }
+    return {change_id: headings[key] for change_id, key in targets.items() if key in headings}
+
+
 def updates(request):
     """Personal hub showing open votings, proposals needing attention, and followed activity."""
     now = timezone.now()
@@ -476,22 +417,26 @@ def updates(request):
             return False
         return True
 
+    open_changes = []
+    if show_open:
+        open_changes = list(
+            Change.objects.select_related('project', 'target_entry').filter(status='published').order_by('published_at')[:25]
+        )
+    personal_changes = []
+    if show_needs and request.user.is_authenticated:
+        personal_changes = list(
+            Change.objects.select_related('project').filter(author=request.user).order_by('-published_at', '-created_at')[:25]
+        )
+
+    # Resolve every change's section heading up front with a single Block query.
+    section_labels = _section_labels_for_changes(open_changes + personal_changes)
+
     def _section_label_for_change(change: Change) -> str:
-        # Prefer resolving the target section heading text from the entry blocks
-        try:
-            section_id = change.target_section_id or ''
-            if section_id:
-                heading_id = section_id if str(section_id).startswith('h_') else f'h_{section_id}'
-                blk = Block.objects.filter(entry_id=change.target_entry_id, stable_id=heading_id).first()
-                if blk:
-                    return blk.text
-        except Exception:
-            pass
-        return change.summary or 'Section'
+        return section_labels.get(change.id) or change.summary or 'Section'
 
     open_votings = []
     if show_open:
-        for change in Change.objects.select_related('project', 'target_entry').filter(status='published').order_by('published_at')[:25]:
+        for change in open_changes:
             project_name = change.project.name if change.project_id else 'Project'
             section_label = _section_label_for_change(change)
             if not matches_filters(project_name, section_label):
@@ -512,8 +457,7 @@ def updates(request):
 
     your_proposals = []
     if show_needs and request.user.is_authenticated:
-        personal_qs = Change.objects.select_related('project').filter(author=request.user).order_by('-published_at', '-created_at')[:25]
-        for change in personal_qs:
+        for change in personal_changes:
             project_name = change.project.name if change.project_id else 'Project'
             section_label = _section_label_for_change(change)
             if not matches_filters(project_name, section_label):
@@ -537,71 +481,32 @@ def updates(request):
             })
 
     followed_activity = []
+    next_activity_url = None
     if show_activity:
-        history_qs = EntryHistory.objects.select_related('entry__project', 'change').order_by('-created_at')[:25]
-        for record in history_qs:
-            project_name = record.entry.project.name if record.entry and record.entry.project_id else 'Project'
-            change = record.change
-            if change:
-                label = f"#{change.id} merged into v{record.version_int}"
-                section_label = _section_label_for_change(change)
-                link = f"/entries/{record.entry_id}/?focus={change.target_section_id or ''}&proposal={change.id}"
-            else:
-                label = f"Entry v{record.version_int} updated"
-                section_label = record.entry.title if record.entry else 'Entry'
-                link = f"/entries/{record.entry_id}/"
-            if not matches_filters(project_name, section_label):
-                continue
-            followed_activity.append({
-                'project': project_name,
-                'section': section_label,
-                'summary': label,
-                'timestamp': record.created_at,
-                'link': link,
-            })
-
-        comment_qs = Comment.objects.select_related(
-            'project',
-            'author',
-            'section__entry__project',
-            'change__project',
-            'change__target_entry',
-        ).order_by('-created_at')[:25]
-        for comment in comment_qs:
-            project_name = comment.project.name if comment.project_id else 'Project'
-            if comment.section_id:
-                section = comment.section
-                section_label = section.heading
-                link = f"/entries/{section.entry_id}/?focus={section.stable_id}"
-            elif comment.change_id:
-                change = comment.change
-                if not change:
-                    continue
-                section_label = _section_label_for_change(change)
-                link = f"/entries/{change.target_entry_id}/?focus={change.target_section_id or ''}&proposal={change.id}"
-            else:
-                continue
-            if not matches_filters(project_name, section_label):
-                continue
-            author = 'Anonymous'
-            if comment.author_id and comment.author:
-                author = comment.author.get_full_name() or comment.author.get_username() or 'Anonymous'
-            preview = Truncator(comment.body).chars(60)
+        events, next_cursor = followed_events(
+            request.user,
+            project_names=selected_projects,
+            section_query=section_query,
+            cursor=request.GET.get('activity_before'),
+        )
+        for event in events:
             followed_activity.append({
-                'project': project_name,
-                'section': section_label,
-                'summary': f"💬 {author}: {preview}",
-                'timestamp': comment.created_at,
-                'link': link,
+                'project': event.project.name,
+                'section': event.section_label,
+                'summary': event.summary,
+                'timestamp': event.created_at,
+                'link': event.link,
             })
-
-        followed_activity.sort(key=lambda item: item['timestamp'], reverse=True)
-        followed_activity = followed_activity[:25]
+        if next_cursor:
+            params = request.GET.copy()
+            params['activity_before'] = next_cursor
+            next_activity_url = f"?{params.urlencode()}"
 
     context = {
         'open_votings': open_votings,
         'your_proposals': your_proposals,
         'followed_activity': followed_activity,
+        'next_activity_url': next_activity_url,
         'project_choices': project_choices,
         'selected_projects': selected_projects,
         'section_query': section_query,
@@ -614,7 +519,9 @@ def updates(request):
 
 
 def change_detail(request, change_id: int):
-    patch = get_object_or_404(Change, id=change_id)
+    patch = Change.objects.filter(id=change_id).first()
+    if patch is None:
+        return _archived_change_detail(request, change_id)
     project = patch.project
     if project:
         invite = resolve_invite(request, project, persist=True)
@@ -633,14 +540,28 @@ def change_detail(request, change_id: int):
             # Align simple UI timer to 24h window
             patch.closes_at = patch.published_at + timedelta(hours=24)
             patch.save()
+            enqueue('activity.proposal', key=f"project:{patch.project_id}", change_id=patch.id)
             return redirect(request.path)
         if act == "vote":
             if not request.user.is_authenticated:
                 return redirect("login")
             val = int(request.POST.get("value"))
-            Vote.objects.update_or_create(user=request.user, target_type="change", target_id=patch.id, defaults={"value": val})
+            if val in (-1, 0, 1):
+                cast_change_vote(patch, request.user, val)
             return redirect(request.path)
     return render(request, "change_detail.html", {"change": patch})
+
+
+def _archived_change_detail(request, change_id: int):
+    archived = get_object_or_404(ArchivedChange.objects.select_related('project'), id=change_id)
+    invite = resolve_invite(request, archived.project, persist=True)
+    try:
+        archived.project.require_role(request.user, ProjectMembership.Role.VIEWER, invite=invite)
+    except PermissionDenied:
+        return HttpResponseForbidden()
+    return render(request, "change_detail.html", {"change": archived, "archived": True})
+
+
 def prototype_view(request):
     """Serve the original static prototype for visual/behavior parity check."""
     # Load the existing prototype.html from repo root.
@@ -663,3 +584,22 @@ def app_view(request, project_id: int | None = None):
 def clone_view(request):
     """Serve exact clone of prototype.html as Django template for perfect parity check."""
     return render(request, 'clone.html')
+
+
+@staff_member_required
+def admin_profiles(request):
+    """Staff list of the request profiles captured by ``ProfilingMiddleware``."""
+    return render(request, 'admin/profiles.html', {
+        'title': 'Request profiles',
+        'profiles': list_profiles(),
+        'retention': settings.PROFILE_RETENTION,
+    })
+
+
+@staff_member_required
+def admin_profile_file(request, profile_id: str, kind: str):
+    path = profile_path(profile_id, kind)
+    if path is None:
+        raise Http404('Unknown profile')
+    content_type = 'application/json' if kind == 'json' else 'text/plain; charset=utf-8'
+    return HttpResponse(path.read_bytes(), content_type=content_type)
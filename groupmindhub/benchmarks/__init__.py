@@ -0,0 +1,6 @@
+"""Benchmark suite for the merge engine, serializers and API endpoints.
+
+Run it with ``manage.py run_benchmarks``. Benchmarks register with ``@benchmark(name)``
+in ``engine`` and ``endpoints``; ``runner`` seeds each dataset size into a throwaway test
+database, times every benchmark and compares the report against a stored baseline.
+"""
@@ -0,0 +1,62 @@
+"""API and page benchmarks, driven through the Django test client as the project owner."""
+from __future__ import annotations
+
+import json
+
+from django.test import Client
+from django.urls import reverse
+
+from .runner import benchmark
+
+
+def _client(dataset) -> Client:
+    client = Client()
+    client.force_login(dataset.owner)
+    return client
+
+
+def _check(response, url: str):
+    if response.status_code != 200:
+        raise RuntimeError(f'{url} returned {response.status_code}')
+
+
+def _get(dataset, url: str):
+    client = _client(dataset)
+
+    def run():
+        _check(client.get(url), url)
+
+    return run
+
+
+@benchmark('api.project_entry')
+def bench_project_entry(dataset):
+    return _get(dataset, reverse('api_project_entry', args=[dataset.project.id]))
+
+
+@benchmark('api.project_changes_list')
+def bench_project_changes_list(dataset):
+    return _get(dataset, reverse('api_project_changes_list', args=[dataset.project.id]))
+
+
+@benchmark('api.project_comments')
+def bench_project_comments(dataset):
+    section = dataset.entry.sections.filter(comments__isnull=False).order_by('id').first()
+    url = reverse('api_project_comments', args=[dataset.project.id])
+    return _get(dataset, f'{url}?target_type=section&section_id={section.stable_id}')
+
+
+@benchmark('api.change_vote')
+def bench_change_vote(dataset):
+    client = _client(dataset)
+    url = reverse('api_change_vote', args=[dataset.open_changes().first().id])
+
+    def run():
+        _check(client.post(url, data=json.dumps({'value': 1}), content_type='application/json'), url)
+
+    return run
+
+
+@benchmark('web.entry_detail')
+def bench_entry_detail(dataset):
+    return _get(dataset, reverse('entry_detail', args=[dataset.entry.id]))
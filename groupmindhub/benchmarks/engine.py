@@ -0,0 +1,82 @@
+"""Merge engine and serializer benchmarks; each setup returns the callable that is timed."""
+from __future__ import annotations
+
+from groupmindhub.apps.core.api import serialize_change, serialize_entry
+from groupmindhub.apps.core.logic import apply_ops, auto_merge, build_section_index, outline
+from groupmindhub.apps.core.models import ChangeVote, Entry
+from groupmindhub.apps.core.seeding import normalize_section_tree, seed_entry_sections
+
+from .runner import benchmark
+
+MERGE_CANDIDATES = 3
+SEED_CHAPTERS = 100
+SEED_CLAUSES = 9
+
+
+def _fresh_entry(dataset) -> Entry:
+    return Entry.objects.get(id=dataset.entry.id)
+
+
+@benchmark('engine.apply_ops')
+def bench_apply_ops(dataset):
+    entry = _fresh_entry(dataset)
+    ops = dataset.open_changes().first().ops_json
+    return lambda: apply_ops(entry, ops)
+
+
+@benchmark('engine.build_section_index')
+def bench_build_section_index(dataset):
+    entry = _fresh_entry(dataset)
+    blocks = list(entry.blocks.order_by('position', 'id'))
+    return lambda: build_section_index(entry, blocks=blocks)
+
+
+@benchmark('engine.outline')
+def bench_outline(dataset):
+    blocks = list(dataset.entry.blocks.select_related('entry').order_by('position', 'id'))
+    return lambda: outline(blocks)
+
+
+@benchmark('engine.serialize_entry')
+def bench_serialize_entry(dataset):
+    entry = _fresh_entry(dataset)
+    return lambda: serialize_entry(entry)
+
+
+@benchmark('engine.serialize_change')
+def bench_serialize_change(dataset):
+    entry = _fresh_entry(dataset)
+    change = dataset.open_changes().select_related('project').first()
+    index = build_section_index(entry)
+    return lambda: serialize_change(change, dataset.owner, section_index=index)
+
+
+@benchmark('engine.auto_merge')
+def bench_auto_merge(dataset):
+    """Scan every open change and merge ``MERGE_CANDIDATES`` of them that were voted through."""
+    project = dataset.project
+    voters = [m.user_id for m in project.memberships.order_by('id')[:project.required_yes_votes]]
+    candidates = list(dataset.open_changes()[:MERGE_CANDIDATES])
+    ChangeVote.objects.filter(change__in=candidates).delete()
+    ChangeVote.objects.bulk_create([
+        ChangeVote(change=change, user_id=user_id, value=1) for change in candidates for user_id in voters
+    ])
+    return auto_merge
+
+
+@benchmark('engine.seed_entry_sections')
+def bench_seed_entry_sections(dataset):
+    """Seed a new entry with ``SEED_CHAPTERS`` chapters of ``SEED_CLAUSES`` clauses (1,000 sections)."""
+    entry = Entry.objects.create(project=dataset.project, title='Seeded', status='published')
+    tree = normalize_section_tree([
+        {
+            'heading': f'Chapter {chapter}',
+            'body': f'Intro {chapter}',
+            'children': [
+                {'heading': f'Clause {chapter}.{clause}', 'body': 'Text', 'children': []}
+                for clause in range(1, SEED_CLAUSES + 1)
+            ],
+        }
+        for chapter in range(1, SEED_CHAPTERS + 1)
+    ])
+    return lambda: seed_entry_sections(entry, tree)
@@ -0,0 +1,172 @@
+"""Timing, reporting and baseline comparison for the benchmark suite.
+
+A benchmark's ``setup(dataset)`` prepares whatever it needs and returns the callable to
+time. Each iteration runs setup and the timed call inside a savepoint that is rolled
+back afterwards, so writes (merges, votes) never leak into the next iteration, and the
+cache is cleared first, so every sample measures the uncached path. Queries issued by
+the timed call are counted with ``instrumentation.QueryStats``.
+"""
+from __future__ import annotations
+
+import platform
+import statistics
+import time
+from dataclasses import dataclass, replace
+from importlib import import_module
+from typing import Any, Callable, Dict, List
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from groupmindhub.apps.core.benchdata import BenchSpec, project_name_prefix, seed_bench
+from groupmindhub.apps.core.instrumentation import QueryStats
+from groupmindhub.apps.core.models import Change, Project
+
+BENCHMARK_MODULES = ('groupmindhub.benchmarks.engine', 'groupmindhub.benchmarks.endpoints')
+DEFAULT_ITERATIONS = 20
+DEFAULT_WARMUP = 2
+DEFAULT_MAX_SLOWDOWN = 0.25
+DEFAULT_MAX_EXTRA_QUERIES = 0
+DEFAULT_MIN_DELTA_MS = 2.0
+
+SIZES: Dict[str, BenchSpec] = {
+    'small': BenchSpec(members=10, blocks=1_000, depth=6, changes=200, comments=100, seed=101),
+    'medium': BenchSpec(members=25, blocks=10_000, depth=8, changes=2_000, comments=1_000, seed=102),
+    'large': BenchSpec(members=50, blocks=50_000, depth=10, changes=5_000, comments=3_000, seed=103),
+}
+
+
+@dataclass
+class Dataset:
+    size: str
+    spec: BenchSpec
+    project: Project
+    entry: Any
+    owner: Any
+
+    def open_changes(self):
+        return Change.objects.filter(project=self.project, status='published').order_by('id')
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[Dataset], Callable[[], Any]]
+
+
+_benchmarks: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    """Register the decorated setup function as benchmark ``name``."""
+
+    def register(setup):
+        _benchmarks[name] = Benchmark(name, setup)
+        return setup
+
+    return register
+
+
+def get_benchmarks(only: List[str] | None = None) -> List[Benchmark]:
+    for module in BENCHMARK_MODULES:
+        import_module(module)
+    return [b for name, b in sorted(_benchmarks.items()) if not only or any(part in name for part in only)]
+
+
+def seed_dataset(size: str, spec: BenchSpec) -> Dataset:
+    seed_bench(replace(spec, projects=1))
+    project = Project.objects.get(name__startswith=project_name_prefix(spec.seed))
+    entry = project.entries.order_by('id').first()
+    owner = project.memberships.order_by('id').first().user
+    return Dataset(size, spec, project, entry, owner)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def time_benchmark(bench: Benchmark, dataset: Dataset, iterations: int, warmup: int) -> Dict[str, Any]:
+    samples: List[float] = []
+    queries: List[int] = []
+    for iteration in range(warmup + iterations):
+        with transaction.atomic():
+            cache.clear()
+            run = bench.setup(dataset)
+            stats = QueryStats()
+            with connection.execute_wrapper(stats):
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        if iteration >= warmup:
+            samples.append(elapsed * 1000)
+            queries.append(stats.count)
+    return {
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(percentile(samples, 0.95), 3),
+        'min_ms': round(min(samples), 3),
+        'max_ms': round(max(samples), 3),
+        'queries': max(queries),
+        'iterations': iterations,
+    }
+
+
+def run_suite(
+    sizes: List[str],
+    only: List[str] | None = None,
+    iterations: int = DEFAULT_ITERATIONS,
+    warmup: int = DEFAULT_WARMUP,
+    progress: Callable[[str, str, Dict[str, Any]], None] | None = None,
+) -> Dict[str, Any]:
+    """Seed each size in its own rolled-back transaction and time the selected benchmarks."""
+    benchmarks = get_benchmarks(only)
+    results: Dict[str, Dict[str, Any]] = {}
+    for size in sizes:
+        with transaction.atomic():
+            dataset = seed_dataset(size, SIZES[size])
+            results[size] = {}
+            for bench in benchmarks:
+                results[size][bench.name] = time_benchmark(bench, dataset, iterations, warmup)
+                if progress:
+                    progress(size, bench.name, results[size][bench.name])
+            transaction.set_rollback(True)
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'iterations': iterations,
+            'sizes': {size: SIZES[size].blocks for size in sizes},
+        },
+        'results': results,
+    }
+
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    max_slowdown: float = DEFAULT_MAX_SLOWDOWN,
+    max_extra_queries: int = DEFAULT_MAX_EXTRA_QUERIES,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+) -> List[str]:
+    """Regressions of ``report`` against ``baseline``, one message each.
+
+    A benchmark regresses when its p95 is more than ``max_slowdown`` (a fraction) above
+    the baseline and by at least ``min_delta_ms``, or when it issues more than
+    ``max_extra_queries`` queries over the baseline. Benchmarks missing from either
+    side are ignored.
+    """
+    regressions: List[str] = []
+    for size, benches in report.get('results', {}).items():
+        for name, current in benches.items():
+            previous = baseline.get('results', {}).get(size, {}).get(name)
+            if not previous:
+                continue
+            before, after = previous['p95_ms'], current['p95_ms']
+            if after > before * (1 + max_slowdown) and after - before >= min_delta_ms:
+                regressions.append(f'{size}/{name}: p95 {before:.1f} ms -> {after:.1f} ms')
+            if current['queries'] > previous['queries'] + max_extra_queries:
+                regressions.append(f"{size}/{name}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
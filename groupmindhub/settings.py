@@ -3,6 +3,7 @@ import sys
 from pathlib import Path
 
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -23,14 +24,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'groupmindhub.apps.core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'groupmindhub.apps.core.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'groupmindhub.apps.core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'groupmindhub.urls'
@@ -61,6 +64,52 @@ DATABASES = {
     )
 }
 
+# Shared cache: local memory by default (per process), "file" or "db" for a single host,
+# Redis when REDIS_URL is set. The "db" backend needs `manage.py createcachetable`.
+REDIS_URL = os.environ.get("REDIS_URL", "")
+CACHE_BACKEND = os.environ.get("DJANGO_CACHE_BACKEND", "redis" if REDIS_URL else "locmem")
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "groupmindhub"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / ".cache")),
+    "db": ("django.core.cache.backends.db.DatabaseCache", "groupmindhub_cache"),
+    "redis": ("django.core.cache.backends.redis.RedisCache", REDIS_URL),
+}
+if 'test' in sys.argv:
+    CACHE_BACKEND = "locmem"
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"Unknown DJANGO_CACHE_BACKEND {CACHE_BACKEND!r}; expected one of {', '.join(CACHE_BACKENDS)}"
+    )
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND][0],
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", CACHE_BACKENDS[CACHE_BACKEND][1]),
+        "TIMEOUT": int(os.environ.get("DJANGO_CACHE_TIMEOUT", "3600")),
+    }
+}
+
+# Background jobs (core.jobs) run in `manage.py run_worker`; eager mode runs them inline
+# in the request instead, which is the default for local development and tests.
+JOBS_EAGER = os.environ.get("JOBS_EAGER", "1" if DEBUG else "0") == "1"
+if 'test' in sys.argv:
+    JOBS_EAGER = True
+
+# RequestMetricsMiddleware logs requests slower than this or issuing more queries than this.
+SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_QUERIES = int(os.environ.get("SLOW_REQUEST_QUERIES", "50"))
+
+# ProfilingMiddleware: captures from ?profile=1 requests (owners/staff) and how many to keep.
+PROFILE_DIR = os.environ.get("PROFILE_DIR", str(BASE_DIR / ".profiles"))
+PROFILE_RETENTION = int(os.environ.get("PROFILE_RETENTION", "50"))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "2"))
+
+# Each worker process writes its metrics here; /metrics sums them. Empty = this process only.
+METRICS_DIR = os.environ.get("METRICS_DIR", str(BASE_DIR / ".metrics"))
+# Bearer token for scrapers (``Authorization: Bearer <token>``); staff can always read /metrics.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+if 'test' in sys.argv:
+    METRICS_DIR = ""
+
 AUTH_PASSWORD_VALIDATORS = []  # Simplified for MVP
 
 LANGUAGE_CODE = 'en-us'
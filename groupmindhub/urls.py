@@ -5,6 +5,7 @@ from groupmindhub.apps.web.views import (
     prototype_view, app_view, clone_view,
     project_new, project_star_toggle,
     project_settings, project_invite_accept, project_invite_decline,
+    admin_profiles, admin_profile_file,
 )
 from groupmindhub.apps.web.views_auth import login_view, logout_view, signup_view
 from groupmindhub.apps.core.api import (
@@ -13,11 +14,18 @@ from groupmindhub.apps.core.api import (
     api_project_changes_create,
     api_project_comments,
     api_project_comment_delete,
+    api_project_import,
+    api_project_search,
+    api_project_events,
     api_change_vote,
     api_change_merge,
+    api_cache_stats,
+    api_metrics,
 )
 
 urlpatterns = [
+    path('admin/profiles/', admin_profiles, name='admin_profiles'),
+    path('admin/profiles/<str:profile_id>.<str:kind>', admin_profile_file, name='admin_profile_file'),
     path('admin/', admin.site.urls),
     path('', index, name='index'),
     path('projects/<int:project_id>/', project_detail, name='project_detail'),
@@ -41,7 +49,12 @@ urlpatterns = [
     path('api/projects/<int:project_id>/changes/create', api_project_changes_create, name='api_project_changes_create'),
     path('api/projects/<int:project_id>/comments', api_project_comments, name='api_project_comments'),
     path('api/projects/<int:project_id>/comments/<int:comment_id>', api_project_comment_delete, name='api_project_comment_delete'),
+    path('api/projects/<int:project_id>/import', api_project_import, name='api_project_import'),
+    path('api/projects/<int:project_id>/search', api_project_search, name='api_project_search'),
+    path('api/projects/<int:project_id>/events', api_project_events, name='api_project_events'),
     path('api/changes/<int:change_id>/votes', api_change_vote, name='api_change_vote'),
     path('api/changes/<int:change_id>/merge', api_change_merge, name='api_change_merge'),
+    path('api/cache/stats', api_cache_stats, name='api_cache_stats'),
+    path('metrics', api_metrics, name='metrics'),
     path('api/projects/<int:project_id>/star-toggle', project_star_toggle, name='project_star_toggle'),
 ]
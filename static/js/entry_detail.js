@@ -133,6 +133,7 @@
     followSectionFocus: true,
     refreshHandle: null,
   };
+  const liveState = { source: null, connected: false };
   const COMMENT_PAGE_SIZE = 10;
   let timerInterval = null;
   const canComment = !!(currentUser && currentUser.can_comment);
@@ -231,7 +232,8 @@
 
   function scheduleCommentRefresh() {
     clearCommentRefresh();
-    if (!commentState.targetId) return;
+    // The live event stream announces new comments; only poll while it is down.
+    if (!commentState.targetId || liveState.connected) return;
     commentState.refreshHandle = window.setInterval(() => {
       refreshComments();
     }, 30000);
@@ -3042,9 +3044,64 @@
     }
   })();
 
+  function parseLiveEvent(event) {
+    try {
+      return JSON.parse(event.data || '{}');
+    } catch (error) {
+      return {};
+    }
+  }
+
+  function connectLiveEvents() {
+    if (!entryState.projectId || typeof window.EventSource !== 'function') return;
+    const source = new EventSource(`/api/projects/${entryState.projectId}/events`);
+    liveState.source = source;
+    source.addEventListener('open', () => {
+      liveState.connected = true;
+      clearCommentRefresh();
+    });
+    source.addEventListener('error', () => {
+      // EventSource reconnects by itself (resuming from the last event id); poll meanwhile.
+      liveState.connected = false;
+      scheduleCommentRefresh();
+    });
+    source.addEventListener('vote', (event) => {
+      const data = parseLiveEvent(event);
+      const change = changeState.list.find((item) => item.id === data.change_id);
+      if (!change) return;
+      change.yes = data.yes;
+      change.no = data.no;
+      change.is_passing = data.yes >= (change.required_yes_votes || 0);
+      renderChanges();
+    });
+    source.addEventListener('proposal', () => {
+      loadChanges();
+    });
+    source.addEventListener('merge', (event) => {
+      const data = parseLiveEvent(event);
+      if (!data.version || data.version > (entryState.version || 0)) {
+        refreshEntry();
+      }
+      loadChanges();
+    });
+    source.addEventListener('comment', (event) => {
+      const data = parseLiveEvent(event);
+      const target = String(commentState.targetId || '');
+      if (!target) return;
+      if ((commentState.targetType === 'change' && String(data.change_id || '') === target)
+        || (commentState.targetType === 'section' && String(data.section_id || '') === target)) {
+        refreshComments();
+      }
+    });
+  }
+
   renderEntry();
   renderComposer();
   loadChanges();
-  window.addEventListener('beforeunload', clearCommentRefresh);
+  connectLiveEvents();
+  window.addEventListener('beforeunload', () => {
+    clearCommentRefresh();
+    if (liveState.source) liveState.source.close();
+  });
 })();
 